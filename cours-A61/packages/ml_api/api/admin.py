@@ -0,0 +1,24 @@
+# packages/ml_api/api/admin.py
+
+import hmac
+from typing import Optional
+
+# Les endpoints d'administration (/admin/...) exigent l'en-tête
+#   Authorization: Bearer <ADMIN_TOKEN>
+# Sans ADMIN_TOKEN configuré, ils sont désactivés (404).
+AUTH_SCHEME = "Bearer"
+
+
+def is_authorized(authorization: Optional[str], admin_token: Optional[str]) -> bool:
+    """
+    Vérifie l'en-tête Authorization d'une requête d'administration.
+
+    La comparaison se fait en temps constant (hmac.compare_digest) : la durée
+    de la réponse ne renseigne pas sur le nombre de caractères corrects.
+    """
+    if not admin_token or not authorization:
+        return False
+    scheme, _, token = authorization.partition(" ")
+    if scheme != AUTH_SCHEME:
+        return False
+    return hmac.compare_digest(token.strip().encode("utf-8"), admin_token.encode("utf-8"))
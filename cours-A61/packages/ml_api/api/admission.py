@@ -0,0 +1,168 @@
+# packages/ml_api/api/admission.py
+
+import math
+import threading
+from typing import Any, Dict, List, Optional
+
+# Raisons de refus, comptées séparément (stats et /metrics)
+REJECTION_REASONS = ("in_flight", "queued_rows", "body_size", "batch_size")
+
+
+class AdmissionRejected(Exception):
+    """
+    Requête refusée par le contrôle d'admission.
+
+    `status` vaut 503 pour une surcharge passagère (le client peut réessayer
+    après `retry_after` secondes) et 413 pour une requête trop grosse, qui
+    serait refusée de la même façon plus tard (pas de Retry-After).
+    """
+
+    def __init__(self, reason: str, status: int, message: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.reason = reason
+        self.status = status
+        self.retry_after = retry_after
+
+    def headers(self) -> Dict[str, str]:
+        if self.retry_after is None:
+            return {}
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class _Admission:
+    """Place occupée par une requête admise ; libérée par release() (ou en sortie de bloc with)."""
+
+    def __init__(self, controller: "AdmissionController") -> None:
+        self._controller = controller
+        self.rows = 0
+        self._released = False
+
+    def reserve_rows(self, n_rows: int) -> None:
+        """Réserve `n_rows` lignes dans la file ; lève AdmissionRejected si elles ne tiennent pas."""
+        self._controller._reserve_rows(self, n_rows)
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release(self)
+
+    def __enter__(self) -> "_Admission":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+class AdmissionController:
+    """
+    Contrôle d'admission de l'endpoint de prédiction.
+
+    Trois limites (0 : pas de limite), vérifiées avant tout travail coûteux :
+      - `max_body_bytes`  : taille du corps de la requête → 413 ;
+      - `max_in_flight`   : requêtes en cours de traitement → 503 ;
+      - `max_queued_rows` : total des lignes des requêtes en cours → 503,
+                            ou 413 si la requête, seule, dépasse déjà la limite.
+
+    Refuser tout de suite une requête de trop garde une latence stable pour
+    celles qui sont admises, au lieu d'allonger la file de tout le monde.
+    Les 503 portent un en-tête Retry-After ; la profondeur de la file et les
+    refus sont publiés (stats, /metrics) pour l'autoscaling.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 0,
+        max_queued_rows: int = 0,
+        max_body_bytes: int = 0,
+        retry_after_seconds: float = 1.0,
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_queued_rows = max_queued_rows
+        self.max_body_bytes = max_body_bytes
+        self.retry_after_seconds = retry_after_seconds
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._queued_rows = 0
+        self._admitted = 0
+        self._rejected = {reason: 0 for reason in REJECTION_REASONS}
+
+    def admit(self, content_length: Optional[int]) -> _Admission:
+        """
+        Admet une requête (à libérer ensuite) ou lève AdmissionRejected.
+
+        `content_length` est la taille annoncée du corps (None si inconnue :
+        la limite est alors appliquée à la lecture, voir le contrôleur).
+        """
+        if self.max_body_bytes and content_length is not None and content_length > self.max_body_bytes:
+            self._count_rejection("body_size")
+            raise AdmissionRejected(
+                "body_size", 413, f"Request body too large ({content_length} > {self.max_body_bytes} bytes)"
+            )
+        with self._lock:
+            if self.max_in_flight and self._in_flight >= self.max_in_flight:
+                self._rejected["in_flight"] += 1
+                raise AdmissionRejected(
+                    "in_flight", 503, "Server busy: too many requests in flight", self.retry_after_seconds
+                )
+            self._in_flight += 1
+            self._admitted += 1
+        return _Admission(self)
+
+    def _reserve_rows(self, admission: _Admission, n_rows: int) -> None:
+        if self.max_queued_rows and n_rows > self.max_queued_rows:
+            self._count_rejection("batch_size")
+            raise AdmissionRejected(
+                "batch_size", 413, f"Batch too large ({n_rows} > {self.max_queued_rows} rows)"
+            )
+        with self._lock:
+            if self.max_queued_rows and self._queued_rows + n_rows > self.max_queued_rows:
+                self._rejected["queued_rows"] += 1
+                raise AdmissionRejected(
+                    "queued_rows", 503, "Server busy: too many rows queued", self.retry_after_seconds
+                )
+            self._queued_rows += n_rows
+            admission.rows += n_rows
+
+    def _release(self, admission: _Admission) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._queued_rows -= admission.rows
+
+    def reject_body(self, message: str = "Request body too large") -> AdmissionRejected:
+        """Refus d'un corps dont la taille n'était connue qu'à la lecture (envoi par morceaux)."""
+        self._count_rejection("body_size")
+        return AdmissionRejected("body_size", 413, message)
+
+    def _count_rejection(self, reason: str) -> None:
+        with self._lock:
+            self._rejected[reason] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Limites, profondeur actuelle de la file et nombre de refus par raison."""
+        with self._lock:
+            return {
+                "max_in_flight": self.max_in_flight or None,
+                "max_queued_rows": self.max_queued_rows or None,
+                "max_body_bytes": self.max_body_bytes or None,
+                "in_flight": self._in_flight,
+                "queued_rows": self._queued_rows,
+                "admitted": self._admitted,
+                "rejected": dict(self._rejected),
+            }
+
+    def render(self) -> str:
+        """Mêmes informations au format texte de Prometheus (ajoutées à /metrics)."""
+        stats = self.stats()
+        lines: List[str] = [
+            "# HELP ml_api_in_flight_requests Prediction requests being processed.",
+            "# TYPE ml_api_in_flight_requests gauge",
+            f"ml_api_in_flight_requests {stats['in_flight']}",
+            "# HELP ml_api_queued_rows Rows of the prediction requests being processed.",
+            "# TYPE ml_api_queued_rows gauge",
+            f"ml_api_queued_rows {stats['queued_rows']}",
+            "# HELP ml_api_rejected_requests_total Prediction requests rejected by admission control, by reason.",
+            "# TYPE ml_api_rejected_requests_total counter",
+        ]
+        for reason, count in stats["rejected"].items():
+            lines.append(f'ml_api_rejected_requests_total{{reason="{reason}"}} {count}')
+        return "\n".join(lines) + "\n"
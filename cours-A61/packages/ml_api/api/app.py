@@ -1,11 +1,28 @@
 ## app.py ##
 
+from functools import partial
+from typing import Any, Dict, Optional
+
 from flask import Flask
-from api.config import configure_logging  # Notre configuration centralisée des logs
+from regression_model.logging_config import configure_prediction_logging
+from regression_model.predict import (
+    configure_artifact_format,
+    configure_model_registry,
+    configure_prediction_cache,
+    describe_models,
+    make_prediction,
+)
+from api.admission import AdmissionController  # Limites de charge de l'endpoint de prédiction
+from api.batching import RequestCoalescer  # Regroupement optionnel des requêtes
+from api.config import API_SETTINGS, configure_logging  # Notre configuration centralisée
+from api.metrics import StageMetrics  # Durées des étapes, exposées par /metrics
+from api.readiness import Readiness  # Préchargement du modèle, exposé par /ready
+from api.shadow import ShadowScorer  # Évaluation "fantôme" d'un modèle candidat
 from api.controller import api_blueprint   # Toutes nos routes API regroupées
+from api.formats import make_orjson_provider  # Encodeur JSON rapide (optionnel)
 
 
-def create_app() -> Flask:
+def create_app(settings: Optional[Dict[str, Any]] = None) -> Flask:
     
     ## Fonction principale pour créer et configurer notre application Flask.
     
@@ -14,21 +31,113 @@ def create_app() -> Flask:
     ## - De faciliter les tests en créant des instances isolées
     ## - D'appliquer la configuration dans un ordre contrôlé
     
+    ## `settings` permet de surcharger les paramètres de API_SETTINGS
+    ## (par exemple pour activer le regroupement des requêtes dans un test).
+    
     # 1. Configuration du système de logs (doit être fait en premier)
     configure_logging()
 
     # 2. Création de l'application Flask
     app = Flask(__name__)
+    app.config.update(API_SETTINGS)
+    if settings:
+        app.config.update(settings)
+
+    # Journalisation des prédictions : structurée, contenu complet échantillonné
+    configure_prediction_logging(
+        mode=app.config["LOG_MODE"],
+        payload_sample_rate=app.config["LOG_PAYLOAD_SAMPLE_RATE"],
+    )
+
+    # Encodeur JSON rapide si orjson est installé (sinon le module json standard)
+    if app.config["FAST_JSON_ENABLED"]:
+        provider = make_orjson_provider(app)
+        if provider is not None:
+            app.json = provider
+
+    # Enregistreur des métriques de latence (une instance par application)
+    if app.config["METRICS_ENABLED"]:
+        app.extensions["metrics"] = StageMetrics()
+
+    # Contrôle d'admission : profondeur de la file toujours mesurée, limites
+    # appliquées seulement si elles sont configurées
+    app.extensions["admission"] = AdmissionController(
+        max_in_flight=app.config["ADMISSION_MAX_IN_FLIGHT"],
+        max_queued_rows=app.config["ADMISSION_MAX_QUEUED_ROWS"],
+        max_body_bytes=app.config["ADMISSION_MAX_BODY_BYTES"],
+        retry_after_seconds=app.config["ADMISSION_RETRY_AFTER_SECONDS"],
+    )
+
+    if app.config["PREDICTION_CHUNK_SIZE"] < 1:
+        raise ValueError("PREDICTION_CHUNK_SIZE must be >= 1")
 
-    # 3. Enregistrement de toutes nos routes API
+    # Réglages communs à tout le processus, qui n'a qu'un modèle chargé et un
+    # cache de prédictions : format de l'artefact, modèles gardés en mémoire,
+    # taille du cache et journalisation des prédictions (plus haut). La
+    # dernière application créée impose les siens ; les autres réglages, dont
+    # PREDICTION_CHUNK_SIZE, sont propres à chaque application.
+    # Format de l'artefact du modèle (.pkl par défaut)
+    configure_artifact_format(app.config["MODEL_ARTIFACT_FORMAT"])
+    # Autres modèles de trained_models/ gardés en mémoire (éviction LRU au-delà)
+    configure_model_registry(max_resident=app.config["MODEL_REGISTRY_MAX_RESIDENT"])
+
+    # 3. Cache des prédictions (désactivé par défaut)
+    if app.config["PREDICTION_CACHE_ENABLED"]:
+        configure_prediction_cache(
+            max_entries=app.config["PREDICTION_CACHE_MAX_ENTRIES"],
+            ttl_seconds=app.config["PREDICTION_CACHE_TTL_SECONDS"],
+        )
+
+    # Regroupement des requêtes de prédiction (désactivé par défaut)
+    if app.config["PREDICTION_COALESCING_ENABLED"]:
+        app.extensions["prediction_coalescer"] = RequestCoalescer(
+            window_ms=app.config["PREDICTION_COALESCING_WINDOW_MS"],
+            max_batch_size=app.config["PREDICTION_COALESCING_MAX_BATCH_SIZE"],
+            predict_fn=partial(
+                make_prediction,
+                use_cache=app.config["PREDICTION_CACHE_ENABLED"],
+                chunk_size=app.config["PREDICTION_CHUNK_SIZE"],
+                # Contenu journalisé par le contrôleur, requête par requête
+                log_payload=False,
+            ),
+        )
+
+    # Évaluation en arrière-plan d'un modèle candidat (désactivée par défaut)
+    if app.config["SHADOW_MODEL"]:
+        candidate = app.config["SHADOW_MODEL"]
+        if candidate not in {model["name"] for model in describe_models()}:
+            raise ValueError(f"Unknown shadow model {candidate!r}")
+        app.extensions["shadow_scorer"] = ShadowScorer(
+            candidate_model=candidate,
+            workers=app.config["SHADOW_WORKERS"],
+            max_queue_size=app.config["SHADOW_QUEUE_SIZE"],
+            predict_fn=partial(make_prediction, chunk_size=app.config["PREDICTION_CHUNK_SIZE"], log_payload=False),
+        )
+
+    # 4. Enregistrement de toutes nos routes API
     # Le blueprint permet d'organiser les routes de façon modulaire
     app.register_blueprint(api_blueprint)
 
-    # 4. Retour de l'application configurée
+    # 5. Préchargement et échauffement du modèle (MODEL_PRELOAD), en dernier :
+    # toute la configuration du modèle (format, cache) est alors appliquée
+    app.extensions["readiness"] = Readiness(
+        mode=app.config["MODEL_PRELOAD"],
+        warmup_rows=app.config["MODEL_WARMUP_ROWS"],
+    ).start()
+
+    # 6. Retour de l'application configurée
     return app
 
 
-# Instance globale de l'application
-# Cette variable est nécessaire pour que Gunicorn et autres serveurs WSGI
-# puissent trouver et démarrer notre application
-app = create_app()
\ No newline at end of file
+def __getattr__(name: str) -> Any:
+
+    ## Instance globale de l'application (api.app:app), nécessaire pour que
+    ## Gunicorn et autres serveurs WSGI puissent trouver et démarrer notre
+    ## application. Elle n'est créée qu'au premier accès : importer
+    ## create_app seul (serve.py, avant ses fork) ne démarre ni préchargement
+    ## ni threads.
+
+    if name == "app":
+        instance = globals()["app"] = create_app()
+        return instance
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
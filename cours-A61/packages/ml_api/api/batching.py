@@ -0,0 +1,236 @@
+# packages/ml_api/api/batching.py
+
+import bisect
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from regression_model.predict import make_prediction
+from regression_model.config.core import FEATURES
+
+logger = logging.getLogger("ml_api")
+
+# Bornes (incluses) des classes de l'histogramme des tailles de lots
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+# Nombre de mesures récentes conservées pour les percentiles d'attente
+_DELAY_SAMPLES = 2048
+
+
+class _PendingRequest(NamedTuple):
+    """Une requête en attente d'être regroupée avec d'autres."""
+
+    records: List[Dict[str, Any]]
+    future: Future
+    enqueued_at: float
+
+
+def _has_all_features(records: List[Dict[str, Any]]) -> bool:
+    """
+    Vérifie qu'une requête contient, à elle seule, toutes les colonnes du modèle.
+
+    Une fois fusionnées avec d'autres, les lignes d'une requête incomplète
+    hériteraient des colonnes des autres requêtes (remplies de NaN) et ne
+    produiraient plus l'erreur "missing_columns" attendue.
+    """
+    present = set()
+    for record in records:
+        present.update(record)
+    return present.issuperset(FEATURES)
+
+
+class RequestCoalescer:
+    """
+    Regroupe les petites requêtes de prédiction concurrentes en un seul lot.
+
+    Chaque appel à predict() dépose ses lignes dans une file. Un thread
+    dédié attend la première requête, puis accumule les suivantes pendant au
+    plus `window_ms` millisecondes (ou jusqu'à `max_batch_size` lignes), appelle
+    make_prediction une seule fois sur l'ensemble et redistribue les prédictions
+    à chaque appelant.
+
+    Une requête incomplète est traitée seule (pour garder ses propres erreurs de
+    validation), et si le lot échoue, chaque requête est rejouée séparément :
+    une requête invalide ne fait jamais échouer les autres.
+    """
+
+    def __init__(
+        self,
+        window_ms: float = 2.0,
+        max_batch_size: int = 256,
+        predict_fn: Callable[..., Dict[str, Any]] = make_prediction,
+    ) -> None:
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._predict_fn = predict_fn
+        self._queue: "queue.Queue[_PendingRequest]" = queue.Queue()
+        # Requête retirée de la file mais qui ne tenait plus dans le lot précédent
+        self._carry_over: Optional[_PendingRequest] = None
+
+        # Statistiques (protégées par un verrou, lues par stats())
+        self._stats_lock = threading.Lock()
+        self._batch_size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self._batches = 0
+        self._requests = 0
+        self._rows = 0
+        self._fallbacks = 0
+        self._delays: deque = deque(maxlen=_DELAY_SAMPLES)
+        self._total_delay = 0.0
+        self._max_delay = 0.0
+
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="prediction-coalescer", daemon=True)
+        self._worker.start()
+
+    def predict(self, inputs: Any) -> Dict[str, Any]:
+        """Équivalent de make_prediction(inputs), mais éventuellement regroupé."""
+        if isinstance(inputs, dict):
+            inputs = [inputs]
+        if (
+            self._stopped.is_set()
+            or not isinstance(inputs, list)
+            or not inputs
+            or not _has_all_features(inputs)
+        ):
+            # Service arrêté, format inattendu ou colonnes manquantes : traitement direct
+            return self._predict_fn(input_data=inputs)
+        return self.submit(inputs).result()
+
+    def submit(self, records: List[Dict[str, Any]]) -> Future:
+        """Dépose une requête dans la file ; le résultat arrivera dans le Future."""
+        future: Future = Future()
+        self._queue.put(_PendingRequest(records, future, time.perf_counter()))
+        return future
+
+    def close(self) -> None:
+        """Arrête le thread de regroupement (les requêtes déjà en file sont traitées)."""
+        self._stopped.set()
+        self._worker.join(timeout=1.0)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set() or not self._queue.empty() or self._carry_over is not None:
+            batch = self._collect_batch()
+            if not batch:
+                continue
+            try:
+                self._execute(batch)
+            except Exception as error:
+                # Le thread ne doit jamais mourir en laissant des appelants bloqués
+                logger.exception("Unexpected error in prediction coalescer")
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(error)
+
+    def _collect_batch(self) -> List[_PendingRequest]:
+        """Attend une première requête, puis remplit le lot jusqu'à la fin de la fenêtre."""
+        first = self._carry_over
+        self._carry_over = None
+        if first is None:
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                return []
+
+        batch = [first]
+        n_rows = len(first.records)
+        deadline = time.perf_counter() + self.window
+        while n_rows < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                pending = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if n_rows + len(pending.records) > self.max_batch_size:
+                # Ne tient plus dans ce lot : elle ouvrira le suivant
+                self._carry_over = pending
+                break
+            batch.append(pending)
+            n_rows += len(pending.records)
+        return batch
+
+    def _execute(self, batch: List[_PendingRequest]) -> None:
+        started = time.perf_counter()
+        records = [record for pending in batch for record in pending.records]
+        self._record_batch(batch, started, len(records))
+
+        try:
+            result = self._predict_fn(input_data=records)
+        except Exception:
+            logger.exception("Coalesced prediction batch failed, retrying requests one by one")
+            result = None
+
+        if result is None or result.get("errors") or result.get("predictions") is None:
+            # Le lot n'a pas abouti : chaque requête est rejouée seule
+            with self._stats_lock:
+                self._fallbacks += 1
+            for pending in batch:
+                self._resolve_alone(pending)
+            return
+
+        # Redistribution des prédictions, dans l'ordre des requêtes du lot
+        predictions = result["predictions"]
+        offset = 0
+        for pending in batch:
+            size = len(pending.records)
+            pending.future.set_result(
+                {**result, "predictions": predictions[offset:offset + size]}
+            )
+            offset += size
+
+    def _resolve_alone(self, pending: _PendingRequest) -> None:
+        try:
+            pending.future.set_result(self._predict_fn(input_data=pending.records))
+        except Exception as error:  # l'appelant recevra l'exception
+            pending.future.set_exception(error)
+
+    def _record_batch(self, batch: List[_PendingRequest], started: float, n_rows: int) -> None:
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._rows += n_rows
+            self._batch_size_counts[bisect.bisect_left(BATCH_SIZE_BUCKETS, n_rows)] += 1
+            for pending in batch:
+                delay = started - pending.enqueued_at
+                self._delays.append(delay)
+                self._total_delay += delay
+                self._max_delay = max(self._max_delay, delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """Distribution des tailles de lots et délais d'attente, pour régler la fenêtre."""
+        with self._stats_lock:
+            delays = sorted(self._delays)
+            buckets = {
+                f"le_{bound}": count
+                for bound, count in zip(BATCH_SIZE_BUCKETS, self._batch_size_counts)
+            }
+            buckets[f"gt_{BATCH_SIZE_BUCKETS[-1]}"] = self._batch_size_counts[-1]
+
+            def percentile(q: float) -> Optional[float]:
+                if not delays:
+                    return None
+                return delays[min(len(delays) - 1, int(q * len(delays)))] * 1000.0
+
+            return {
+                "window_ms": self.window * 1000.0,
+                "max_batch_size": self.max_batch_size,
+                "batches": self._batches,
+                "requests": self._requests,
+                "rows": self._rows,
+                "fallbacks": self._fallbacks,
+                "mean_batch_rows": self._rows / self._batches if self._batches else None,
+                "batch_rows_histogram": buckets,
+                "queue_delay_ms": {
+                    "mean": self._total_delay / self._requests * 1000.0 if self._requests else None,
+                    "p50": percentile(0.50),
+                    "p95": percentile(0.95),
+                    "p99": percentile(0.99),
+                    "max": self._max_delay * 1000.0,
+                },
+                "queued_requests": self._queue.qsize(),
+            }
@@ -1,7 +1,11 @@
 ## config.py ##
+import logging
 import logging.config
+import os
 from pathlib import Path
 
+from regression_model.logging_config import make_async
+
 # Détermination du dossier racine du package ml_api
 # (on remonte de deux niveaux depuis ce fichier)
 PACKAGE_ROOT = Path(__file__).resolve().parent.parent
@@ -50,11 +54,103 @@ LOGGING_CONFIG = {
 }
 
 
+def _env_flag(name: str, default: bool) -> bool:
+    """Lit un booléen dans une variable d'environnement ("1", "true", "yes"...)."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Paramètres de l'API, chargés dans app.config par create_app().
+# Chaque valeur peut être surchargée par une variable d'environnement
+# (pratique en production) ou par le dictionnaire passé à create_app (tests).
+API_SETTINGS = {
+    # Regroupement des petites requêtes concurrentes en un seul lot de prédiction
+    "PREDICTION_COALESCING_ENABLED": _env_flag("ML_API_COALESCING_ENABLED", False),
+    # Durée maximale d'attente d'autres requêtes avant de lancer le lot
+    "PREDICTION_COALESCING_WINDOW_MS": float(os.environ.get("ML_API_COALESCING_WINDOW_MS", "2")),
+    # Nombre maximal de lignes (maisons) dans un même lot
+    "PREDICTION_COALESCING_MAX_BATCH_SIZE": int(os.environ.get("ML_API_COALESCING_MAX_BATCH_SIZE", "256")),
+    # Cache des prédictions déjà calculées (maisons re-prédites à l'identique)
+    "PREDICTION_CACHE_ENABLED": _env_flag("ML_API_PREDICTION_CACHE_ENABLED", False),
+    # Nombre maximal de maisons gardées en cache (éviction LRU au-delà)
+    "PREDICTION_CACHE_MAX_ENTRIES": int(os.environ.get("ML_API_PREDICTION_CACHE_MAX_ENTRIES", "100000")),
+    # Durée de vie d'une prédiction en cache, en secondes
+    "PREDICTION_CACHE_TTL_SECONDS": float(os.environ.get("ML_API_PREDICTION_CACHE_TTL_SECONDS", "3600")),
+    # Nombre de maisons prédites ensemble par l'endpoint de flux NDJSON
+    "STREAMING_CHUNK_SIZE": int(os.environ.get("ML_API_STREAMING_CHUNK_SIZE", "1000")),
+    # Encodeur JSON rapide (orjson) pour les réponses, s'il est installé ; les
+    # requêtes restent lues par le module json, qui accepte les NaN
+    "FAST_JSON_ENABLED": _env_flag("ML_API_FAST_JSON_ENABLED", True),
+    # Nombre de décimales des prédictions renvoyées (vide : pas d'arrondi)
+    "PREDICTION_DECIMALS": (
+        int(os.environ["ML_API_PREDICTION_DECIMALS"])
+        if os.environ.get("ML_API_PREDICTION_DECIMALS")
+        else None
+    ),
+    # Mesure de la durée des étapes de chaque requête, exposée par /metrics
+    "METRICS_ENABLED": _env_flag("ML_API_METRICS_ENABLED", True),
+    # Format du modèle servi : "pkl" (pipeline sklearn) ou "mmap" (tables NumPy
+    # mappées en mémoire, une seule copie physique partagée par tous les workers).
+    # Commun à tout le processus : la dernière application créée l'impose
+    "MODEL_ARTIFACT_FORMAT": os.environ.get("ML_API_MODEL_ARTIFACT_FORMAT", "pkl"),
+    # Journalisation des prédictions : "structured" (lignes, empreinte, durées)
+    # ou "full" (contenu complet de chaque requête, coûteux sur les gros lots)
+    "LOG_MODE": os.environ.get("ML_API_LOG_MODE", "structured"),
+    # Proportion des requêtes dont le contenu complet est journalisé (0.01 = 1 %)
+    "LOG_PAYLOAD_SAMPLE_RATE": float(os.environ.get("ML_API_LOG_PAYLOAD_SAMPLE_RATE", "0")),
+    # Préchargement du modèle au démarrage : "lazy" (à la première requête),
+    # "eager" (dans create_app) ou "background" (thread, /ready en attendant)
+    "MODEL_PRELOAD": os.environ.get("ML_API_MODEL_PRELOAD", "lazy"),
+    # Nombre de maisons fictives prédites pour échauffer le modèle
+    "MODEL_WARMUP_ROWS": int(os.environ.get("ML_API_MODEL_WARMUP_ROWS", "64")),
+    # Nombre maximal de modèles, en plus du modèle par défaut, gardés en mémoire
+    # pour les requêtes qui en choisissent un autre (?model=, en-tête X-Model).
+    # Commun à tout le processus, comme MODEL_ARTIFACT_FORMAT
+    "MODEL_REGISTRY_MAX_RESIDENT": int(os.environ.get("ML_API_MODEL_REGISTRY_MAX_RESIDENT", "2")),
+    # Modèle candidat évalué en "fantôme" sur le trafic réel (nom d'un artefact
+    # de trained_models/) ; vide : mode fantôme désactivé
+    "SHADOW_MODEL": os.environ.get("ML_API_SHADOW_MODEL") or None,
+    # Threads d'évaluation du candidat et taille maximale de leur file d'attente
+    # (au-delà, les requêtes ne sont pas évaluées plutôt que de s'accumuler)
+    "SHADOW_WORKERS": int(os.environ.get("ML_API_SHADOW_WORKERS", "1")),
+    "SHADOW_QUEUE_SIZE": int(os.environ.get("ML_API_SHADOW_QUEUE_SIZE", "100")),
+    # Nombre de maisons prédites d'un coup : les gros lots sont découpés en
+    # paquets (mémoire bornée, échéance vérifiée entre deux paquets)
+    "PREDICTION_CHUNK_SIZE": int(os.environ.get("ML_API_PREDICTION_CHUNK_SIZE", "10000")),
+    # Temps maximal (ms) accordé à une prédiction, même si le client demande
+    # plus (?timeout_ms=) ; 0 : pas de limite. Une requête avec échéance n'est
+    # pas regroupée avec d'autres (PREDICTION_COALESCING_ENABLED)
+    "PREDICTION_TIMEOUT_MS": float(os.environ.get("ML_API_PREDICTION_TIMEOUT_MS", "0")),
+    # Contrôle d'admission de /v1/predict/regression (0 : pas de limite) :
+    # requêtes traitées en même temps et total de leurs lignes (au-delà : 503),
+    # taille maximale du corps de la requête (au-delà : 413)
+    "ADMISSION_MAX_IN_FLIGHT": int(os.environ.get("ML_API_ADMISSION_MAX_IN_FLIGHT", "0")),
+    "ADMISSION_MAX_QUEUED_ROWS": int(os.environ.get("ML_API_ADMISSION_MAX_QUEUED_ROWS", "0")),
+    "ADMISSION_MAX_BODY_BYTES": int(os.environ.get("ML_API_ADMISSION_MAX_BODY_BYTES", "0")),
+    # Délai (s) conseillé au client refusé avant de réessayer (en-tête Retry-After)
+    "ADMISSION_RETRY_AFTER_SECONDS": float(os.environ.get("ML_API_ADMISSION_RETRY_AFTER_SECONDS", "1")),
+    # Profilage à la demande (X-Profile, ?profile=) ouvert à tous les clients.
+    # tracemalloc et cProfile ralentissent tout le processus : désactivé par
+    # défaut, le profilage est alors réservé aux requêtes qui portent le jeton
+    # ADMIN_TOKEN (en-tête Authorization)
+    "PROFILING_ENABLED": _env_flag("ML_API_PROFILING_ENABLED", False),
+    # Jeton des endpoints d'administration (rechargement du modèle, profilage) ;
+    # sans jeton, ces endpoints sont désactivés
+    "ADMIN_TOKEN": os.environ.get("ML_API_ADMIN_TOKEN") or None,
+}
+
+
 def configure_logging() -> None:
     """
     Applique la configuration du logging à l'ensemble de l'application.
     
     Cette fonction doit être appelée au démarrage de l'API
     pour que tous les modules bénéficient de la même configuration.
+
+    Les handlers console et fichier sont ensuite déplacés dans un thread
+    d'écriture dédié : une requête ne reste jamais bloquée sur le disque.
     """
-    logging.config.dictConfig(LOGGING_CONFIG)
\ No newline at end of file
+    logging.config.dictConfig(LOGGING_CONFIG)
+    make_async(logging.getLogger("ml_api"))
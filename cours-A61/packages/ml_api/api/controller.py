@@ -1,10 +1,40 @@
 # ml_api/api/controller.py
 
-from api.validation import PredictionResultSchema
-from flask import Blueprint, request, jsonify
-from regression_model.predict import make_prediction  # Notre fonction de prédiction
+from api.admin import is_authorized
+from api.admission import AdmissionRejected
+from api.formats import (
+    PayloadError,
+    UnsupportedFormatError,
+    binary_mimetype,
+    decode_binary_payload,
+    encode_response,
+    negotiate_response_format,
+    parse_json_payload,
+    round_predictions,
+)
+from api.metrics import PROMETHEUS_MIMETYPE
+from api.profiling import RequestProfiler, requested_profile_mode
+from api.streaming import NDJSON_MIMETYPE, stream_predictions
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from regression_model.errors import ModelLoadError, UnknownModelError
+from regression_model.logging_config import format_fields, payload_digest, should_log_payload
+from regression_model.timing import observe_stages, timed_stage
+from regression_model.warmup import reload_model
+from regression_model.predict import (  # Notre fonction de prédiction et ses statistiques
+    describe_models,
+    get_model_registry_stats,
+    get_pipeline_cache_stats,
+    get_prediction_cache_stats,
+    load_model,
+    make_prediction,
+)
 
+import io
 import logging
+import time
+from contextlib import ExitStack
+from functools import partial
+from typing import Optional
 
 # Import "safe" de la version et du logger du modèle
 try:
@@ -24,6 +54,46 @@ except ImportError:
 # Création d'un blueprint pour organiser nos routes API
 api_blueprint = Blueprint("api", __name__)
 
+# En-tête choisissant le modèle servi (équivalent du paramètre ?model=)
+MODEL_HEADER = "X-Model"
+
+
+# En-tête donnant le temps maximal (ms) accordé à la prédiction (équivalent de ?timeout_ms=)
+TIMEOUT_HEADER = "X-Timeout-Ms"
+
+
+def requested_deadline(arrived: float) -> Optional[float]:
+    """
+    Échéance de la requête (valeur de time.monotonic()), ou None sans limite.
+
+    Le client peut donner un délai avec ?timeout_ms= ou l'en-tête X-Timeout-Ms ;
+    PREDICTION_TIMEOUT_MS, s'il est configuré, est un maximum pour tous.
+    """
+    budgets = []
+    raw = request.args.get("timeout_ms") or request.headers.get(TIMEOUT_HEADER)
+    if raw:
+        try:
+            budget = float(raw)
+        except ValueError:
+            budget = float("nan")
+        if not budget > 0:
+            raise PayloadError(f"Invalid timeout_ms {raw!r}, expected a positive number of milliseconds")
+        budgets.append(budget)
+    if current_app.config["PREDICTION_TIMEOUT_MS"]:
+        budgets.append(current_app.config["PREDICTION_TIMEOUT_MS"])
+    return arrived + min(budgets) / 1000.0 if budgets else None
+
+
+def requested_model() -> Optional[str]:
+    """Nom du modèle demandé par ?model= ou l'en-tête X-Model (None : modèle par défaut)."""
+    return request.args.get("model") or request.headers.get(MODEL_HEADER) or None
+
+
+def _model_error_response(error: Exception):
+    # 404 pour un modèle inconnu, 500 pour un artefact présent mais inutilisable
+    status = 404 if isinstance(error, UnknownModelError) else 500
+    return jsonify({"errors": str(error), "predictions": None, "version": model_version}), status
+
 
 
 @api_blueprint.route("/", methods=["GET"])
@@ -33,6 +103,22 @@ def health():
     return "ok", 200
 
 
+@api_blueprint.route("/ready", methods=["GET"])
+def ready():
+    """
+    Endpoint de disponibilité (readiness), distinct du contrôle de santé "/".
+
+    200 quand le modèle est chargé et échauffé (ou en préchargement "lazy"),
+    503 tant que l'échauffement n'est pas terminé ou s'il a échoué : le
+    répartiteur de charge n'envoie pas de trafic à ce worker en attendant.
+    """
+    readiness = current_app.extensions.get("readiness")
+    if readiness is None:
+        return jsonify({"ready": True, "state": "ready"}), 200
+    status = readiness.status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+
 @api_blueprint.route("/v1/predict/regression", methods=["POST"])
 def predict():
     """
@@ -47,46 +133,261 @@ def predict():
     }
 
     On accepte aussi directement une liste de dictionnaires pour plus de flexibilité.
+
+    Format en colonnes, conseillé pour les gros lots (pas de dictionnaire par maison) :
+    {
+        "columns": {"LotArea": [8450, 9600], "Street": ["Pave", "Pave"], ...}
+    }
+    Avec "Accept: application/vnd.ml-api.columnar+json", la réponse est elle
+    aussi en colonnes : {"columns": {"prediction": [...]}, "version": ..., "errors": ...}
+
+    Formats binaires (Content-Type pour la requête, Accept pour la réponse) :
+    MessagePack (application/msgpack), Arrow IPC (application/vnd.apache.arrow.stream)
+    et tableau NumPy structuré (application/x-npy). Voir api/formats.py.
+
+    Profilage à la demande : avec l'en-tête "X-Profile: 1" (ou ?profile=1),
+    la réponse contient un champ "profile" (durée de chaque étape, lignes
+    traitées, pic de mémoire allouée) ; avec "X-Profile: cprofile", on y
+    ajoute les fonctions les plus coûteuses. Sans cet en-tête, rien n'est mesuré.
+    Réservé aux requêtes authentifiées par ADMIN_TOKEN ("Authorization: Bearer
+    <jeton>"), sauf avec PROFILING_ENABLED ; sinon l'en-tête est ignoré.
+
+    Contrôle d'admission (ADMISSION_*, voir api/admission.py) : au-delà du
+    nombre de requêtes ou de lignes en cours, réponse 503 immédiate avec un
+    en-tête Retry-After ; corps ou lot trop gros pour être jamais admis : 413.
+
+    Délai : avec ?timeout_ms=<ms> (ou l'en-tête "X-Timeout-Ms"), les gros lots,
+    prédits par paquets de PREDICTION_CHUNK_SIZE lignes, s'arrêtent à
+    l'échéance : la réponse contient les prédictions déjà calculées, None pour
+    les autres, et leurs positions dans errors["unfinished_rows"].
+
+    Choix du modèle : ?model=<nom> (ou l'en-tête "X-Model: <nom>") sert un
+    autre artefact de trained_models/, chargé à la demande ; la liste des
+    modèles disponibles est donnée par /version. Modèle inconnu : 404.
     """
+    # Contrôle d'admission, avant de lire le corps de la requête
+    admission = current_app.extensions.get("admission")
+    if admission is None:
+        return _observed_predict(None)
+    try:
+        ticket = admission.admit(request.content_length)
+    except AdmissionRejected as rejection:
+        return _rejection_response(rejection)
+    with ticket:
+        if admission.max_body_bytes and request.content_length is None and _body_exceeds(admission.max_body_bytes):
+            return _rejection_response(admission.reject_body())
+        return _observed_predict(ticket)
+
+
+def _body_exceeds(max_bytes: int) -> bool:
+    ## Corps envoyé par morceaux (sans Content-Length) : lu dans le flux WSGI
+    ## avec un octet de marge, ce qui suffit à détecter un dépassement sans
+    ## tout lire. Un corps accepté est remis dans l'environnement WSGI, avec sa
+    ## taille, pour la suite du traitement (quelle que soit la version de Flask).
+    environ = request.environ
+    if not environ.get("wsgi.input_terminated"):
+        # Sans fin de flux garantie par le serveur, Werkzeug ne lit pas ce corps
+        return False
+    stream = environ["wsgi.input"]
+    body = b""
+    while len(body) <= max_bytes:
+        part = stream.read(max_bytes + 1 - len(body))
+        if not part:
+            break
+        body += part
+    if len(body) > max_bytes:
+        return True
+    environ["wsgi.input"] = io.BytesIO(body)
+    environ["CONTENT_LENGTH"] = str(len(body))
+    return False
+
+
+def _rejection_response(rejection: AdmissionRejected):
+    logger.warning(f"Prediction request rejected ({rejection.reason}): {rejection}")
+    body = {"errors": str(rejection), "predictions": None, "version": model_version}
+    return jsonify(body), rejection.status, rejection.headers()
+
+
+def _profiling_allowed() -> bool:
+    ## Le profilage ralentit toutes les requêtes du processus : pas pour n'importe quel client.
+    if current_app.config["PROFILING_ENABLED"]:
+        return True
+    return is_authorized(request.headers.get("Authorization"), current_app.config["ADMIN_TOKEN"])
+
+
+def _observed_predict(ticket):
+    """Mesures (métriques, profilage) autour du traitement de la requête."""
+    metrics = current_app.extensions.get("metrics")
+    profile_mode = requested_profile_mode(request.headers, request.args) if _profiling_allowed() else None
+    if metrics is None and profile_mode is None:
+        return _predict(ticket=ticket)
+
+    with ExitStack() as stack:
+        # Durée de chaque étape de la requête (lecture du JSON, validation,
+        # étapes du pipeline, sérialisation), publiée par /metrics
+        if metrics is not None:
+            stack.enter_context(observe_stages(metrics.observe))
+        profiler = stack.enter_context(RequestProfiler(profile_mode)) if profile_mode else None
+        with timed_stage("total"):
+            return _predict(profiler, ticket)
+
+
+def _read_inputs():
+    """Décode le corps de la requête selon son Content-Type (JSON par défaut)."""
+    binary = binary_mimetype(request.mimetype)
+    if binary is not None:
+        with timed_stage("payload_decode"):
+            return decode_binary_payload(binary, request.get_data())
+
     # Récupération des données JSON envoyées par le client
-    json_data = request.get_json()
+    with timed_stage("json_parse"):
+        json_data = request.get_json()
 
     # Vérification basique : le client a-t-il envoyé des données ?
     if json_data is None:
-        # Retour d'une erreur 400 (Bad Request) si pas de données
-        return jsonify(
-            {
-                "errors": "No input data provided",
-                "predictions": None,
-                "version": model_version,
-            }
-        ), 400
-
-    # On essaie de récupérer la clé "inputs" (format structuré recommandé)
-    inputs = json_data.get("inputs", None)
-
-    # Si "inputs" n'existe pas, on suppose que l'utilisateur a envoyé
-    # directement une liste de dictionnaires ou un dict unique
-    # (pour la compatibilité avec d'anciens clients)
-    if inputs is None:
-        inputs = json_data
-
-    # Log des données reçues pour la traçabilité
-    logger.info(f"Inputs received for prediction: {inputs}")
-    logger.info(f"Using model version: {model_version}")
+        raise PayloadError("No input data provided")
+
+    # Format en lignes ({"inputs": [...]}) ou en colonnes ({"columns": {...}})
+    with timed_stage("payload_decode"):
+        return parse_json_payload(json_data)
+
+
+def _predict(profiler: Optional[RequestProfiler] = None, ticket=None):
+    """Traitement d'une requête de prédiction (voir predict)."""
+    started = time.perf_counter()
+
+    # Lecture du corps de la requête (JSON, JSON en colonnes ou format binaire)
+    try:
+        deadline = requested_deadline(time.monotonic())
+        inputs = _read_inputs()
+    except PayloadError as error:
+        # 415 si le format binaire demandé n'est pas disponible, 400 sinon
+        status = 415 if isinstance(error, UnsupportedFormatError) else 400
+        return jsonify({"errors": str(error), "predictions": None, "version": model_version}), status
+
+    # Les lignes de la requête comptent dans la file tant qu'elle est traitée
+    if ticket is not None:
+        try:
+            ticket.reserve_rows(1 if isinstance(inputs, dict) else len(inputs))
+        except AdmissionRejected as rejection:
+            return _rejection_response(rejection)
+
+    # Log des données reçues pour la traçabilité : le contenu complet
+    # n'est journalisé que pour une fraction des requêtes (LOG_PAYLOAD_SAMPLE_RATE).
+    # Tirage fait une seule fois ici, puis transmis à make_prediction
+    log_payload = should_log_payload()
 
     # Appel à notre fonction de prédiction principale
-    # Celle-ci se charge de valider les données et de faire la prédiction
-    result = make_prediction(input_data=inputs)
+    # Celle-ci se charge de valider les données et de faire la prédiction.
+    # Si le regroupement est activé, la requête peut partager un lot avec d'autres.
+    # Une requête profilée n'est pas regroupée : ses étapes doivent
+    # s'exécuter dans ce thread pour être mesurées
+    # Les lots regroupés sont prédits par le modèle par défaut, sans échéance :
+    # une requête qui choisit un autre modèle ou un délai est traitée seule
+    model = requested_model()
+    coalescer = current_app.extensions.get("prediction_coalescer")
+    if coalescer is not None and profiler is None and model is None and deadline is None:
+        # Le lot regroupé ne journalise pas le contenu : c'est fait ici, pour cette requête
+        if log_payload:
+            logger.info("Inputs received for prediction: %s", inputs)
+        result = coalescer.predict(inputs)
+    else:
+        try:
+            result = make_prediction(
+                input_data=inputs,
+                use_cache=current_app.config["PREDICTION_CACHE_ENABLED"],
+                model=model,
+                deadline=deadline,
+                chunk_size=current_app.config["PREDICTION_CHUNK_SIZE"],
+                log_payload=log_payload,
+            )
+        except (UnknownModelError, ModelLoadError) as error:
+            logger.warning(f"Model {model!r} unavailable: {error}")
+            return _model_error_response(error)
+
+    predictions = result.get("predictions")
+
+    # Mode fantôme : le modèle candidat est évalué après coup, en arrière-plan
+    shadow = current_app.extensions.get("shadow_scorer")
+    if shadow is not None and predictions is not None and model is None:
+        shadow.submit(inputs, predictions)
+
+    metrics = current_app.extensions.get("metrics")
+    if metrics is not None and predictions is not None:
+        metrics.count_rows(len(predictions))
 
-    # Log des résultats pour le monitoring
-    logger.info(f"Prediction result: {result}")
+    # Log structuré pour le monitoring : taille du corps et durée. L'empreinte
+    # du corps (qui le parcourt en entier) n'est calculée que pour les requêtes
+    # dont le contenu est journalisé, pour rapprocher les deux messages
+    if logger.isEnabledFor(logging.INFO):
+        body = request.get_data()  # Déjà lu : pas de copie
+        fields = {"body_sha": payload_digest(body)} if log_payload else {}
+        logger.info(
+            format_fields(
+                event="predict_request",
+                version=model_version,
+                **fields,
+                body_bytes=len(body),
+                rows=len(predictions) if predictions is not None else 0,
+                errors=bool(result.get("errors")),
+                total_ms=(time.perf_counter() - started) * 1000.0,
+            )
+        )
+
+    # Résumé du profilage (la sérialisation, qui suit, n'y figure pas)
+    if profiler is not None:
+        result = {**result, "profile": profiler.report(rows=len(predictions) if predictions is not None else 0)}
 
     # Le résultat est déjà un dictionnaire bien formaté avec :
     # - "predictions" : les prix estimés
     # - "errors" : les problèmes éventuels
     # - "version" : la version du modèle utilisé
-    return jsonify(result), 200
+    with timed_stage("serialize"):
+        result = round_predictions(result, current_app.config["PREDICTION_DECIMALS"])
+        response = encode_response(result, negotiate_response_format(request.accept_mimetypes))
+    return response, 200
+
+
+@api_blueprint.route("/v1/predict/regression/stream", methods=["POST"])
+def predict_stream():
+    """
+    Endpoint de prédiction en flux, pour les gros volumes (re-scoring nocturne).
+
+    Le corps de la requête est au format NDJSON : une maison (objet JSON) par ligne.
+    La réponse est elle aussi en NDJSON, une ligne par maison, dans le même ordre :
+        {"row": 0, "prediction": 208500.0}
+        {"row": 1, "prediction": null, "errors": {"missing_columns": [...]}}
+
+    Les maisons sont lues et prédites par paquets (STREAMING_CHUNK_SIZE) et les
+    résultats sont renvoyés au fil de l'eau : la mémoire utilisée ne dépend pas
+    de la taille totale du corps de la requête.
+
+    Le modèle se choisit comme pour /v1/predict/regression (?model=, X-Model) ;
+    il est chargé avant le début de la réponse, pour pouvoir répondre 404.
+    """
+    chunk_size = current_app.config["STREAMING_CHUNK_SIZE"]
+    logger.info(f"Streaming prediction started (chunk size: {chunk_size})")
+
+    headers = {"X-Model-Version": model_version}
+    predict_fn = partial(make_prediction, chunk_size=current_app.config["PREDICTION_CHUNK_SIZE"])
+    model = requested_model()
+    if model is not None:
+        try:
+            load_model(model)
+        except (UnknownModelError, ModelLoadError) as error:
+            logger.warning(f"Model {model!r} unavailable: {error}")
+            return _model_error_response(error)
+        predict_fn = partial(predict_fn, model=model)
+        headers[MODEL_HEADER] = model
+
+    # request.stream est lu ligne par ligne, pendant l'envoi de la réponse
+    lines = stream_predictions(request.stream, chunk_size=chunk_size, predict_fn=predict_fn)
+    return Response(
+        stream_with_context(lines),
+        status=200,
+        mimetype=NDJSON_MIMETYPE,
+        headers=headers,
+    )
 
 
 @api_blueprint.route("/version", methods=["GET"])
@@ -98,9 +399,122 @@ def version():
     - Déboguer des problèmes de version
     - Vérifier quelle version est déployée
     - S'assurer de la compatibilité API/modèle
+
+    "models" liste les modèles de trained_models/ utilisables avec ?model= :
+    formats disponibles, chargé ou non, mémoire estimée (memory_bytes),
+    durée du dernier chargement (load_seconds) et dernière erreur.
     """
     response = {
         "api_version": api_version,      # Version de l'API (gérée dans ml_api)
         "model_version": model_version,  # Version du modèle (gérée dans regression_model)
+        "models": describe_models(),     # Modèles disponibles (registre des modèles)
+    }
+    return jsonify(response), 200
+
+
+@api_blueprint.route("/v1/stats", methods=["GET"])
+def stats():
+    """
+    Endpoint exposant les statistiques internes du service de prédiction.
+
+    - pipeline_cache   : chargements du modèle (hits, misses, reloads, durées)
+    - prediction_cache : taux de succès et mémoire du cache (None si désactivé)
+    - batching         : tailles des lots et délais d'attente (None si désactivé)
+    - models           : modèles résidents, mémoire estimée et évictions
+    - shadow           : écarts et latence du modèle candidat, requêtes
+                         évaluées et abandonnées (None si désactivé)
+    - workers          : requêtes et mémoire (RSS, PSS) de chaque worker du
+                         serveur multi-processus serve.py (None sinon)
+    - admission        : requêtes et lignes en cours, refus par raison
+    """
+    coalescer = current_app.extensions.get("prediction_coalescer")
+    shadow = current_app.extensions.get("shadow_scorer")
+    worker_table = current_app.extensions.get("worker_table")
+    admission = current_app.extensions.get("admission")
+    response = {
+        "pipeline_cache": get_pipeline_cache_stats(),
+        "prediction_cache": (
+            get_prediction_cache_stats() if current_app.config["PREDICTION_CACHE_ENABLED"] else None
+        ),
+        "batching": coalescer.stats() if coalescer is not None else None,
+        "models": get_model_registry_stats(),
+        "shadow": shadow.stats() if shadow is not None else None,
+        "workers": worker_table.snapshot() if worker_table is not None else None,
+        "admission": admission.stats() if admission is not None else None,
     }
-    return jsonify(response), 200
\ No newline at end of file
+    return jsonify(response), 200
+
+
+@api_blueprint.route("/admin/reload", methods=["POST"])
+def admin_reload():
+    """
+    Recharge à chaud le modèle depuis le disque, sans redémarrer le worker.
+
+    Authentification : en-tête "Authorization: Bearer <ADMIN_TOKEN>".
+    Le nouveau modèle est chargé et échauffé pendant que l'ancien continue
+    de répondre, puis échangé d'un coup ; les requêtes en cours finissent
+    sur l'ancien. ?force=1 recharge même si l'artefact n'a pas changé.
+
+    Réponse : empreintes avant/après, "swapped", et durées de chargement et
+    d'échauffement (s). En cas d'échec (500), l'ancien modèle reste servi.
+
+    Chaque worker a son propre modèle en mémoire : l'appel ne recharge que
+    le worker qui le reçoit.
+    """
+    admin_token = current_app.config["ADMIN_TOKEN"]
+    if not admin_token:
+        return jsonify({"error": "Admin endpoints are disabled"}), 404
+    if not is_authorized(request.headers.get("Authorization"), admin_token):
+        return jsonify({"error": "Unauthorized"}), 401, {"WWW-Authenticate": "Bearer"}
+
+    force = request.args.get("force", "").lower() in ("1", "true", "yes")
+    try:
+        report = reload_model(n_rows=current_app.config["MODEL_WARMUP_ROWS"], force=force)
+    except Exception as error:
+        logger.exception("Model reload failed")
+        return jsonify({"error": f"{type(error).__name__}: {error}", "swapped": False}), 500
+
+    logger.info(
+        format_fields(
+            event="model_reload",
+            swapped=report["swapped"],
+            sha256=report["sha256"][:12],
+            load_seconds=report["load_seconds"],
+            warmup_seconds=report["warmup_seconds"],
+        )
+    )
+    return jsonify(report), 200
+
+
+@api_blueprint.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Endpoint de métriques au format texte de Prometheus.
+
+    - ml_api_stage_duration_seconds : quantiles (p50, p95, p99), somme et nombre
+      de mesures pour chaque étape d'une requête de prédiction
+    - ml_api_requests_total         : requêtes traitées, par endpoint et code HTTP
+    - ml_api_predicted_rows_total   : nombre total de maisons prédites
+    - ml_api_in_flight_requests, ml_api_queued_rows, ml_api_rejected_requests_total :
+      profondeur de la file et refus du contrôle d'admission
+
+    Les étapes exécutées par le thread de regroupement (PREDICTION_COALESCING_ENABLED)
+    ne sont pas mesurées : seules la lecture du JSON et la sérialisation le sont.
+    """
+    recorder = current_app.extensions.get("metrics")
+    if recorder is None:
+        return "Metrics are disabled", 404
+    body = recorder.render()
+    admission = current_app.extensions.get("admission")
+    if admission is not None:
+        body += admission.render()
+    return Response(body, status=200, mimetype=PROMETHEUS_MIMETYPE)
+
+
+@api_blueprint.after_request
+def count_request(response):
+    """Compte chaque requête servie par le blueprint (endpoint, code HTTP)."""
+    recorder = current_app.extensions.get("metrics")
+    if recorder is not None:
+        recorder.count_request(request.endpoint or "unknown", response.status_code)
+    return response
@@ -0,0 +1,329 @@
+# packages/ml_api/api/formats.py
+#
+# Formats des requêtes et des réponses de /v1/predict/regression.
+#
+# Requête (choisie par le contenu ou le Content-Type) :
+#   - lignes   : {"inputs": [{...}, {...}]}   (format historique, par défaut)
+#   - colonnes : {"columns": {"LotArea": [...], "Street": [...], ...}}
+#
+# Réponse (choisie par l'en-tête Accept) :
+#   - application/json                      : {"predictions": [...], "version", "errors"}
+#   - application/vnd.ml-api.columnar+json  : {"columns": {"prediction": [...]}, "version", "errors"}
+#
+# Formats binaires (requête et réponse), si la bibliothèque est installée :
+#   - application/msgpack                   : mêmes structures que le JSON, en MessagePack
+#   - application/vnd.apache.arrow.stream   : table Arrow (une colonne par variable)
+#   - application/x-npy                     : tableau NumPy structuré (un champ par variable)
+# Les réponses Arrow et .npy ne contiennent que la colonne des prédictions ;
+# la version du modèle est dans l'en-tête X-Model-Version.
+
+import importlib
+import io
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from flask import Response, jsonify
+from werkzeug.datastructures import MIMEAccept
+
+JSON_MIMETYPE = "application/json"
+COLUMNAR_JSON_MIMETYPE = "application/vnd.ml-api.columnar+json"
+MSGPACK_MIMETYPE = "application/msgpack"
+ARROW_STREAM_MIMETYPE = "application/vnd.apache.arrow.stream"
+NPY_MIMETYPE = "application/x-npy"
+
+# Autres noms rencontrés pour les mêmes formats
+_MIMETYPE_ALIASES = {
+    "application/x-msgpack": MSGPACK_MIMETYPE,
+    "application/vnd.msgpack": MSGPACK_MIMETYPE,
+}
+
+# Bibliothèque optionnelle nécessaire à chaque format binaire (None : NumPy suffit)
+_BINARY_FORMAT_MODULES = {
+    MSGPACK_MIMETYPE: "msgpack",
+    ARROW_STREAM_MIMETYPE: "pyarrow",
+    NPY_MIMETYPE: None,
+}
+
+# Formats de réponse proposés, du format par défaut au plus spécifique
+RESPONSE_MIMETYPES = (JSON_MIMETYPE, COLUMNAR_JSON_MIMETYPE, MSGPACK_MIMETYPE, ARROW_STREAM_MIMETYPE, NPY_MIMETYPE)
+
+# Nom de la colonne des prédictions dans une réponse en colonnes
+PREDICTION_COLUMN = "prediction"
+
+
+class PayloadError(ValueError):
+    """Corps de requête mal formé (réponse 400)."""
+
+
+class UnsupportedFormatError(PayloadError):
+    """Format binaire dont la bibliothèque n'est pas installée (réponse 415)."""
+
+
+_modules: Dict[str, Optional[Any]] = {}
+
+
+def _optional_module(name: str) -> Optional[Any]:
+    """Importe une bibliothèque optionnelle une seule fois (None si absente)."""
+    if name not in _modules:
+        try:
+            _modules[name] = importlib.import_module(name)
+        except ImportError:
+            _modules[name] = None
+    return _modules[name]
+
+
+def _require_module(mimetype: str) -> Any:
+    module_name = _BINARY_FORMAT_MODULES[mimetype]
+    if module_name is None:
+        return None
+    module = _optional_module(module_name)
+    if module is None:
+        raise UnsupportedFormatError(f"{mimetype} requires the '{module_name}' package")
+    return module
+
+
+def is_available(mimetype: str) -> bool:
+    """Indique si le format peut être lu et écrit dans cet environnement."""
+    module_name = _BINARY_FORMAT_MODULES.get(mimetype)
+    return module_name is None or _optional_module(module_name) is not None
+
+
+def binary_mimetype(mimetype: str) -> Optional[str]:
+    """Nom canonique du format binaire d'une requête, ou None pour du JSON."""
+    mimetype = _MIMETYPE_ALIASES.get(mimetype, mimetype)
+    return mimetype if mimetype in _BINARY_FORMAT_MODULES else None
+
+
+def _column_array(values: List[Any]) -> Any:
+    """
+    Convertit une colonne JSON en tableau, en évitant l'inférence de pandas
+    quand le type est évident d'après la première valeur :
+      - texte  → tableau d'objets (comme pandas, qui garde None tel quel) ;
+      - nombre → float64 directement (None devient NaN).
+    Les autres cas (colonne vide, premier élément null...) passent par pandas :
+    le DataFrame obtenu est alors identique à celui du format en lignes.
+    """
+    first = values[0] if values else None
+    if isinstance(first, str):
+        array = np.empty(len(values), dtype=object)
+        array[:] = values
+        return array
+    if isinstance(first, (int, float)) and not isinstance(first, bool):
+        try:
+            return np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            pass  # Colonne mixte : inférence de pandas
+    return pd.Series(values)
+
+
+def columns_to_frame(columns: Any) -> pd.DataFrame:
+    """
+    Construit le DataFrame d'une requête en colonnes, une colonne à la fois.
+
+    Bien plus rapide et moins gourmand que pd.DataFrame(liste_de_dicts) :
+    pas de dictionnaire par maison, ni de recherche des clés ligne par ligne.
+    """
+    if not isinstance(columns, dict) or not columns:
+        raise PayloadError('"columns" must be a non-empty object mapping column names to lists')
+
+    lengths = set()
+    for name, values in columns.items():
+        if not isinstance(values, list):
+            raise PayloadError(f'Column "{name}" must be a list')
+        lengths.add(len(values))
+    if len(lengths) != 1:
+        raise PayloadError("All columns must have the same length")
+
+    return pd.DataFrame({name: _column_array(values) for name, values in columns.items()})
+
+
+def parse_json_payload(json_data: Any) -> Any:
+    """
+    Extrait les maisons à prédire d'un corps JSON.
+
+    Renvoie un DataFrame pour le format en colonnes, sinon les données telles
+    que make_prediction les accepte (liste de dictionnaires ou dictionnaire).
+    """
+    if isinstance(json_data, dict) and "columns" in json_data:
+        return columns_to_frame(json_data["columns"])
+
+    # On essaie de récupérer la clé "inputs" (format structuré recommandé)
+    inputs = json_data.get("inputs", None) if isinstance(json_data, dict) else None
+
+    # Si "inputs" n'existe pas, on suppose que l'utilisateur a envoyé
+    # directement une liste de dictionnaires ou un dict unique
+    # (pour la compatibilité avec d'anciens clients)
+    if inputs is None:
+        inputs = json_data
+    return inputs
+
+
+def _decode_npy(body: bytes) -> pd.DataFrame:
+    """
+    Lit un tableau .npy structuré sans copier le corps de la requête :
+    l'en-tête est analysé, puis les données sont vues en place (np.frombuffer).
+    Les champs texte à largeur fixe ne peuvent pas être nuls : une chaîne
+    vide y représente une valeur manquante.
+    """
+    stream = io.BytesIO(body)
+    try:
+        version = np.lib.format.read_magic(stream)
+        if version == (1, 0):
+            shape, _, dtype = np.lib.format.read_array_header_1_0(stream)
+        elif version == (2, 0):
+            shape, _, dtype = np.lib.format.read_array_header_2_0(stream)
+        else:
+            raise ValueError(f"unsupported format version {version}")
+    except ValueError as error:
+        raise PayloadError(f"Invalid .npy payload: {error}") from error
+    if dtype.names is None or len(shape) != 1 or dtype.hasobject:
+        raise PayloadError(".npy payloads must be 1-D structured arrays (one field per column)")
+
+    try:
+        records = np.frombuffer(body, dtype=dtype, count=shape[0], offset=stream.tell())
+    except ValueError as error:
+        raise PayloadError(f"Invalid .npy payload: {error}") from error
+
+    columns = {}
+    for name in dtype.names:
+        values = records[name]
+        if values.dtype.kind in "US":
+            text = values.astype(str).astype(object)
+            text[values == values.dtype.type()] = None
+            values = text
+        columns[name] = values
+    return pd.DataFrame(columns)
+
+
+def decode_binary_payload(mimetype: str, body: bytes) -> Any:
+    """
+    Décode le corps d'une requête binaire (voir binary_mimetype).
+
+    Lève UnsupportedFormatError si la bibliothèque du format manque,
+    PayloadError si le contenu est illisible.
+    """
+    module = _require_module(mimetype)
+    if mimetype == MSGPACK_MIMETYPE:
+        try:
+            data = module.unpackb(body, raw=False)
+        except Exception as error:  # msgpack lève plusieurs types d'exceptions
+            raise PayloadError(f"Invalid MessagePack payload: {error}") from error
+        return parse_json_payload(data)
+
+    if mimetype == ARROW_STREAM_MIMETYPE:
+        try:
+            # py_buffer ne copie pas le corps : les colonnes numériques sans
+            # valeurs nulles sont lues en place
+            table = module.ipc.open_stream(module.py_buffer(body)).read_all()
+        except module.ArrowException as error:
+            raise PayloadError(f"Invalid Arrow IPC payload: {error}") from error
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    return _decode_npy(body)
+
+
+def round_predictions(result: Dict[str, Any], decimals: Optional[int]) -> Dict[str, Any]:
+    """
+    Arrondit les prédictions à `decimals` décimales (None : pas d'arrondi).
+
+    Des prix arrondis au centime (ou à l'euro) donnent un JSON nettement
+    plus court que les 17 chiffres significatifs d'un float64. Les lignes
+    invalides (prédiction None) restent à None.
+    """
+    predictions = result.get("predictions")
+    if decimals is None or predictions is None:
+        return result
+    rounded = np.round(np.asarray(predictions, dtype=np.float64), decimals)
+    if result.get("errors"):
+        # None devient NaN dans le tableau : on le rétablit
+        rounded = np.where(np.isnan(rounded), None, rounded.astype(object))
+    return {**result, "predictions": rounded.tolist()}
+
+
+def negotiate_response_format(accept: MIMEAccept) -> str:
+    """Format de réponse préféré par le client parmi ceux disponibles (JSON par défaut)."""
+    offered = [mimetype for mimetype in RESPONSE_MIMETYPES if is_available(mimetype)]
+    return accept.best_match(offered, default=JSON_MIMETYPE)
+
+
+def _encode_predictions(result: Dict[str, Any], mimetype: str) -> bytes:
+    """Prédictions seules, en Arrow IPC ou en .npy (float64)."""
+    predictions = np.asarray(result["predictions"], dtype=np.float64)
+    if mimetype == NPY_MIMETYPE:
+        buffer = io.BytesIO()
+        np.save(buffer, predictions, allow_pickle=False)
+        return buffer.getvalue()
+
+    pa = _require_module(ARROW_STREAM_MIMETYPE)
+    table = pa.table({PREDICTION_COLUMN: predictions})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_response(result: Dict[str, Any], mimetype: str) -> Response:
+    """Sérialise le résultat de make_prediction dans le format demandé."""
+    if mimetype == MSGPACK_MIMETYPE:
+        msgpack = _require_module(MSGPACK_MIMETYPE)
+        return Response(msgpack.packb(result, use_bin_type=True), mimetype=MSGPACK_MIMETYPE)
+
+    # Arrow et .npy ne transportent que les prédictions : en cas d'erreur de
+    # validation (lot rejeté ou lignes écartées), la réponse reste en JSON
+    # pour que le client reçoive le détail des erreurs
+    if mimetype in (ARROW_STREAM_MIMETYPE, NPY_MIMETYPE) and not result.get("errors"):
+        return Response(
+            _encode_predictions(result, mimetype),
+            mimetype=mimetype,
+            headers={"X-Model-Version": result.get("version", "")},
+        )
+
+    if mimetype == COLUMNAR_JSON_MIMETYPE:
+        predictions = result.get("predictions")
+        payload = {key: value for key, value in result.items() if key != "predictions"}
+        payload["columns"] = {PREDICTION_COLUMN: predictions} if predictions is not None else None
+        response = jsonify(payload)
+        response.mimetype = COLUMNAR_JSON_MIMETYPE
+        return response
+    return jsonify(result)
+
+
+def _orjson_default(value: Any) -> Any:
+    # Types que orjson ne connaît pas nativement (scalaires NumPy, dates...)
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def make_orjson_provider(app: Any) -> Optional[Any]:
+    """
+    Fournisseur JSON de Flask basé sur orjson (bien plus rapide que le module
+    json standard pour les grandes listes de nombres), ou None si orjson ou
+    les fournisseurs JSON (Flask >= 2.2) ne sont pas disponibles.
+
+    Les clés sont triées, comme avec le fournisseur par défaut de Flask.
+    Seule l'écriture passe par orjson : la lecture reste celle du module json,
+    qui accepte les NaN envoyés par json.dumps (valeurs manquantes).
+    """
+    orjson = _optional_module("orjson")
+    try:
+        from flask.json.provider import DefaultJSONProvider
+    except ImportError:
+        return None
+    if orjson is None:
+        return None
+
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+    class OrjsonProvider(DefaultJSONProvider):
+        def dumps(self, obj: Any, **kwargs: Any) -> str:
+            return orjson.dumps(obj, default=_orjson_default, option=options).decode("utf-8")
+
+        def response(self, *args: Any, **kwargs: Any) -> Response:
+            # Octets produits directement par orjson : pas de passage par str
+            obj = self._prepare_response_obj(args, kwargs)
+            body = orjson.dumps(obj, default=_orjson_default, option=options | orjson.OPT_APPEND_NEWLINE)
+            return self._app.response_class(body, mimetype=self.mimetype)
+
+    return OrjsonProvider(app)
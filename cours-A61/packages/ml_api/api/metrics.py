@@ -0,0 +1,103 @@
+# packages/ml_api/api/metrics.py
+
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+# Type MIME du format texte d'exposition de Prometheus
+PROMETHEUS_MIMETYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Quantiles publiés pour chaque étape
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Nombre de mesures récentes conservées par étape pour calculer les quantiles
+_SAMPLES_PER_STAGE = 1024
+
+
+class _StageStats:
+    """Compteurs d'une étape : nombre, somme et dernières durées observées."""
+
+    __slots__ = ("count", "total", "samples")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.samples: Deque[float] = deque(maxlen=_SAMPLES_PER_STAGE)
+
+
+def _escape(value: str) -> str:
+    # Échappement des valeurs de labels (format texte de Prometheus)
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class StageMetrics:
+    """
+    Enregistreur en mémoire des durées d'étapes et des compteurs de requêtes.
+
+    observe() est appelé à la fin de chaque étape d'une prédiction (voir
+    regression_model.timing) : il ne fait qu'incrémenter deux compteurs et
+    ajouter la durée à une file bornée, soit une à deux microsecondes.
+    Les quantiles ne sont calculés qu'au moment de la lecture (render).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stages: Dict[str, _StageStats] = {}
+        self._requests: Dict[Tuple[str, int], int] = {}
+        self._rows = 0
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Enregistre la durée d'une étape (compatible avec timing.observe_stages)."""
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = _StageStats()
+            stats.count += 1
+            stats.total += seconds
+            stats.samples.append(seconds)
+
+    def count_request(self, endpoint: str, status: int) -> None:
+        with self._lock:
+            key = (endpoint, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+    def count_rows(self, n_rows: int) -> None:
+        with self._lock:
+            self._rows += n_rows
+
+    def render(self) -> str:
+        """Toutes les métriques au format texte d'exposition de Prometheus."""
+        with self._lock:
+            stages = {
+                name: (stats.count, stats.total, sorted(stats.samples))
+                for name, stats in self._stages.items()
+            }
+            requests = dict(self._requests)
+            rows = self._rows
+
+        lines: List[str] = [
+            "# HELP ml_api_stage_duration_seconds Duration of each stage of a prediction request.",
+            "# TYPE ml_api_stage_duration_seconds summary",
+        ]
+        for name in sorted(stages):
+            count, total, samples = stages[name]
+            label = f'stage="{_escape(name)}"'
+            for q in QUANTILES:
+                value = samples[min(len(samples) - 1, int(q * len(samples)))] if samples else float("nan")
+                lines.append(f'ml_api_stage_duration_seconds{{{label},quantile="{q}"}} {value!r}')
+            lines.append(f"ml_api_stage_duration_seconds_sum{{{label}}} {total!r}")
+            lines.append(f"ml_api_stage_duration_seconds_count{{{label}}} {count}")
+
+        lines += [
+            "# HELP ml_api_requests_total Requests handled, by endpoint and HTTP status.",
+            "# TYPE ml_api_requests_total counter",
+        ]
+        for (endpoint, status), count in sorted(requests.items()):
+            lines.append(f'ml_api_requests_total{{endpoint="{_escape(endpoint)}",status="{status}"}} {count}')
+
+        lines += [
+            "# HELP ml_api_predicted_rows_total Rows (houses) predicted.",
+            "# TYPE ml_api_predicted_rows_total counter",
+            f"ml_api_predicted_rows_total {rows}",
+        ]
+        return "\n".join(lines) + "\n"
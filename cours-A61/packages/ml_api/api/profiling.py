@@ -0,0 +1,131 @@
+# packages/ml_api/api/profiling.py
+
+import cProfile
+import pstats
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List, Mapping, Optional
+
+from regression_model.timing import add_stage_observer, remove_stage_observer
+
+# En-tête HTTP (ou paramètre ?profile=...) qui active le profilage d'une requête
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "profile"
+
+# "timing"   : durée de chaque étape, lignes traitées, pic de mémoire allouée
+# "cprofile" : la même chose, plus les fonctions les plus coûteuses (cProfile)
+PROFILE_MODES = ("timing", "cprofile")
+
+# Nombre de fonctions rapportées en mode "cprofile"
+CPROFILE_TOP_FUNCTIONS = 25
+
+# tracemalloc est global au processus : une seule requête à la fois le pilote
+_tracemalloc_lock = threading.Lock()
+
+
+def requested_profile_mode(headers: Mapping[str, str], args: Mapping[str, str]) -> Optional[str]:
+    """
+    Mode de profilage demandé par le client, ou None (cas normal).
+
+    X-Profile: 1 (ou ?profile=1, true, timing) → "timing" ;
+    X-Profile: cprofile (ou ?profile=cprofile)  → "cprofile".
+    """
+    value = headers.get(PROFILE_HEADER) or args.get(PROFILE_QUERY_PARAM)
+    if not value:
+        return None
+    value = value.strip().lower()
+    if value in ("0", "false", "no", "off"):
+        return None
+    return "cprofile" if value == "cprofile" else "timing"
+
+
+def _cprofile_summary(profile: cProfile.Profile) -> List[Dict[str, Any]]:
+    """Fonctions les plus coûteuses (temps cumulé), sous une forme sérialisable en JSON."""
+    stats = pstats.Stats(profile).stats
+    ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        {
+            "function": f"{file_name}:{line}({function})",
+            "calls": n_calls,
+            "total_ms": total * 1000.0,
+            "cumulative_ms": cumulative * 1000.0,
+        }
+        for (file_name, line, function), (_, n_calls, total, cumulative, _) in ranked[:CPROFILE_TOP_FUNCTIONS]
+    ]
+
+
+class RequestProfiler:
+    """
+    Profilage d'une seule requête, activé à la demande.
+
+    À utiliser comme gestionnaire de contexte autour du traitement de la
+    requête : il reçoit la durée des étapes de make_prediction (voir
+    regression_model.timing), suit le pic de mémoire allouée avec tracemalloc
+    et, en mode "cprofile", enregistre les appels de fonctions du thread courant.
+
+    tracemalloc suit tout le processus : pendant la mesure, toutes les
+    allocations sont ralenties, et le pic rapporté inclut celles des autres
+    requêtes en cours. D'où l'accès restreint (voir le contrôleur).
+    """
+
+    def __init__(self, mode: str = "timing") -> None:
+        self.mode = mode
+        self.stages: Dict[str, float] = {}
+        self._token = None
+        self._owns_tracemalloc = False
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._peak_memory: Optional[int] = None
+
+    def observe(self, stage: str, seconds: float) -> None:
+        # Une étape répétée (ex : plusieurs paquets) voit ses durées additionnées
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def __enter__(self) -> "RequestProfiler":
+        self._token = add_stage_observer(self.observe)
+        # Si une autre requête profilée mesure déjà la mémoire, on s'en passe
+        if _tracemalloc_lock.acquire(blocking=False):
+            if tracemalloc.is_tracing():
+                _tracemalloc_lock.release()
+            else:
+                self._owns_tracemalloc = True
+                tracemalloc.start()
+        if self.mode == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self._started = time.perf_counter()
+        return self
+
+    def stop(self) -> None:
+        """Arrête les mesures (appelé par report() ou à la sortie du bloc)."""
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._owns_tracemalloc:
+            _, self._peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+            _tracemalloc_lock.release()
+        if self._token is not None:
+            remove_stage_observer(self._token)
+            self._token = None
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def report(self, rows: int) -> Dict[str, Any]:
+        """Résumé renvoyé au client dans le champ "profile" de la réponse."""
+        total = time.perf_counter() - self._started
+        self.stop()
+        report: Dict[str, Any] = {
+            "mode": self.mode,
+            "rows": rows,
+            "total_ms": total * 1000.0,
+            "stages_ms": {stage: seconds * 1000.0 for stage, seconds in self.stages.items()},
+            # Pic du processus entier pendant la requête : les allocations des
+            # autres threads (requêtes traitées en même temps) y sont comptées.
+            # None si la mémoire était déjà suivie par une autre requête
+            "peak_memory_bytes": self._peak_memory,
+        }
+        if self._cprofile is not None:
+            report["cprofile"] = _cprofile_summary(self._cprofile)
+        return report
@@ -0,0 +1,90 @@
+# packages/ml_api/api/readiness.py
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from regression_model.warmup import warm_up
+
+logger = logging.getLogger("ml_api")
+
+# Modes de préchargement du modèle (paramètre MODEL_PRELOAD) :
+#   - "lazy"       : rien au démarrage, le modèle est chargé par la première requête ;
+#   - "eager"      : create_app charge le modèle et l'échauffe avant de rendre la main
+#                    (une erreur de chargement empêche l'application de démarrer) ;
+#   - "background" : même chose dans un thread ; /ready répond 503 en attendant.
+PRELOAD_MODES = ("lazy", "eager", "background")
+
+
+class Readiness:
+    """
+    État de préparation de l'application, exposé par l'endpoint /ready.
+
+    Distinct du simple contrôle de santé ("/") : le processus peut être vivant
+    sans être prêt à servir des prédictions rapides.
+    """
+
+    def __init__(self, mode: str, warmup_rows: int) -> None:
+        if mode not in PRELOAD_MODES:
+            raise ValueError(f"Unknown preload mode {mode!r}, expected one of {PRELOAD_MODES}")
+        self.mode = mode
+        self.warmup_rows = warmup_rows
+        self._lock = threading.Lock()
+        # En mode "lazy", il n'y a rien à attendre
+        self._state = "ready" if mode == "lazy" else "starting"
+        self._error: Optional[str] = None
+        self._timings: Dict[str, Any] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "Readiness":
+        """Lance le préchargement selon le mode choisi."""
+        if self.mode == "eager":
+            self._run(raise_errors=True)
+        elif self.mode == "background":
+            self._thread = threading.Thread(target=self._run, name="model-warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Attend la fin de l'échauffement en arrière-plan ; True si l'application est prête."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.is_ready()
+
+    def is_ready(self) -> bool:
+        return self._state == "ready"
+
+    def _run(self, raise_errors: bool = False) -> None:
+        with self._lock:
+            self._state = "warming_up"
+        started = time.perf_counter()
+        try:
+            timings = warm_up(self.warmup_rows)
+        except Exception as error:
+            logger.exception("Model warm-up failed")
+            with self._lock:
+                self._state = "failed"
+                self._error = f"{type(error).__name__}: {error}"
+            if raise_errors:
+                raise
+            return
+        timings["total_seconds"] = time.perf_counter() - started
+        with self._lock:
+            self._timings = timings
+            self._state = "ready"
+        logger.info(
+            f"Model ready ({self.mode} preload): loaded in {timings['load_seconds']:.3f}s, "
+            f"warmed up on {timings['rows']} rows in {timings['warmup_seconds']:.3f}s"
+        )
+
+    def status(self) -> Dict[str, Any]:
+        """Réponse de /ready : état, mode, erreur éventuelle et durées du préchargement."""
+        with self._lock:
+            return {
+                "ready": self._state == "ready",
+                "state": self._state,
+                "preload": self.mode,
+                "error": self._error,
+                "warmup": dict(self._timings) or None,
+            }
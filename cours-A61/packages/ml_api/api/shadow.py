@@ -0,0 +1,179 @@
+# packages/ml_api/api/shadow.py
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+from regression_model.predict import make_prediction
+
+logger = logging.getLogger("ml_api")
+
+# Nombre de mesures récentes conservées pour les percentiles (latence, écarts)
+_SHADOW_SAMPLES = 2048
+
+
+class _ShadowJob(NamedTuple):
+    """Une requête déjà servie, à rejouer sur le modèle candidat."""
+
+    inputs: Any
+    primary: List[Optional[float]]  # Prédictions renvoyées au client
+    enqueued_at: float
+
+
+def _percentiles(samples: List[float], scale: float = 1.0) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    ordered = sorted(samples)
+
+    def at(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * scale
+
+    return {"p50": at(0.50), "p95": at(0.95), "p99": at(0.99), "max": ordered[-1] * scale}
+
+
+class ShadowScorer:
+    """
+    Évaluation "fantôme" d'un modèle candidat sur le trafic réel.
+
+    Après chaque prédiction servie, submit() dépose les entrées et les
+    prédictions renvoyées dans une file bornée ; `workers` threads les
+    rejouent sur le modèle candidat (désigné par son nom dans trained_models/,
+    voir le registre des modèles) et enregistrent l'écart candidat - servi et
+    la latence du candidat. Le client n'attend jamais ce travail.
+
+    Quand la file est pleine, la requête n'est pas évaluée (elle est comptée
+    dans "dropped") : le mode fantôme ne crée jamais de contre-pression sur
+    le service principal. Les threads partagent tout de même le processeur
+    (et le GIL) avec les requêtes : gardez `workers` petit.
+    """
+
+    def __init__(
+        self,
+        candidate_model: str,
+        workers: int = 1,
+        max_queue_size: int = 100,
+        predict_fn: Callable[..., Dict[str, Any]] = make_prediction,
+    ) -> None:
+        self.candidate_model = candidate_model
+        self.max_queue_size = max_queue_size
+        self._predict_fn = predict_fn
+        self._queue: "queue.Queue[_ShadowJob]" = queue.Queue(maxsize=max_queue_size)
+
+        # Statistiques (protégées par un verrou, lues par stats())
+        self._stats_lock = threading.Lock()
+        self._submitted = 0
+        self._dropped = 0
+        self._completed = 0
+        self._failed = 0
+        self._rows = 0
+        self._compared_rows = 0
+        self._sum_delta = 0.0
+        self._sum_abs_delta = 0.0
+        self._sum_relative_delta = 0.0
+        self._latencies: deque = deque(maxlen=_SHADOW_SAMPLES)
+        self._abs_deltas: deque = deque(maxlen=_SHADOW_SAMPLES)
+        self._last_error: Optional[str] = None
+
+        self._stopped = threading.Event()
+        self._workers = [
+            threading.Thread(target=self._run, name=f"shadow-scorer-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, inputs: Any, primary_predictions: List[Optional[float]]) -> bool:
+        """Dépose une requête servie dans la file ; False si elle a été abandonnée."""
+        try:
+            self._queue.put_nowait(_ShadowJob(inputs, primary_predictions, time.perf_counter()))
+        except queue.Full:
+            with self._stats_lock:
+                self._dropped += 1
+            return False
+        with self._stats_lock:
+            self._submitted += 1
+        return True
+
+    def close(self, timeout: float = 1.0) -> None:
+        """Arrête les threads (les requêtes déjà en file sont évaluées)."""
+        self._stopped.set()
+        for worker in self._workers:
+            worker.join(timeout=timeout)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set() or not self._queue.empty():
+            try:
+                job = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            try:
+                self._score(job)
+            except Exception as error:
+                # Le modèle candidat ne doit jamais gêner le service principal
+                logger.warning(f"Shadow scoring with {self.candidate_model!r} failed: {error}")
+                with self._stats_lock:
+                    self._failed += 1
+                    self._last_error = f"{type(error).__name__}: {error}"
+            finally:
+                self._queue.task_done()
+
+    def _score(self, job: _ShadowJob) -> None:
+        started = time.perf_counter()
+        result = self._predict_fn(input_data=job.inputs, model=self.candidate_model)
+        latency = time.perf_counter() - started
+
+        # Écarts sur les lignes prédites par les deux modèles (None : ligne invalide)
+        pairs = [
+            (primary, candidate)
+            for primary, candidate in zip(job.primary, result.get("predictions") or ())
+            if primary is not None and candidate is not None
+        ]
+        if pairs:
+            primary, candidate = np.array(pairs, dtype=np.float64).T
+            delta = candidate - primary
+            abs_delta = np.abs(delta)
+            relative = abs_delta / np.maximum(np.abs(primary), np.finfo(np.float64).tiny)
+        with self._stats_lock:
+            self._completed += 1
+            self._rows += len(job.primary)
+            self._latencies.append(latency)
+            if pairs:
+                self._compared_rows += len(pairs)
+                self._sum_delta += float(delta.sum())
+                self._sum_abs_delta += float(abs_delta.sum())
+                self._sum_relative_delta += float(relative.sum())
+                self._abs_deltas.extend(abs_delta.tolist())
+
+    def wait(self) -> None:
+        """Attend que toutes les requêtes en file soient évaluées (tests, arrêt propre)."""
+        self._queue.join()
+
+    def stats(self) -> Dict[str, Any]:
+        """Écarts de prédiction et latence du candidat, requêtes évaluées et abandonnées."""
+        with self._stats_lock:
+            compared = self._compared_rows
+            return {
+                "candidate_model": self.candidate_model,
+                "workers": len(self._workers),
+                "max_queue_size": self.max_queue_size,
+                "queued": self._queue.qsize(),
+                "submitted": self._submitted,
+                "dropped": self._dropped,
+                "completed": self._completed,
+                "failed": self._failed,
+                "last_error": self._last_error,
+                "rows": self._rows,
+                "compared_rows": compared,
+                "delta": {
+                    # Écart moyen (biais) du candidat par rapport au modèle servi
+                    "mean": self._sum_delta / compared if compared else None,
+                    "mean_abs": self._sum_abs_delta / compared if compared else None,
+                    "mean_relative": self._sum_relative_delta / compared if compared else None,
+                    "abs": _percentiles(list(self._abs_deltas)),
+                },
+                "latency_ms": _percentiles(list(self._latencies), scale=1000.0),
+            }
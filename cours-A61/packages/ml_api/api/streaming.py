@@ -0,0 +1,110 @@
+# packages/ml_api/api/streaming.py
+
+import json
+import logging
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from regression_model.predict import make_prediction
+from regression_model.processing.validation import validate_record
+
+logger = logging.getLogger("ml_api")
+
+# Type MIME du format "newline-delimited JSON" (une maison par ligne)
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+# Une ligne du flux en attente : (numéro de ligne, maison valide ou None, erreurs)
+_Entry = Tuple[int, Optional[Dict[str, Any]], Dict[str, Any]]
+
+
+def _parse_line(line: bytes) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    """Décode une ligne NDJSON et vérifie la maison qu'elle contient."""
+    try:
+        record = json.loads(line)
+    except ValueError as error:
+        return None, {"invalid_json": str(error)}
+
+    errors = validate_record(record)
+    if errors:
+        return None, errors
+    return record, {}
+
+
+def _format_line(row: int, prediction: Optional[float], errors: Dict[str, Any]) -> str:
+    line: Dict[str, Any] = {"row": row, "prediction": prediction}
+    if errors:
+        line["errors"] = errors
+    return json.dumps(line) + "\n"
+
+
+def _flush(
+    entries: List[_Entry], predict_fn: Callable[..., Dict[str, Any]]
+) -> Iterator[str]:
+    """Prédit les maisons valides d'un paquet et renvoie les lignes dans l'ordre."""
+    records = [record for _, record, _ in entries if record is not None]
+    predictions: List[Any] = []
+    chunk_errors: Dict[str, Any] = {}
+    # Valeurs invalides, par position dans `records`
+    row_errors: Dict[int, Dict[str, Any]] = {}
+    if records:
+        try:
+            result = predict_fn(input_data=records)
+        except Exception as error:
+            # Ex : modèle devenu illisible. La réponse a déjà commencé : on ne peut
+            # plus renvoyer d'erreur HTTP, l'échec est donc rapporté sur chaque ligne
+            logger.exception("Streaming prediction failed for a chunk")
+            result = {"predictions": None, "errors": {"prediction": f"failed: {type(error).__name__}: {error}"}}
+        if result.get("predictions") is None:
+            # Erreur au niveau du paquet : on la rapporte sur chacune de ses lignes
+            chunk_errors = result.get("errors") or {"prediction": "failed"}
+        else:
+            predictions = list(result["predictions"])
+            for entry in (result.get("errors") or {}).get("invalid_rows", ()):
+                row_errors[entry["row"]] = {"invalid_values": entry["invalid_values"]}
+
+    position = 0
+    for row, record, errors in entries:
+        if record is None:
+            yield _format_line(row, None, errors)
+        elif chunk_errors:
+            yield _format_line(row, None, chunk_errors)
+        else:
+            prediction = predictions[position]
+            yield _format_line(
+                row,
+                None if prediction is None else float(prediction),
+                row_errors.get(position, {}),
+            )
+            position += 1
+
+
+def stream_predictions(
+    lines: Iterable[bytes],
+    chunk_size: int,
+    predict_fn: Callable[..., Dict[str, Any]] = make_prediction,
+) -> Iterator[str]:
+    """
+    Prédit un flux NDJSON par paquets de `chunk_size` lignes.
+
+    Pour chaque ligne non vide (numérotée à partir de 0), on produit une ligne
+    de sortie {"row": i, "prediction": ...}, dans l'ordre d'arrivée. Une ligne
+    illisible, incomplète ou aux valeurs invalides donne
+    {"row": i, "prediction": null, "errors": {...}} sans interrompre le flux ;
+    de même pour chaque ligne d'un paquet dont la prédiction lève une exception.
+
+    Seul le paquet en cours est gardé en mémoire : la consommation reste bornée
+    quelle que soit la taille totale du flux.
+    """
+    entries: List[_Entry] = []
+    row = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        record, errors = _parse_line(line)
+        entries.append((row, record, errors))
+        row += 1
+        if len(entries) >= chunk_size:
+            yield from _flush(entries, predict_fn)
+            entries = []
+
+    if entries:
+        yield from _flush(entries, predict_fn)
@@ -15,18 +15,27 @@ class PredictionResultSchema(Schema):
     
     Structure attendue :
     {
-        "predictions": [12.5, 24.8, 30.1, ...],  # Liste des prix estimés
+        "predictions": [12.5, 24.8, 30.1, ...],  # Liste des prix estimés (null : ligne invalide)
         "version": "0.1.0",                      # Version du modèle utilisé
         "errors": null                           # Aucune erreur (ou dict si problème)
     }
+
+    Le champ "profile" n'est présent que pour les requêtes profilées
+    (en-tête X-Profile) : durées des étapes, lignes, pic de mémoire.
     """
 
     predictions = fields.List(
-        fields.Float(),  # Chaque prédiction doit être un nombre décimal
+        # Chaque prédiction est un nombre décimal, ou None pour une ligne
+        # écartée par la validation (détail dans errors["invalid_rows"])
+        fields.Float(allow_none=True),
         required=True    # Ce champ est obligatoire dans la réponse
     )
     version = fields.String(required=True)  # La version doit être une chaîne de caractères
     # On autorise deux formats pour les erreurs :
     # - None (null en JSON) lorsqu'il n'y a pas d'erreur
     # - Un dictionnaire contenant les détails des erreurs
-    errors = fields.Raw(allow_none=True, required=True)
\ No newline at end of file
+    errors = fields.Raw(allow_none=True, required=True)
+    # Nom du modèle utilisé, uniquement si le client en a choisi un (?model=)
+    model = fields.String(required=False)
+    # Détail du profilage, uniquement si le client l'a demandé
+    profile = fields.Dict(required=False, allow_none=True)
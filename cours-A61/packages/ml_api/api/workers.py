@@ -0,0 +1,117 @@
+# packages/ml_api/api/workers.py
+
+import multiprocessing
+import os
+import resource
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Colonnes de la table partagée, une ligne par worker
+_FIELDS = ("pid", "started_at", "requests", "restarts", "rss_bytes", "pss_bytes", "updated_at")
+_PID, _STARTED_AT, _REQUESTS, _RESTARTS, _RSS, _PSS, _UPDATED_AT = range(len(_FIELDS))
+
+# Intervalle minimal (s) entre deux lectures de la mémoire d'un worker
+MEMORY_REFRESH_SECONDS = 1.0
+
+
+def process_memory() -> Tuple[int, Optional[int]]:
+    """
+    Mémoire du processus courant, en octets : (RSS, PSS).
+
+    Le PSS (Linux, /proc/self/smaps_rollup) répartit les pages partagées
+    entre les processus qui les utilisent : c'est lui qui montre ce que le
+    partage copy-on-write du modèle fait gagner. Sans /proc, seul le pic de
+    RSS est connu (getrusage) et le PSS vaut None.
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as rollup:
+            values = {}
+            for line in rollup:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    values[key] = int(rest.split()[0]) * 1024
+            return values["Rss"], values.get("Pss")
+    except (OSError, KeyError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024, None
+
+
+class WorkerTable:
+    """
+    Statistiques des workers d'un serveur multi-processus (voir serve.py).
+
+    La table est créée par le processus maître avant les fork, dans une
+    mémoire partagée : chaque worker écrit sa propre ligne (requêtes
+    servies, mémoire), et n'importe lequel d'entre eux peut lire celles de
+    tous les autres pour répondre à /v1/stats.
+    """
+
+    def __init__(self, n_workers: int) -> None:
+        self.n_workers = n_workers
+        self._values = multiprocessing.RawArray("d", n_workers * len(_FIELDS))
+        # Ligne du worker courant (None dans le processus maître)
+        self.index: Optional[int] = None
+        self._lock = threading.Lock()
+        self._memory_read_at = 0.0
+
+    def _set(self, index: int, field: int, value: float) -> None:
+        self._values[index * len(_FIELDS) + field] = value
+
+    def _get(self, index: int, field: int) -> float:
+        return self._values[index * len(_FIELDS) + field]
+
+    def register(self, index: int, pid: int) -> None:
+        """Le maître attribue la ligne `index` à un worker qui vient d'être créé."""
+        if self._get(index, _PID):
+            # Remplacement d'un worker arrêté ou planté
+            self._set(index, _RESTARTS, self._get(index, _RESTARTS) + 1)
+        self._set(index, _PID, pid)
+        self._set(index, _STARTED_AT, time.time())
+        for field in (_REQUESTS, _RSS, _PSS, _UPDATED_AT):
+            self._set(index, field, 0.0)
+
+    def attach(self, index: int) -> None:
+        """Appelé par le worker après le fork : ses compteurs iront dans la ligne `index`."""
+        self.index = index
+        self._lock = threading.Lock()
+        self._refresh_memory(time.time())
+
+    def count_request(self) -> None:
+        """Compte une requête du worker courant (et relit sa mémoire au plus une fois par seconde)."""
+        if self.index is None:
+            return
+        now = time.time()
+        with self._lock:
+            self._set(self.index, _REQUESTS, self._get(self.index, _REQUESTS) + 1)
+            if now - self._memory_read_at >= MEMORY_REFRESH_SECONDS:
+                self._refresh_memory(now)
+
+    def _refresh_memory(self, now: float) -> None:
+        rss, pss = process_memory()
+        self._set(self.index, _RSS, rss)
+        self._set(self.index, _PSS, pss if pss is not None else -1)
+        self._set(self.index, _UPDATED_AT, now)
+        self._memory_read_at = now
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Une entrée par worker : pid, requêtes, redémarrages, RSS et PSS (octets)."""
+        if self.index is not None:
+            with self._lock:
+                self._refresh_memory(time.time())
+        workers = []
+        for index in range(self.n_workers):
+            pss = self._get(index, _PSS)
+            workers.append(
+                {
+                    "index": index,
+                    "pid": int(self._get(index, _PID)) or None,
+                    "current": index == self.index and os.getpid() == int(self._get(index, _PID)),
+                    "started_at": self._get(index, _STARTED_AT) or None,
+                    "requests": int(self._get(index, _REQUESTS)),
+                    "restarts": int(self._get(index, _RESTARTS)),
+                    "rss_bytes": int(self._get(index, _RSS)) or None,
+                    "pss_bytes": int(pss) if pss > 0 else None,
+                    "memory_updated_at": self._get(index, _UPDATED_AT) or None,
+                }
+            )
+        return workers
@@ -0,0 +1,174 @@
+## benchmarks/bench_startup.py ##
+#
+# Démarrage à froid d'un worker de l'API : chaque mesure est faite dans un
+# nouveau processus Python, comme pour un worker lancé par l'autoscaling.
+#   - import de api.app (qui crée l'application) ;
+#   - temps jusqu'à la première prédiction (import + chargement du modèle +
+#     première requête), pour chaque format d'artefact (.pkl et mmap) ;
+#   - modules lourds chargés avant la première réponse (sklearn, scipy, joblib...) ;
+#   - les modules les plus coûteux d'après `python -X importtime`.
+#
+# Avec --output, les mesures sont écrites dans le même format JSON que
+# regression_model/benchmarks/bench_suite.py, dont le mode "compare" détecte
+# les régressions d'une version à l'autre.
+#
+# Utilisation (depuis packages/ml_api) :
+#   PYTHONPATH=../regression_model:. python benchmarks/bench_startup.py --repeat 5
+#   PYTHONPATH=../regression_model:. python benchmarks/bench_startup.py --output startup.json
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+ARTIFACT_FORMATS = ("pkl", "mmap")
+
+# Paquets dont la présence avant la première réponse est signalée
+HEAVY_MODULES = ("sklearn", "scipy", "joblib", "marshmallow", "pyarrow", "msgpack")
+
+
+def run_worker() -> None:
+    """Code exécuté dans le processus mesuré (format choisi par variable d'environnement)."""
+    started = time.perf_counter()
+    from api.app import app
+
+    imported = time.perf_counter()
+    # Une maison du jeu de test, lue sans pandas pour ne pas fausser la mesure
+    with open(os.environ["BENCH_STARTUP_RECORD"]) as record_file:
+        record = json.load(record_file)
+    response = app.test_client().post("/v1/predict/regression", json={"inputs": [record]})
+    finished = time.perf_counter()
+    assert response.status_code == 200 and response.get_json()["errors"] == {}, response.data
+
+    print(
+        json.dumps(
+            {
+                "import_s": imported - started,
+                "first_prediction_s": finished - imported,
+                "total_s": finished - started,
+                "heavy_modules": [name for name in HEAVY_MODULES if name in sys.modules],
+            }
+        ),
+        flush=True,
+    )
+
+
+def _environment(artifact_format: str, record_path: Path) -> Dict[str, str]:
+    return dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])),
+        ML_API_MODEL_ARTIFACT_FORMAT=artifact_format,
+        BENCH_STARTUP_RECORD=str(record_path),
+    )
+
+
+def measure_format(artifact_format: str, record_path: Path, repeat: int) -> List[Dict[str, Any]]:
+    """Lance `repeat` processus neufs ; le temps "process_s" inclut le démarrage de Python."""
+    results = []
+    for _ in range(repeat):
+        spawned = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "--worker"],
+            check=True,
+            capture_output=True,
+            text=True,
+            env=_environment(artifact_format, record_path),
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result["process_s"] = time.perf_counter() - spawned
+        results.append(result)
+    return results
+
+
+def import_profile(top: int) -> List[Dict[str, Any]]:
+    """Modules les plus coûteux à l'import de api.app (temps propre, hors sous-modules)."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.app"],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=_environment("pkl", Path(os.devnull)),
+    ).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append(
+            {"module": name.strip(), "self_ms": int(self_us) / 1000.0, "cumulative_ms": int(cumulative_us) / 1000.0}
+        )
+    return sorted(modules, key=lambda module: module["self_ms"], reverse=True)[:top]
+
+
+def _write_record(path: Path) -> None:
+    # Import ici : le processus parent seul a besoin de pandas
+    import pandas as pd
+
+    from regression_model.config.core import TESTING_DATA_FILE
+
+    record = pd.read_csv(TESTING_DATA_FILE, nrows=1).to_json(orient="records")
+    path.write_text(json.dumps(json.loads(record)[0]))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Démarrage à froid de l'API (import et première prédiction)")
+    parser.add_argument("--repeat", type=int, default=5, help="Processus lancés par format d'artefact")
+    parser.add_argument("--top", type=int, default=15, help="Modules affichés par -X importtime")
+    parser.add_argument("--output", help="Fichier JSON des résultats (format de bench_suite.py)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker()
+        return 0
+
+    record_path = Path(f"bench_startup_record_{os.getpid()}.json").resolve()
+    _write_record(record_path)
+    metrics: Dict[str, Dict[str, Any]] = {}
+    try:
+        print(f"{'format':>8} {'import (s)':>11} {'1re prédiction (s)':>19} {'processus (s)':>14}  modules lourds")
+        for artifact_format in ARTIFACT_FORMATS:
+            results = measure_format(artifact_format, record_path, args.repeat)
+            medians = {
+                key: statistics.median(result[key] for result in results)
+                for key in ("import_s", "first_prediction_s", "total_s", "process_s")
+            }
+            heavy = sorted(set().union(*(result["heavy_modules"] for result in results)))
+            print(
+                f"{artifact_format:>8} {medians['import_s']:>11.3f} {medians['first_prediction_s']:>19.3f}"
+                f" {medians['process_s']:>14.3f}  {', '.join(heavy) or '-'}"
+            )
+            for key, value in medians.items():
+                metrics[f"startup.{artifact_format}.{key}"] = {"value": value, "unit": "s", "better": "lower"}
+    finally:
+        record_path.unlink()
+
+    print(f"\nModules les plus coûteux à l'import de api.app (-X importtime) :")
+    for module in import_profile(args.top):
+        print(f"  {module['module']:<50} {module['self_ms']:>8.1f} ms  (cumulé {module['cumulative_ms']:.1f} ms)")
+
+    if args.output:
+        results = {
+            "meta": {
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+            },
+            "metrics": metrics,
+        }
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+        print(f"Résultats écrits dans {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+## serve.py ##
+# ml_api/serve.py
+#
+# Serveur de production multi-processus ("pre-fork"), sans dépendance en plus
+# de Flask : run.py ne lance que le serveur de développement, sur un seul cœur.
+#
+#   1. le processus maître ouvre le port, charge le modèle et l'échauffe ;
+#   2. gc.freeze() range tous ces objets dans une génération que le ramasse-
+#      miettes ne parcourt plus : il ne réécrit plus leurs en-têtes, et les
+#      pages du modèle restent partagées (copy-on-write) entre les workers ;
+#   3. N workers sont créés par fork() : chacun construit sa propre application
+#      (create_app) et accepte les connexions sur le même socket ;
+#   4. le maître remplace un worker qui s'arrête, et arrête tout sur SIGTERM/SIGINT.
+#
+# Par défaut, un worker par processeur disponible (affinité et quota cgroup
+# pris en compte). /v1/stats expose, pour chaque worker, ses requêtes servies
+# et sa mémoire (RSS et PSS).
+#
+# Utilisation (depuis packages/ml_api) :
+#   PYTHONPATH=../regression_model:. python serve.py --port 5000
+#   PYTHONPATH=../regression_model:. python serve.py --workers 4 --threaded
+
+import argparse
+import gc
+import logging
+import math
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from werkzeug.serving import make_server
+
+from api.app import create_app
+from api.config import API_SETTINGS, configure_logging
+from api.workers import WorkerTable
+from regression_model.logging_config import stop_async_logging
+from regression_model.predict import configure_artifact_format
+from regression_model.warmup import warm_up
+
+logger = logging.getLogger("ml_api")
+
+# Un worker qui s'arrête moins de RESPAWN_BACKOFF_SECONDS après son lancement
+# n'est relancé qu'après ce délai (évite une boucle de plantages)
+RESPAWN_BACKOFF_SECONDS = 1.0
+
+
+def available_cpus() -> int:
+    """Processeurs utilisables par ce processus : affinité, puis quota cgroup v2."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # pas d'affinité hors Linux
+        cpus = os.cpu_count() or 1
+    try:
+        # Conteneur limité (ex : "200000 100000" = 2 processeurs)
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+class _CountRequests:
+    """Middleware WSGI : compte les requêtes du worker dans la table partagée."""
+
+    def __init__(self, wsgi_app: Any, table: WorkerTable) -> None:
+        self.wsgi_app = wsgi_app
+        self.table = table
+
+    def __call__(self, environ, start_response):
+        self.table.count_request()
+        return self.wsgi_app(environ, start_response)
+
+
+class PreforkServer:
+    """Processus maître : socket partagé, modèle préchargé, N workers (voir en tête du fichier)."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        workers: int,
+        threaded: bool = False,
+        backlog: int = 2048,
+        settings: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.n_workers = workers
+        self.threaded = threaded
+        self.backlog = backlog
+        # Le modèle est déjà chargé par le maître : pas de préchargement par worker
+        self.settings = {**(settings or {}), "MODEL_PRELOAD": "lazy"}
+        self.table = WorkerTable(workers)
+        self._children: Dict[int, int] = {}  # pid → ligne de la table
+        self._stopping = False
+        self._socket: Optional[socket.socket] = None
+
+    def preload(self) -> Dict[str, Any]:
+        """Charge et échauffe le modèle dans le maître, puis gèle le tas avant les fork."""
+        # Pas de collecte pendant le chargement : les objets créés ne sont
+        # pas déplacés d'une génération à l'autre avant d'être gelés
+        gc.disable()
+        configure_artifact_format(self.settings.get("MODEL_ARTIFACT_FORMAT", API_SETTINGS["MODEL_ARTIFACT_FORMAT"]))
+        timings = warm_up(self.settings.get("MODEL_WARMUP_ROWS", API_SETTINGS["MODEL_WARMUP_ROWS"]))
+        gc.freeze()
+        timings["frozen_objects"] = gc.get_freeze_count()
+        return timings
+
+    def run(self) -> int:
+        """Démarre le serveur et ne rend la main qu'après l'arrêt de tous les workers."""
+        # Pas d'application dans le maître (voir api/app.py) : ses logs sont configurés ici
+        configure_logging()
+        self._socket = socket.create_server((self.host, self.port), backlog=self.backlog)
+        self._socket.set_inheritable(True)
+        self.port = self._socket.getsockname()[1]  # Port choisi par le système si 0
+        timings = self.preload()
+        logger.info(
+            f"Model preloaded in {timings['load_seconds']:.3f}s, warmed up in {timings['warmup_seconds']:.3f}s "
+            f"({timings['frozen_objects']} objects frozen); starting {self.n_workers} workers "
+            f"on {self.host}:{self.port}"
+        )
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        for index in range(self.n_workers):
+            self._spawn(index)
+
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            index = self._children.pop(pid, None)
+            if index is None or self._stopping:
+                continue
+            logger.warning(f"Worker {index} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}")
+            started_at = self.table.snapshot()[index]["started_at"] or 0.0
+            if time.time() - started_at < RESPAWN_BACKOFF_SECONDS:
+                time.sleep(RESPAWN_BACKOFF_SECONDS)
+            if not self._stopping:
+                self._spawn(index)
+
+        self._socket.close()
+        logger.info("All workers stopped")
+        return 0
+
+    def _handle_stop(self, signum, frame) -> None:
+        ## Arrêt demandé : transmis à chaque worker, qui finit ses requêtes en cours.
+        self._stopping = True
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _spawn(self, index: int) -> None:
+        pid = os.fork()
+        if pid:
+            self._children[pid] = index
+            self.table.register(index, pid)
+            return
+
+        # Processus worker : ne revient jamais dans la boucle du maître.
+        # Les threads d'écriture des logs ont été relancés après le fork
+        # (regression_model.logging_config) ; os._exit n'exécutant pas les
+        # fonctions atexit, on vide leurs files avant de sortir.
+        code = 1
+        try:
+            self._serve(index)
+            code = 0
+        except BaseException:
+            logger.exception(f"Worker {index} crashed")
+        finally:
+            stop_async_logging()
+            os._exit(code)
+
+    def _serve(self, index: int) -> None:
+        ## Corps d'un worker : sa propre application (threads, métriques...)
+        ## autour du modèle hérité du maître.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C : c'est le maître qui arrête tout
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        self._children.clear()  # Copie héritée de la liste du maître
+        gc.enable()
+        self.table.attach(index)
+
+        app = create_app(self.settings)
+        app.extensions["worker_table"] = self.table
+        app.wsgi_app = _CountRequests(app.wsgi_app, self.table)
+
+        server = make_server(self.host, self.port, app, threaded=self.threaded, fd=self._socket.fileno())
+        # serve_forever() ne peut pas être arrêté depuis son propre thread
+        signal.signal(
+            signal.SIGTERM,
+            lambda signum, frame: threading.Thread(target=server.shutdown, daemon=True).start(),
+        )
+        logger.info(f"Worker {index} (pid {os.getpid()}) listening on {self.host}:{self.port}")
+        server.serve_forever()
+        server.server_close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Serveur multi-processus de l'API (modèle préchargé et partagé)")
+    parser.add_argument("--host", default=os.environ.get("ML_API_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("ML_API_PORT", "5000")))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("ML_API_WORKERS", "0")),
+        help="Nombre de workers (0 : un par processeur disponible)",
+    )
+    parser.add_argument("--threaded", action="store_true", help="Un thread par requête dans chaque worker")
+    parser.add_argument("--access-log", action="store_true", help="Journalise chaque requête (werkzeug)")
+    args = parser.parse_args()
+
+    if not args.access_log:
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    workers = args.workers or available_cpus()
+    return PreforkServer(args.host, args.port, workers, threaded=args.threaded).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
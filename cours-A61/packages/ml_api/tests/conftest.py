@@ -1,6 +1,14 @@
 ##  tests/conftest.py ##
 import pytest
+from regression_model.logging_config import configure_prediction_logging
+from regression_model.predict import (
+    configure_artifact_format,
+    configure_model_registry,
+    configure_prediction_cache,
+)
+
 from api.app import app as flask_app
+from api.config import API_SETTINGS
 
 
 @pytest.fixture
@@ -29,4 +37,25 @@ def client(app):
     ## Ce client permet de tester les endpoints API sans avoir à démarrer
     ## un serveur réel. C'est plus rapide et plus isolé.
     
-    return app.test_client()
\ No newline at end of file
+    return app.test_client()
+
+
+@pytest.fixture(autouse=True)
+def process_settings():
+
+    ## Certains réglages de create_app sont communs à tout le processus
+    ## (format de l'artefact, cache, journalisation : voir api/app.py).
+    ## On remet ceux par défaut après chaque test, pour qu'une application
+    ## créée avec d'autres réglages n'influence pas les tests suivants.
+
+    yield
+    configure_artifact_format(API_SETTINGS["MODEL_ARTIFACT_FORMAT"])
+    configure_model_registry(max_resident=API_SETTINGS["MODEL_REGISTRY_MAX_RESIDENT"])
+    configure_prediction_cache(
+        max_entries=API_SETTINGS["PREDICTION_CACHE_MAX_ENTRIES"],
+        ttl_seconds=API_SETTINGS["PREDICTION_CACHE_TTL_SECONDS"],
+    )
+    configure_prediction_logging(
+        mode=API_SETTINGS["LOG_MODE"],
+        payload_sample_rate=API_SETTINGS["LOG_PAYLOAD_SAMPLE_RATE"],
+    )
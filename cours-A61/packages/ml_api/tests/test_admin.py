@@ -0,0 +1,76 @@
+# tests/test_admin.py
+
+import shutil
+
+import joblib
+import pytest
+from regression_model import predict
+from regression_model.pipeline_cache import PipelineCache
+
+from api.admin import is_authorized
+from api.app import create_app
+
+TOKEN = "s3cret-token"
+
+
+@pytest.fixture
+def served_copy(tmp_path, monkeypatch):
+    # Le modèle servi est une copie du .pkl livré, qu'on peut remplacer sans risque
+    path = tmp_path / "lasso_regression.pkl"
+    shutil.copy(predict._pipeline_cache.path, path)
+    monkeypatch.setattr(predict, "_pipeline_cache", PipelineCache(path))
+    return path
+
+
+def test_admin_token_check():
+    assert is_authorized(f"Bearer {TOKEN}", TOKEN)
+    assert not is_authorized("Bearer wrong", TOKEN)
+    assert not is_authorized(TOKEN, TOKEN)            # schéma manquant
+    assert not is_authorized(f"Bearer {TOKEN}", None)  # endpoints désactivés
+
+
+def test_reload_requires_a_configured_token_and_valid_credentials(served_copy):
+    disabled = create_app({"TESTING": True, "ADMIN_TOKEN": None}).test_client()
+    assert disabled.post("/admin/reload").status_code == 404
+
+    client = create_app({"TESTING": True, "ADMIN_TOKEN": TOKEN}).test_client()
+    assert client.post("/admin/reload").status_code == 401
+    assert client.post("/admin/reload", headers={"Authorization": "Bearer nope"}).status_code == 401
+
+
+def test_reload_swaps_in_a_retrained_model(served_copy):
+    client = create_app({"TESTING": True, "ADMIN_TOKEN": TOKEN, "MODEL_WARMUP_ROWS": 8}).test_client()
+    headers = {"Authorization": f"Bearer {TOKEN}"}
+    old_model = predict._load_pipeline()
+
+    # Artefact inchangé : rien n'est rechargé
+    unchanged = client.post("/admin/reload", headers=headers).get_json()
+    assert unchanged["swapped"] is False
+
+    # Nouveau modèle sur le disque (ici : coefficients modifiés)
+    retrained = joblib.load(served_copy)
+    retrained.steps[-1][1].intercept_ += 1000.0
+    joblib.dump(retrained, served_copy)
+
+    response = client.post("/admin/reload", headers=headers)
+
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report["swapped"] is True
+    assert report["sha256"] != report["previous_sha256"]
+    assert report["load_seconds"] >= 0 and report["warmup_seconds"] >= 0
+    new_model = predict._load_pipeline()
+    assert new_model is not old_model
+    assert new_model.steps[-1][1].intercept_ == pytest.approx(old_model.steps[-1][1].intercept_ + 1000.0)
+
+
+def test_failed_reload_keeps_serving_the_old_model(served_copy):
+    client = create_app({"TESTING": True, "ADMIN_TOKEN": TOKEN}).test_client()
+    old_model = predict._load_pipeline()
+    served_copy.write_bytes(b"not a pickle")
+
+    response = client.post("/admin/reload", headers={"Authorization": f"Bearer {TOKEN}"})
+
+    assert response.status_code == 500
+    assert response.get_json()["swapped"] is False
+    assert predict._load_pipeline() is old_model
@@ -0,0 +1,98 @@
+# tests/test_admission.py
+
+import io
+import json
+
+import pytest
+from regression_model.config.core import config
+from regression_model.processing.data_manager import load_dataset
+
+from api.admission import AdmissionController, AdmissionRejected
+from api.app import create_app
+
+
+def _payload(n_rows):
+    test_data = load_dataset(file_name=config.app_config.test_data_file)
+    return {"inputs": json.loads(test_data.head(n_rows).to_json(orient="records"))}
+
+
+def test_limits_on_requests_and_rows_in_flight():
+    admission = AdmissionController(max_in_flight=2, max_queued_rows=10, retry_after_seconds=0.5)
+
+    first = admission.admit(content_length=100)
+    first.reserve_rows(6)
+    second = admission.admit(content_length=100)
+
+    # Plus de place pour une troisième requête : 503, à réessayer plus tard
+    with pytest.raises(AdmissionRejected) as busy:
+        admission.admit(content_length=100)
+    assert busy.value.status == 503 and busy.value.headers() == {"Retry-After": "1"}
+
+    # 6 + 5 lignes dépassent la file : 503 ; 11 lignes seules ne passeront jamais : 413
+    with pytest.raises(AdmissionRejected) as queued:
+        second.reserve_rows(5)
+    assert queued.value.status == 503
+    with pytest.raises(AdmissionRejected) as too_large:
+        second.reserve_rows(11)
+    assert too_large.value.status == 413 and too_large.value.headers() == {}
+
+    first.release()
+    second.release()
+    second.release()  # Sans effet : une place n'est libérée qu'une fois
+    stats = admission.stats()
+    assert stats["in_flight"] == 0 and stats["queued_rows"] == 0
+    assert stats["rejected"] == {"in_flight": 1, "queued_rows": 1, "body_size": 0, "batch_size": 1}
+
+
+def test_prediction_endpoint_sheds_load():
+    app = create_app({"TESTING": True, "ADMISSION_MAX_IN_FLIGHT": 1, "ADMISSION_MAX_QUEUED_ROWS": 3})
+    client = app.test_client()
+
+    # Une requête déjà en cours occupe la seule place
+    held = app.extensions["admission"].admit(content_length=None)
+    busy = client.post("/v1/predict/regression", json=_payload(1))
+    assert busy.status_code == 503
+    assert busy.headers["Retry-After"] == "1"
+    held.release()
+
+    assert client.post("/v1/predict/regression", json=_payload(3)).status_code == 200
+    assert client.post("/v1/predict/regression", json=_payload(5)).status_code == 413
+
+    admission = client.get("/v1/stats").get_json()["admission"]
+    assert admission["in_flight"] == 0
+    assert admission["rejected"]["in_flight"] == 1 and admission["rejected"]["batch_size"] == 1
+    assert 'ml_api_rejected_requests_total{reason="in_flight"} 1' in client.get("/metrics").data.decode()
+
+
+def test_oversized_body_is_rejected_before_reading_it():
+    client = create_app({"TESTING": True, "ADMISSION_MAX_BODY_BYTES": 1000}).test_client()
+
+    response = client.post("/v1/predict/regression", json=_payload(5))
+
+    assert response.status_code == 413
+    assert "Retry-After" not in response.headers
+    assert response.get_json()["predictions"] is None
+
+    # Même limite pour un corps envoyé par morceaux, sans Content-Length
+    chunked = client.post(
+        "/v1/predict/regression",
+        input_stream=io.BytesIO(json.dumps(_payload(5)).encode()),
+        headers={"Content-Type": "application/json", "Transfer-Encoding": "chunked"},
+        environ_overrides={"wsgi.input_terminated": True},
+    )
+    assert chunked.status_code == 413
+    assert client.get("/v1/stats").get_json()["admission"]["rejected"]["body_size"] == 2
+
+
+def test_chunked_body_under_the_limit_is_predicted():
+    client = create_app({"TESTING": True, "ADMISSION_MAX_BODY_BYTES": 1_000_000}).test_client()
+
+    response = client.post(
+        "/v1/predict/regression",
+        input_stream=io.BytesIO(json.dumps(_payload(3)).encode()),
+        headers={"Content-Type": "application/json", "Transfer-Encoding": "chunked"},
+        environ_overrides={"wsgi.input_terminated": True},
+    )
+
+    assert response.status_code == 200
+    assert len(response.get_json()["predictions"]) == 3
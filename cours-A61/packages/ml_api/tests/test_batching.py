@@ -0,0 +1,67 @@
+# packages/ml_api/tests/test_batching.py
+
+import threading
+
+from regression_model.config.core import config
+from regression_model.processing.data_manager import load_dataset
+
+from api.app import create_app
+from api.batching import RequestCoalescer
+
+
+def test_concurrent_requests_are_coalesced_and_split_back():
+    """
+    Plusieurs requêtes concurrentes doivent partager un seul appel à
+    make_prediction, chacune récupérant exactement ses propres prédictions.
+    """
+    calls = []
+
+    def fake_predict(input_data):
+        # Fausse prédiction : on renvoie simplement l'identifiant de chaque maison
+        calls.append(len(input_data))
+        return {"predictions": [row["Id"] for row in input_data], "errors": {}, "version": "test"}
+
+    test_data = load_dataset(file_name=config.app_config.test_data_file)
+    records = test_data[0:8].to_dict(orient="records")
+    coalescer = RequestCoalescer(window_ms=200, max_batch_size=64, predict_fn=fake_predict)
+
+    results = {}
+
+    def call(i):
+        results[i] = coalescer.predict([records[i]])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    coalescer.close()
+
+    # Chaque appelant reçoit la prédiction de sa propre maison
+    for i in range(8):
+        assert results[i]["predictions"] == [records[i]["Id"]]
+    # Moins d'appels au modèle que de requêtes : les lots ont bien été regroupés
+    assert len(calls) < 8
+    stats = coalescer.stats()
+    assert stats["requests"] == 8
+    assert stats["rows"] == 8
+
+
+def test_prediction_endpoint_with_coalescing_enabled():
+    """L'endpoint garde exactement le même comportement avec le regroupement activé."""
+    app = create_app({"PREDICTION_COALESCING_ENABLED": True, "TESTING": True})
+    client = app.test_client()
+
+    test_data = load_dataset(file_name=config.app_config.test_data_file)
+    payload = test_data[0:5].to_dict(orient="records")
+    response = client.post("/v1/predict/regression", json={"inputs": payload})
+
+    assert response.status_code == 200
+    assert len(response.get_json()["predictions"]) == 5
+
+    # Les statistiques du regroupement sont visibles via l'API
+    stats = client.get("/v1/stats").get_json()
+    assert stats["batching"]["requests"] == 1
+    assert stats["pipeline_cache"]["loaded"] is True
+    app.extensions["prediction_coalescer"].close()
+
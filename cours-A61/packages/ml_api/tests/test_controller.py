@@ -1,8 +1,15 @@
 # tests/test_controller.py
 
+import json
+import logging
+
 from regression_model.config.core import config
 from regression_model.processing.data_manager import load_dataset
 
+from api import controller
+from api.app import create_app
+from api.streaming import stream_predictions
+from api.validation import PredictionResultSchema
 from ml_api import __version__ as api_version
 from regression_model import __version__ as model_version
 
@@ -98,4 +105,220 @@ def test_version_endpoint_returns_correct_versions(client):
     # Vérification que les valeurs correspondent aux constantes importées
     # (garantit la cohérence entre ce qu'on déclare et ce qu'on expose)
     assert response_json["api_version"] == api_version
-    assert response_json["model_version"] == model_version
\ No newline at end of file
+    assert response_json["model_version"] == model_version
+
+def test_streaming_prediction_endpoint(client):
+
+    # Test de l'endpoint de prédiction en flux (NDJSON).
+    # On envoie 3 maisons valides, une ligne illisible et une maison incomplète :
+    # chaque ligne doit recevoir sa réponse, dans l'ordre, sans bloquer les autres.
+
+    test_data = load_dataset(file_name=config.app_config.test_data_file)
+    records = test_data[0:3].to_dict(orient="records")
+    lines = [json.dumps(record) for record in records]
+    lines.insert(1, "{ceci n'est pas du JSON")
+    lines.append(json.dumps({"MSSubClass": 20}))
+
+    response = client.post(
+        "/v1/predict/regression/stream",
+        data="\n".join(lines) + "\n",
+        content_type="application/x-ndjson",
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Model-Version"] == model_version
+    results = [json.loads(line) for line in response.data.decode("utf-8").splitlines()]
+
+    # Une ligne de réponse par ligne envoyée, dans le même ordre
+    assert [result["row"] for result in results] == [0, 1, 2, 3, 4]
+    assert "invalid_json" in results[1]["errors"]
+    assert "missing_columns" in results[4]["errors"]
+    for i in (0, 2, 3):
+        assert isinstance(results[i]["prediction"], float)
+
+
+def test_streaming_reports_a_failed_chunk_on_each_of_its_rows():
+
+    # Le premier paquet échoue (ex : modèle devenu illisible) : ses lignes
+    # reçoivent une erreur et le flux continue avec le paquet suivant
+    calls = []
+
+    def predict_fn(input_data):
+        calls.append(len(input_data))
+        if len(calls) == 1:
+            raise RuntimeError("model unavailable")
+        return {"predictions": [1.0] * len(input_data), "errors": {}}
+
+    test_data = load_dataset(file_name=config.app_config.test_data_file)
+    lines = [json.dumps(record).encode() for record in json.loads(test_data[0:3].to_json(orient="records"))]
+    results = [json.loads(line) for line in stream_predictions(lines, chunk_size=2, predict_fn=predict_fn)]
+
+    assert [result["row"] for result in results] == [0, 1, 2]
+    assert results[0]["prediction"] is None and "model unavailable" in results[0]["errors"]["prediction"]
+    assert results[1]["prediction"] is None and "errors" in results[1]
+    assert results[2] == {"row": 2, "prediction": 1.0}
+
+
+def test_invalid_rows_do_not_fail_the_batch():
+
+    # Une maison aux valeurs invalides (texte à la place d'un nombre, surface
+    # négative) n'empêche pas de prédire les autres maisons du lot, y compris
+    # avec des prédictions arrondies et en flux NDJSON.
+
+    app = create_app({"TESTING": True, "PREDICTION_DECIMALS": 2})
+    client = app.test_client()
+    test_data = load_dataset(file_name=config.app_config.test_data_file)
+    records = json.loads(test_data[0:4].to_json(orient="records"))
+    records[1]["LotArea"] = "grand"
+    records[2]["GrLivArea"] = -10
+
+    response = client.post("/v1/predict/regression", json={"inputs": records})
+
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert PredictionResultSchema().validate(payload) == {}
+    assert payload["predictions"][1] is None and payload["predictions"][2] is None
+    assert isinstance(payload["predictions"][0], float) and isinstance(payload["predictions"][3], float)
+    assert payload["errors"]["invalid_rows"] == [
+        {"row": 1, "invalid_values": {"LotArea": "expected a number"}},
+        {"row": 2, "invalid_values": {"GrLivArea": "expected a finite number >= 0"}},
+    ]
+
+    response = client.post(
+        "/v1/predict/regression/stream",
+        data="\n".join(json.dumps(record) for record in records) + "\n",
+        content_type="application/x-ndjson",
+    )
+    results = [json.loads(line) for line in response.data.decode("utf-8").splitlines()]
+    assert results[1] == {"row": 1, "prediction": None, "errors": {"invalid_values": {"LotArea": "expected a number"}}}
+    assert isinstance(results[3]["prediction"], float) and "errors" not in results[3]
+
+
+def test_prediction_cache_stats_are_exposed():
+    """Avec le cache activé, les maisons déjà prédites sont servies depuis le cache."""
+    app = create_app({"PREDICTION_CACHE_ENABLED": True, "TESTING": True})
+    client = app.test_client()
+
+    test_data = load_dataset(file_name=config.app_config.test_data_file)
+    payload = test_data[0:5].to_dict(orient="records")
+    first = client.post("/v1/predict/regression", json={"inputs": payload}).get_json()
+    second = client.post("/v1/predict/regression", json={"inputs": payload}).get_json()
+
+    assert second["predictions"] == first["predictions"]
+    stats = client.get("/v1/stats").get_json()["prediction_cache"]
+    assert stats["hits"] >= 5
+    assert stats["approx_memory_bytes"] > 0
+
+
+def test_prediction_with_a_selected_model(client):
+
+    # Le modèle se choisit par ?model= ou par l'en-tête X-Model ; /version
+    # liste les modèles de trained_models/ avec leur mémoire et leur chargement
+    test_data = load_dataset(file_name=config.app_config.test_data_file)
+    payload = {"inputs": json.loads(test_data.head(3).to_json(orient="records"))}
+
+    default = client.post("/v1/predict/regression", json=payload).get_json()
+    by_query = client.post("/v1/predict/regression?model=lasso_regression", json=payload)
+    assert by_query.status_code == 200
+    assert by_query.get_json()["model"] == "lasso_regression"
+    assert by_query.get_json()["predictions"] == default["predictions"]
+    assert PredictionResultSchema().validate(by_query.get_json()) == {}
+
+    by_header = client.post("/v1/predict/regression", json=payload, headers={"X-Model": "lasso_regression"})
+    assert by_header.get_json()["predictions"] == default["predictions"]
+
+    # Modèle inconnu : 404 ; artefact présent mais illisible : 500
+    assert client.post("/v1/predict/regression?model=unknown", json=payload).status_code == 404
+    broken = client.post("/v1/predict/regression?model=regression_model", json=payload)
+    assert broken.status_code == 500
+    assert "regression_model" in broken.get_json()["errors"]
+
+    models = {model["name"]: model for model in client.get("/version").get_json()["models"]}
+    assert models["lasso_regression"]["loaded"]
+    assert models["lasso_regression"]["memory_bytes"] > 0
+    assert models["lasso_regression"]["load_seconds"] is not None
+    assert not models["regression_model"]["loaded"]
+    assert models["regression_model"]["error"]
+
+
+def test_prediction_stops_at_the_requested_deadline():
+
+    # Lot découpé en paquets de 2 maisons ; avec un délai déjà écoulé avant le
+    # premier paquet, aucune prédiction n'est faite et toutes les positions
+    # sont rendues dans errors["unfinished_rows"]
+    app = create_app({"TESTING": True, "PREDICTION_CHUNK_SIZE": 2})
+    client = app.test_client()
+    test_data = load_dataset(file_name=config.app_config.test_data_file)
+    payload = {"inputs": json.loads(test_data.head(5).to_json(orient="records"))}
+    expired = client.post("/v1/predict/regression?timeout_ms=0.001", json=payload)
+    assert expired.status_code == 200
+    assert expired.get_json()["predictions"] == [None] * 5
+    assert expired.get_json()["errors"]["unfinished_rows"] == [0, 1, 2, 3, 4]
+    assert PredictionResultSchema().validate(expired.get_json()) == {}
+
+    # Délai confortable : toutes les maisons sont prédites
+    relaxed = client.post("/v1/predict/regression", json=payload, headers={"X-Timeout-Ms": "60000"})
+    assert relaxed.get_json()["errors"] == {}
+    assert None not in relaxed.get_json()["predictions"]
+
+    assert client.post("/v1/predict/regression?timeout_ms=soon", json=payload).status_code == 400
+
+
+def test_chunk_size_belongs_to_each_application(monkeypatch):
+    small_chunks = create_app({"TESTING": True, "PREDICTION_CHUNK_SIZE": 2}).test_client()
+    create_app({"TESTING": True})  # Une autre application ne change pas ses réglages
+
+    chunk_sizes = []
+    make_prediction = controller.make_prediction
+
+    def spy(**kwargs):
+        chunk_sizes.append(kwargs["chunk_size"])
+        return make_prediction(**kwargs)
+
+    monkeypatch.setattr(controller, "make_prediction", spy)
+    test_data = load_dataset(file_name=config.app_config.test_data_file)
+    payload = {"inputs": json.loads(test_data.head(3).to_json(orient="records"))}
+
+    assert small_chunks.post("/v1/predict/regression", json=payload).status_code == 200
+    assert chunk_sizes == [2]
+
+
+class _ListHandler(logging.Handler):
+    """Garde les messages reçus, pour les inspecter dans le test."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def _request_logs(settings):
+    client = create_app({"TESTING": True, **settings}).test_client()
+    test_data = load_dataset(file_name=config.app_config.test_data_file)
+    payload = {"inputs": json.loads(test_data.head(2).to_json(orient="records"))}
+    handler = _ListHandler()
+    logger = logging.getLogger("regression_model")
+    logger.addHandler(handler)
+    try:
+        assert client.post("/v1/predict/regression", json=payload).status_code == 200
+    finally:
+        logger.removeHandler(handler)
+    return handler.messages
+
+
+def test_payload_is_logged_once_per_request():
+    messages = _request_logs({"LOG_MODE": "full"})
+
+    assert sum("Inputs received" in message for message in messages) == 1
+    summary = [message for message in messages if message.startswith("event=predict_request ")]
+    assert "body_sha=" in summary[0] and "body_bytes=" in summary[0]
+
+
+def test_body_is_not_hashed_when_payload_is_not_sampled():
+    messages = _request_logs({"LOG_MODE": "structured", "LOG_PAYLOAD_SAMPLE_RATE": 0.0})
+
+    assert not any("Inputs received" in message for message in messages)
+    summary = [message for message in messages if message.startswith("event=predict_request ")]
+    assert "body_sha=" not in summary[0] and "body_bytes=" in summary[0]
@@ -0,0 +1,165 @@
+# tests/test_formats.py
+
+import io
+import json
+
+import numpy as np
+import pytest
+from regression_model.config.core import config
+from regression_model.processing.data_manager import load_dataset
+
+from api import formats
+from api.app import create_app
+from api.formats import ARROW_STREAM_MIMETYPE, COLUMNAR_JSON_MIMETYPE, MSGPACK_MIMETYPE, NPY_MIMETYPE
+from api.validation import PredictionResultSchema
+
+
+def _test_data(n_rows):
+    return load_dataset(file_name=config.app_config.test_data_file).iloc[:n_rows]
+
+
+def test_columnar_request_gives_same_predictions_as_rows(client):
+    test_data = _test_data(20)
+    rows = json.loads(test_data.to_json(orient="records"))
+    columns = {name: [row[name] for row in rows] for name in test_data.columns}
+
+    by_rows = client.post("/v1/predict/regression", json={"inputs": rows}).get_json()
+    by_columns = client.post("/v1/predict/regression", json={"columns": columns}).get_json()
+
+    assert by_columns["errors"] == {}
+    np.testing.assert_allclose(by_columns["predictions"], by_rows["predictions"], rtol=1e-9)
+
+
+def test_columnar_response_is_negotiated_with_accept_header(client):
+    rows = json.loads(_test_data(3).to_json(orient="records"))
+
+    response = client.post(
+        "/v1/predict/regression",
+        json={"inputs": rows},
+        headers={"Accept": COLUMNAR_JSON_MIMETYPE},
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == COLUMNAR_JSON_MIMETYPE
+    payload = response.get_json(force=True)
+    assert len(payload["columns"]["prediction"]) == 3
+    assert "predictions" not in payload
+
+
+def test_columns_of_different_lengths_are_rejected(client):
+    response = client.post(
+        "/v1/predict/regression", json={"columns": {"LotArea": [8450, 9600], "Street": ["Pave"]}}
+    )
+
+    assert response.status_code == 400
+    assert response.get_json()["predictions"] is None
+
+
+def _json_predictions(client, test_data):
+    rows = json.loads(test_data.to_json(orient="records"))
+    return client.post("/v1/predict/regression", json={"inputs": rows}).get_json()["predictions"]
+
+
+def test_msgpack_request_and_response(client):
+    msgpack = pytest.importorskip("msgpack")
+    test_data = _test_data(5)
+    rows = json.loads(test_data.to_json(orient="records"))
+
+    response = client.post(
+        "/v1/predict/regression",
+        data=msgpack.packb({"inputs": rows}),
+        headers={"Content-Type": MSGPACK_MIMETYPE, "Accept": MSGPACK_MIMETYPE},
+    )
+
+    assert response.mimetype == MSGPACK_MIMETYPE
+    payload = msgpack.unpackb(response.data)
+    np.testing.assert_allclose(payload["predictions"], _json_predictions(client, test_data), rtol=1e-9)
+
+
+def test_arrow_request_and_response(client):
+    pa = pytest.importorskip("pyarrow")
+    test_data = _test_data(5)
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(test_data, preserve_index=False)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    response = client.post(
+        "/v1/predict/regression",
+        data=sink.getvalue().to_pybytes(),
+        headers={"Content-Type": ARROW_STREAM_MIMETYPE, "Accept": ARROW_STREAM_MIMETYPE},
+    )
+
+    assert response.mimetype == ARROW_STREAM_MIMETYPE
+    predictions = pa.ipc.open_stream(response.data).read_all().column("prediction").to_numpy()
+    np.testing.assert_allclose(predictions, _json_predictions(client, test_data), rtol=1e-9)
+
+
+def test_npy_request_and_response(client):
+    test_data = _test_data(5)
+    # Tableau structuré : float64 pour les nombres, texte à largeur fixe sinon
+    # (chaîne vide = valeur manquante)
+    fields = []
+    for name in test_data.columns:
+        if test_data[name].dtype == object:
+            fields.append((name, "U16"))
+        else:
+            fields.append((name, "f8"))
+    records = np.zeros(len(test_data), dtype=fields)
+    for name, kind in fields:
+        values = test_data[name]
+        records[name] = values.fillna("") if kind == "U16" else values
+    buffer = io.BytesIO()
+    np.save(buffer, records)
+
+    response = client.post(
+        "/v1/predict/regression",
+        data=buffer.getvalue(),
+        headers={"Content-Type": NPY_MIMETYPE, "Accept": NPY_MIMETYPE},
+    )
+
+    assert response.mimetype == NPY_MIMETYPE
+    predictions = np.load(io.BytesIO(response.data))
+    np.testing.assert_allclose(predictions, _json_predictions(client, test_data), rtol=1e-9)
+
+
+def test_missing_binary_library_gives_415(client, monkeypatch):
+    monkeypatch.setitem(formats._modules, "msgpack", None)
+
+    response = client.post(
+        "/v1/predict/regression", data=b"\x80", headers={"Content-Type": MSGPACK_MIMETYPE}
+    )
+
+    assert response.status_code == 415
+
+
+def test_rounded_predictions_still_match_the_schema():
+    app = create_app({"TESTING": True, "PREDICTION_DECIMALS": 0})
+    rows = json.loads(_test_data(5).to_json(orient="records"))
+
+    payload = app.test_client().post("/v1/predict/regression", json={"inputs": rows}).get_json()
+
+    assert PredictionResultSchema().validate(payload) == {}
+    assert all(prediction == round(prediction) for prediction in payload["predictions"])
+
+
+def test_fast_json_provider_is_used_when_orjson_is_installed():
+    pytest.importorskip("orjson")
+    assert type(create_app().json).__name__ == "OrjsonProvider"
+    assert type(create_app({"FAST_JSON_ENABLED": False}).json).__name__ == "DefaultJSONProvider"
+
+
+def test_fast_json_provider_accepts_nan_in_request_body():
+    pytest.importorskip("orjson")
+    app = create_app({"TESTING": True})
+    assert type(app.json).__name__ == "OrjsonProvider"
+    # json.dumps écrit les valeurs manquantes du DataFrame sous la forme NaN
+    body = json.dumps({"inputs": _test_data(5).to_dict("records")})
+    assert "NaN" in body
+
+    response = app.test_client().post(
+        "/v1/predict/regression", data=body, headers={"Content-Type": "application/json"}
+    )
+
+    assert response.status_code == 200
+    assert len(response.get_json()["predictions"]) == 5
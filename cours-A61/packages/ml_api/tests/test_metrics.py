@@ -0,0 +1,33 @@
+# tests/test_metrics.py
+
+import json
+
+from regression_model.config.core import config
+from regression_model.processing.data_manager import load_dataset
+
+from api.app import create_app
+
+
+def test_metrics_endpoint_exposes_stage_latencies():
+    app = create_app({"TESTING": True})
+    client = app.test_client()
+    test_data = load_dataset(file_name=config.app_config.test_data_file)
+    inputs = json.loads(test_data.iloc[:5].to_json(orient="records"))
+
+    client.post("/v1/predict/regression", json={"inputs": inputs})
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    body = response.data.decode("utf-8")
+    # Une série par étape : lecture du JSON, validation, chaque étape du pipeline...
+    for stage in ("json_parse", "dataframe", "validate", "load", "pipeline.model", "serialize"):
+        assert f'ml_api_stage_duration_seconds_count{{stage="{stage}"}} 1' in body
+    assert 'ml_api_stage_duration_seconds{stage="total",quantile="0.99"}' in body
+    assert 'ml_api_requests_total{endpoint="api.predict",status="200"} 1' in body
+    assert "ml_api_predicted_rows_total 5" in body
+
+
+def test_metrics_endpoint_can_be_disabled():
+    client = create_app({"TESTING": True, "METRICS_ENABLED": False}).test_client()
+    assert client.get("/metrics").status_code == 404
@@ -0,0 +1,68 @@
+# tests/test_profiling.py
+
+import json
+
+import pytest
+from regression_model.config.core import config
+from regression_model.processing.data_manager import load_dataset
+
+from api.app import create_app
+from api.validation import PredictionResultSchema
+
+TOKEN = "profiling-test-token"
+
+
+def _inputs(n_rows):
+    test_data = load_dataset(file_name=config.app_config.test_data_file)
+    return json.loads(test_data.iloc[:n_rows].to_json(orient="records"))
+
+
+@pytest.fixture
+def profiling_client():
+    return create_app({"TESTING": True, "PROFILING_ENABLED": True}).test_client()
+
+
+def test_profile_header_adds_timing_breakdown(profiling_client):
+    response = profiling_client.post(
+        "/v1/predict/regression", json={"inputs": _inputs(3)}, headers={"X-Profile": "1"}
+    )
+
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert PredictionResultSchema().validate(payload) == {}
+
+    profile = payload["profile"]
+    assert profile["mode"] == "timing"
+    assert profile["rows"] == 3
+    assert profile["peak_memory_bytes"] > 0
+    assert {"json_parse", "validate", "pipeline.categorical_encoder", "pipeline.model"} <= set(profile["stages_ms"])
+    assert "cprofile" not in profile
+
+
+def test_cprofile_mode_via_query_parameter(profiling_client):
+    response = profiling_client.post("/v1/predict/regression?profile=cprofile", json={"inputs": _inputs(2)})
+
+    profile = response.get_json()["profile"]
+    assert profile["mode"] == "cprofile"
+    assert profile["cprofile"]
+    assert {"function", "calls", "total_ms", "cumulative_ms"} <= set(profile["cprofile"][0])
+
+
+def test_no_profile_without_header(client):
+    response = client.post("/v1/predict/regression", json={"inputs": _inputs(1)})
+    assert "profile" not in response.get_json()
+
+
+def test_profiling_is_reserved_to_admin_by_default():
+    client = create_app({"TESTING": True, "ADMIN_TOKEN": TOKEN}).test_client()
+
+    anonymous = client.post("/v1/predict/regression", json={"inputs": _inputs(1)}, headers={"X-Profile": "1"})
+    assert anonymous.status_code == 200
+    assert "profile" not in anonymous.get_json()
+
+    admin = client.post(
+        "/v1/predict/regression?profile=1",
+        json={"inputs": _inputs(1)},
+        headers={"Authorization": f"Bearer {TOKEN}"},
+    )
+    assert admin.get_json()["profile"]["rows"] == 1
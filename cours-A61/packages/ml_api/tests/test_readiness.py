@@ -0,0 +1,66 @@
+# tests/test_readiness.py
+
+import threading
+
+import pytest
+
+from api import readiness
+from api.app import create_app
+
+
+def test_ready_endpoint_with_lazy_preload(client):
+    # Mode par défaut : rien à attendre, le modèle sera chargé à la première requête
+    response = client.get("/ready")
+
+    assert response.status_code == 200
+    assert response.get_json()["state"] == "ready"
+
+
+def test_eager_preload_warms_up_before_create_app_returns():
+    app = create_app({"TESTING": True, "MODEL_PRELOAD": "eager", "MODEL_WARMUP_ROWS": 8})
+
+    payload = app.test_client().get("/ready").get_json()
+
+    assert payload["ready"] is True and payload["preload"] == "eager"
+    assert payload["warmup"]["rows"] == 8
+    assert payload["warmup"]["load_seconds"] >= 0
+
+
+def test_background_preload_is_not_ready_until_warm_up_finishes(monkeypatch):
+    release = threading.Event()
+
+    def slow_warm_up(n_rows):
+        release.wait(5)
+        return {"rows": n_rows, "load_seconds": 0.0, "warmup_seconds": 0.0}
+
+    monkeypatch.setattr(readiness, "warm_up", slow_warm_up)
+    app = create_app({"TESTING": True, "MODEL_PRELOAD": "background"})
+    client = app.test_client()
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.get_json()["state"] == "warming_up"
+    # Le contrôle de santé, lui, ne dépend pas du modèle
+    assert client.get("/").status_code == 200
+
+    release.set()
+    assert app.extensions["readiness"].wait(5)
+    assert client.get("/ready").status_code == 200
+
+
+def test_failed_warm_up_stays_not_ready(monkeypatch):
+    def broken_warm_up(n_rows):
+        raise FileNotFoundError("lasso_regression.pkl")
+
+    monkeypatch.setattr(readiness, "warm_up", broken_warm_up)
+    app = create_app({"TESTING": True, "MODEL_PRELOAD": "background"})
+    app.extensions["readiness"].wait(5)
+
+    response = app.test_client().get("/ready")
+    assert response.status_code == 503
+    assert response.get_json()["state"] == "failed"
+    assert "lasso_regression.pkl" in response.get_json()["error"]
+
+    # En mode "eager", l'erreur empêche l'application de démarrer
+    with pytest.raises(FileNotFoundError):
+        create_app({"TESTING": True, "MODEL_PRELOAD": "eager"})
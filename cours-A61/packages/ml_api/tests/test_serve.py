@@ -0,0 +1,104 @@
+# packages/ml_api/tests/test_serve.py
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+from regression_model.config.core import config
+from regression_model.processing.data_manager import load_dataset
+
+from api.workers import WorkerTable
+from serve import available_cpus
+
+ML_API_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_worker_table_counts_requests_per_worker():
+    table = WorkerTable(2)
+    assert available_cpus() >= 1
+
+    # Ligne 0 : le processus courant joue le rôle d'un worker
+    table.register(0, os.getpid())
+    table.attach(0)
+    for _ in range(3):
+        table.count_request()
+    table.register(1, 12345)
+    table.register(1, 12346)  # Worker remplacé
+
+    first, second = table.snapshot()
+    assert first["current"] and first["requests"] == 3
+    assert first["rss_bytes"] > 0
+    assert second["pid"] == 12346 and second["restarts"] == 1 and second["requests"] == 0
+
+
+def test_importing_serve_does_not_create_an_app():
+    # Dans le maître, aucune application (ni ses threads) avant les fork
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(ML_API_DIR), os.environ.get("PYTHONPATH", "")]))
+    code = (
+        "import api.app, serve\n"
+        "assert 'app' not in vars(api.app)\n"
+        "from api.app import app\n"  # Instance globale toujours disponible (WSGI)
+        "assert vars(api.app)['app'] is app\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ML_API_DIR, env=env, check=True, capture_output=True)
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def test_prefork_server_serves_predictions_and_stops_cleanly(tmp_path):
+    port = _free_port()
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(ML_API_DIR), os.environ.get("PYTHONPATH", "")]))
+    output = open(tmp_path / "serve.out", "w+")
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port), "--workers", "2"],
+        cwd=ML_API_DIR,
+        env=env,
+        stdout=output,
+        stderr=subprocess.STDOUT,
+    )
+    try:
+        # Le maître charge le modèle avant d'accepter les connexions
+        deadline = time.time() + 60
+        while True:
+            try:
+                stats = json.load(urllib.request.urlopen(f"http://127.0.0.1:{port}/v1/stats", timeout=5))
+                break
+            except OSError:
+                assert server.poll() is None and time.time() < deadline
+                time.sleep(0.2)
+
+        workers = stats["workers"]
+        assert len(workers) == 2
+        assert all(worker["pid"] for worker in workers)
+        assert sum(worker["requests"] for worker in workers) >= 1
+        assert any(worker["current"] for worker in workers)
+
+        rows = json.loads(load_dataset(file_name=config.app_config.test_data_file).head(2).to_json(orient="records"))
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{port}/v1/predict/regression",
+            data=json.dumps({"inputs": rows}).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        assert len(json.load(urllib.request.urlopen(request, timeout=30))["predictions"]) == 2
+    finally:
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=30) == 0
+
+    # Les logs écrits dans les workers (créés par fork) sont bien arrivés
+    output.seek(0)
+    logs = output.read()
+    output.close()
+    assert "Model preloaded" in logs and "All workers stopped" in logs
+    assert "Worker 0 (pid" in logs and "Worker 1 (pid" in logs
+    # (le maître journalise aussi les prédictions de l'échauffement, sur plus de lignes)
+    assert any("event=prediction " in line and " rows=2 " in line for line in logs.splitlines())
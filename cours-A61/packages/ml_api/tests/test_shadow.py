@@ -0,0 +1,73 @@
+# packages/ml_api/tests/test_shadow.py
+
+import json
+import threading
+import time
+
+from regression_model.config.core import config
+from regression_model.processing.data_manager import load_dataset
+
+from api.app import create_app
+from api.shadow import ShadowScorer
+
+
+def test_candidate_deltas_and_latency_are_recorded():
+    def fake_candidate(input_data, model):
+        # Le candidat prédit 10 de plus que le modèle servi ; la 2e ligne est invalide
+        return {"predictions": [row["price"] + 10.0 for row in input_data], "errors": {}, "version": "test"}
+
+    scorer = ShadowScorer("candidate", workers=2, predict_fn=fake_candidate)
+    assert scorer.submit([{"price": 100.0}, {"price": 200.0}], [100.0, None])
+    assert scorer.submit([{"price": 300.0}], [300.0])
+    scorer.wait()
+    scorer.close()
+
+    stats = scorer.stats()
+    assert stats["completed"] == 2 and stats["dropped"] == 0
+    assert stats["rows"] == 3
+    assert stats["compared_rows"] == 2
+    assert stats["delta"]["mean"] == 10.0
+    assert stats["delta"]["abs"]["max"] == 10.0
+    assert stats["latency_ms"]["p50"] is not None
+
+
+def test_shadow_work_is_dropped_when_the_queue_is_full():
+    release = threading.Event()
+
+    def slow_candidate(input_data, model):
+        release.wait(timeout=5)
+        return {"predictions": [1.0], "errors": {}, "version": "test"}
+
+    scorer = ShadowScorer("candidate", workers=1, max_queue_size=1, predict_fn=slow_candidate)
+    assert scorer.submit([{}], [1.0])
+    # Le thread a pris la première requête et reste bloqué dessus
+    while scorer.stats()["queued"]:
+        time.sleep(0.001)
+    assert scorer.submit([{}], [1.0])      # attend dans la file
+    assert not scorer.submit([{}], [1.0])  # file pleine : abandonnée, sans attendre
+
+    release.set()
+    scorer.wait()
+    scorer.close()
+    stats = scorer.stats()
+    assert stats["submitted"] == 2
+    assert stats["dropped"] == 1
+    assert stats["completed"] == 2
+
+
+def test_predict_endpoint_feeds_the_shadow_scorer():
+    app = create_app({"TESTING": True, "SHADOW_MODEL": "lasso_regression"})
+    test_data = load_dataset(file_name=config.app_config.test_data_file)
+    payload = {"inputs": json.loads(test_data.head(5).to_json(orient="records"))}
+
+    response = app.test_client().post("/v1/predict/regression", json=payload)
+    assert response.status_code == 200
+
+    scorer = app.extensions["shadow_scorer"]
+    scorer.wait()
+    scorer.close()
+    # Le candidat est ici le modèle servi lui-même : aucun écart
+    shadow = app.test_client().get("/v1/stats").get_json()["shadow"]
+    assert shadow["completed"] == 1
+    assert shadow["compared_rows"] == 5
+    assert shadow["delta"]["mean_abs"] == 0.0
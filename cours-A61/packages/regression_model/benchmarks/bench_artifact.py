@@ -0,0 +1,108 @@
+## benchmarks/bench_artifact.py ##
+#
+# Compare les deux formats d'artefact (.pkl et dossier mappé en mémoire) tels
+# que les voient N workers lancés en parallèle, comme sous Gunicorn :
+#   - durée de chargement du modèle ;
+#   - mémoire résidente (RSS) ajoutée par le chargement et la première prédiction ;
+#   - PSS du worker (mémoire partagée divisée par le nombre de processus qui la
+#     partagent) une fois tous les workers chargés. Linux uniquement.
+#
+# Utilisation (depuis packages/regression_model, comme dans tox.ini) :
+#   PYTHONPATH=. python benchmarks/bench_artifact.py --workers 4
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+
+def _memory_kb() -> Dict[str, int]:
+    """RSS (/proc/self/status) et PSS (/proc/self/smaps_rollup) du processus, en ko."""
+    memory = {}
+    for file_name, key, field in (
+        ("status", "rss", "VmRSS:"),
+        ("smaps_rollup", "pss", "Pss:"),
+    ):
+        try:
+            with open(f"/proc/self/{file_name}") as proc_file:
+                for line in proc_file:
+                    if line.startswith(field):
+                        memory[key] = int(line.split()[1])
+                        break
+        except OSError:
+            memory[key] = -1
+    return memory
+
+
+def run_worker(artifact_format: str) -> None:
+    """Code exécuté par chaque worker (processus fils)."""
+    import pandas as pd
+
+    from regression_model import logger
+    from regression_model.predict import _load_pipeline, configure_artifact_format, make_prediction
+    from regression_model.train_pipeline import TESTING_DATA_FILE
+
+    logger.setLevel("WARNING")
+    batch = pd.read_csv(TESTING_DATA_FILE).head(100)
+    configure_artifact_format(artifact_format)
+    before = _memory_kb()
+
+    start = time.perf_counter()
+    _load_pipeline()
+    load_seconds = time.perf_counter() - start
+    make_prediction(batch)
+    after = _memory_kb()
+
+    print(json.dumps({"load_ms": load_seconds * 1000.0, "rss_delta_kb": after["rss"] - before["rss"]}), flush=True)
+    # On attend que tous les workers soient chargés avant de mesurer le partage
+    sys.stdin.readline()
+    print(json.dumps({"pss_kb": _memory_kb()["pss"]}), flush=True)
+
+
+def run_format(artifact_format: str, workers: int) -> List[Dict[str, float]]:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+    processes = [
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "--worker", artifact_format],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            env=env,
+        )
+        for _ in range(workers)
+    ]
+    results = [json.loads(process.stdout.readline()) for process in processes]
+    for process, result in zip(processes, results):
+        process.stdin.write("\n")
+        process.stdin.flush()
+        result.update(json.loads(process.stdout.readline()))
+        process.wait()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare les artefacts .pkl et mappés en mémoire")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--worker", choices=("pkl", "mmap"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker)
+        return
+
+    print(f"{'format':>8} {'load (ms)':>10} {'RSS +kB':>10} {'PSS (MB)':>10}")
+    for artifact_format in ("pkl", "mmap"):
+        results = run_format(artifact_format, args.workers)
+        n = len(results)
+        load_ms = sum(r["load_ms"] for r in results) / n
+        rss_delta = sum(r["rss_delta_kb"] for r in results) / n
+        pss = sum(r["pss_kb"] for r in results) / n / 1024.0
+        print(f"{artifact_format:>8} {load_ms:>10.2f} {rss_delta:>10.0f} {pss:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
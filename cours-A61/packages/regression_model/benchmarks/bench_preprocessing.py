@@ -0,0 +1,69 @@
+## benchmarks/bench_preprocessing.py ##
+#
+# Compare les quatre étapes de préparation de price_pipe avec le
+# FusedPreprocessor : temps de transformation et pic de mémoire allouée.
+#
+# Utilisation (depuis packages/regression_model, comme dans tox.ini) :
+#   PYTHONPATH=. python benchmarks/bench_preprocessing.py --sizes 10000 100000
+
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+from sklearn.base import clone
+
+from regression_model.pipeline import CATEGORICAL_VARS, LOG_VARS, price_pipe
+from regression_model.processing.preprocessors import FusedPreprocessor
+from regression_model.train_pipeline import FEATURES, TESTING_DATA_FILE, TRAINING_DATA_FILE
+
+
+def make_batch(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Lot synthétique de n_rows maisons, tirées avec remise dans test.csv."""
+    test_data = pd.read_csv(TESTING_DATA_FILE)[FEATURES]
+    return test_data.sample(n=n_rows, replace=True, random_state=seed).reset_index(drop=True)
+
+
+def measure(transform, batch: pd.DataFrame, repeat: int):
+    """Meilleur temps sur `repeat` essais, puis pic mémoire d'un essai supplémentaire."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        transform(batch)
+        best = min(best, time.perf_counter() - start)
+
+    # Mesure mémoire séparée : tracemalloc ralentit fortement les allocations
+    tracemalloc.start()
+    transform(batch)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Les deux variantes sont entraînées sur les mêmes données
+    train = pd.read_csv(TRAINING_DATA_FILE)[FEATURES]
+    four_steps = clone(price_pipe)[:-1].fit(train)
+    fused = FusedPreprocessor(categorical_variables=CATEGORICAL_VARS, log_variables=LOG_VARS).fit(train)
+
+    print(f"{'rows':>10} {'variant':>12} {'time (s)':>10} {'peak (MB)':>10}")
+    for n_rows in args.sizes:
+        batch = make_batch(n_rows)
+        results = {
+            "four_steps": measure(four_steps.transform, batch, args.repeat),
+            "fused": measure(fused.transform, batch, args.repeat),
+        }
+        for variant, (seconds, peak) in results.items():
+            print(f"{n_rows:>10} {variant:>12} {seconds:>10.4f} {peak / 1e6:>10.1f}")
+
+        (t_ref, m_ref), (t_fused, m_fused) = results["four_steps"], results["fused"]
+        print(f"{'':>10} {'gain':>12} {t_ref / t_fused:>9.1f}x {m_ref / m_fused:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
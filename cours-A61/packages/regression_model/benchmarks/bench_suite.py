@@ -0,0 +1,228 @@
+## benchmarks/bench_suite.py ##
+#
+# Suite de benchmarks pour détecter les régressions de performance.
+#
+# Mesures :
+#   - make_prediction : latence et débit pour des lots de 1 à 100 000 lignes
+#     (les gros lots sont tirés avec remise dans datasets/test.csv) ;
+#   - run_training    : durée et pic de mémoire allouée (sans sauvegarde) ;
+#   - chaque transformateur de processing/preprocessors.py, sur un lot fixe.
+#
+# Les résultats sont écrits en JSON ; le mode "compare" confronte deux
+# fichiers et échoue (code de sortie 1) si une mesure se dégrade au-delà
+# d'un seuil relatif.
+#
+# Utilisation (depuis packages/regression_model, comme dans tox.ini) :
+#   PYTHONPATH=. python benchmarks/bench_suite.py run --output baseline.json
+#   PYTHONPATH=. python benchmarks/bench_suite.py run --output current.json
+#   PYTHONPATH=. python benchmarks/bench_suite.py compare baseline.json current.json --threshold 0.15
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.base import clone
+
+from regression_model import __version__, logger
+from regression_model.pipeline import CATEGORICAL_VARS, LOG_VARS, price_pipe
+from regression_model.predict import _load_pipeline, make_prediction
+from regression_model.processing.preprocessors import FusedPreprocessor
+from regression_model.train_pipeline import (
+    FEATURES,
+    TARGET,
+    TESTING_DATA_FILE,
+    TRAINING_DATA_FILE,
+    run_training,
+)
+
+DEFAULT_SIZES = [1, 10, 100, 1_000, 10_000, 100_000]
+
+# Budget de temps par mesure : les petits lots sont répétés davantage
+_TARGET_SECONDS = 1.0
+_MAX_REPEAT = 200
+
+Metrics = Dict[str, Dict[str, Any]]
+
+
+def make_batch(test_data: pd.DataFrame, n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Lot de n_rows maisons : test.csv tel quel, ou tiré avec remise au-delà."""
+    if n_rows <= len(test_data):
+        return test_data.iloc[:n_rows].reset_index(drop=True)
+    return test_data.sample(n=n_rows, replace=True, random_state=seed).reset_index(drop=True)
+
+
+def time_calls(function: Callable[[], Any], min_repeat: int = 3) -> List[float]:
+    """Durées (s) de plusieurs appels : assez pour remplir le budget, au moins min_repeat."""
+    durations = []
+    budget_end = time.perf_counter() + _TARGET_SECONDS
+    while len(durations) < min_repeat or (
+        time.perf_counter() < budget_end and len(durations) < _MAX_REPEAT
+    ):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def peak_memory(function: Callable[[], Any]) -> int:
+    """Pic de mémoire allouée (octets) pendant un appel, mesuré par tracemalloc."""
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def _metric(value: float, unit: str, better: str = "lower") -> Dict[str, Any]:
+    return {"value": value, "unit": unit, "better": better}
+
+
+def bench_make_prediction(test_data: pd.DataFrame, sizes: List[int]) -> Metrics:
+    metrics: Metrics = {}
+    _load_pipeline()  # Le chargement du modèle n'est pas compté
+    for n_rows in sizes:
+        batch = make_batch(test_data, n_rows)
+        durations = time_calls(lambda: make_prediction(batch))
+        median = statistics.median(durations)
+        prefix = f"make_prediction.rows_{n_rows}"
+        metrics[f"{prefix}.latency_p50_s"] = _metric(median, "s")
+        metrics[f"{prefix}.latency_min_s"] = _metric(min(durations), "s")
+        metrics[f"{prefix}.throughput_rows_per_s"] = _metric(n_rows / median, "rows/s", better="higher")
+        metrics[f"{prefix}.peak_memory_bytes"] = _metric(peak_memory(lambda: make_prediction(batch)), "bytes")
+    return metrics
+
+
+def bench_training() -> Metrics:
+    durations = time_calls(lambda: run_training(save=False), min_repeat=3)
+    return {
+        "run_training.duration_s": _metric(statistics.median(durations), "s"),
+        "run_training.peak_memory_bytes": _metric(peak_memory(lambda: run_training(save=False)), "bytes"),
+    }
+
+
+def bench_transformers(test_data: pd.DataFrame, n_rows: int) -> Metrics:
+    """
+    Chaque transformateur est mesuré sur ce qu'il reçoit réellement dans
+    price_pipe : la sortie de l'étape précédente. FusedPreprocessor, qui
+    remplace les quatre étapes, reçoit directement les données brutes.
+    """
+    train = pd.read_csv(TRAINING_DATA_FILE)
+    steps = clone(price_pipe)[:-1].fit(train[FEATURES], train[TARGET])
+    fused = FusedPreprocessor(categorical_variables=CATEGORICAL_VARS, log_variables=LOG_VARS).fit(train[FEATURES])
+
+    metrics: Metrics = {}
+    X = make_batch(test_data, n_rows)[FEATURES]
+    transformers = [(type(step).__name__, step) for _, step in steps.steps]
+    inputs = []
+    for _, step in transformers:
+        inputs.append(X)
+        X = step.transform(X)
+    transformers.append(("FusedPreprocessor", fused))
+    inputs.append(inputs[0])
+
+    for (name, transformer), batch in zip(transformers, inputs):
+        prefix = f"transformer.{name}.rows_{n_rows}"
+        durations = time_calls(lambda: transformer.transform(batch))
+        metrics[f"{prefix}.transform_p50_s"] = _metric(statistics.median(durations), "s")
+        metrics[f"{prefix}.peak_memory_bytes"] = _metric(peak_memory(lambda: transformer.transform(batch)), "bytes")
+    return metrics
+
+
+def run(args: argparse.Namespace) -> int:
+    # Les logs de chaque prédiction fausseraient les mesures
+    logger.setLevel("WARNING")
+    test_data = pd.read_csv(TESTING_DATA_FILE)
+
+    metrics: Metrics = {}
+    metrics.update(bench_make_prediction(test_data, args.sizes))
+    if not args.skip_training:
+        metrics.update(bench_training())
+    metrics.update(bench_transformers(test_data, args.transformer_rows))
+
+    results = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "model_version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "sklearn": sklearn.__version__,
+        },
+        "metrics": metrics,
+    }
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+
+    for name, metric in metrics.items():
+        print(f"{name:<60} {metric['value']:>14.6g} {metric['unit']}")
+    print(f"Résultats écrits dans {args.output}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    """Compare deux fichiers de résultats ; code 1 si une mesure régresse au-delà du seuil."""
+    with open(args.baseline) as baseline_file, open(args.current) as current_file:
+        baseline = json.load(baseline_file)["metrics"]
+        current = json.load(current_file)["metrics"]
+
+    regressions = []
+    print(f"{'metric':<60} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name in sorted(set(baseline) & set(current)):
+        before, after = baseline[name]["value"], current[name]["value"]
+        if before == 0:
+            continue
+        change = (after - before) / before
+        # Variation dans le "mauvais" sens (plus lent, moins de débit...)
+        worse = change if current[name]["better"] == "lower" else -change
+        flag = ""
+        if worse > args.threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<60} {before:>12.6g} {after:>12.6g} {change:>+8.1%}{flag}")
+
+    missing = sorted(set(baseline) - set(current))
+    if missing:
+        print(f"Mesures absentes du fichier courant : {', '.join(missing)}")
+
+    if regressions:
+        print(f"{len(regressions)} régression(s) au-delà de {args.threshold:.0%}")
+        return 1
+    print(f"Aucune régression au-delà de {args.threshold:.0%}")
+    return 0
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de regression_model")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Exécute la suite et écrit les résultats en JSON")
+    run_parser.add_argument("--output", default="benchmark_results.json")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    run_parser.add_argument("--transformer-rows", type=int, default=10_000)
+    run_parser.add_argument("--skip-training", action="store_true")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare deux fichiers de résultats")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Dégradation relative tolérée (0.10 = 10 %%)")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
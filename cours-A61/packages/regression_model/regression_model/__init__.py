@@ -1,6 +1,12 @@
 # regression_model/__init__.py
+#
+# Rien n'est lu ni configuré à l'import du package : la version et le logger
+# sont créés au premier accès (regression_model.__version__, .logger), ce qui
+# garde légers les imports de sous-modules (config, timing...).
 
 from pathlib import Path
+from typing import Any
+
 from .logging_config import get_logger
 
 # Dossier racine du package regression_model
@@ -9,10 +15,19 @@ PACKAGE_ROOT = Path(__file__).resolve().parent
 # Fichier de version (ton fichier s'appelle bien VERSION.txt)
 VERSION_PATH = PACKAGE_ROOT / "VERSION.txt"
 
-with open(VERSION_PATH, "r") as version_file:
-    __version__ = version_file.read().strip()
+__all__ = ["logger", "__version__"]
 
-# Logger global du package
-logger = get_logger("regression_model")
 
-__all__ = ["logger", "__version__"]
+def __getattr__(name: str) -> Any:
+    # Appelé seulement pour les attributs absents : une fois créés, ils sont
+    # stockés dans le module et les accès suivants ne passent plus par ici
+    if name == "__version__":
+        with open(VERSION_PATH, "r") as version_file:
+            value = version_file.read().strip()
+    elif name == "logger":
+        # Logger global du package
+        value = get_logger("regression_model")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
@@ -0,0 +1,205 @@
+# regression_model/batch_scoring.py
+#
+# Prédiction hors-ligne d'un gros fichier CSV, en parallèle.
+#
+# Exemples :
+#   python -m regression_model.batch_scoring maisons.csv predictions.csv
+#   regression-model-score maisons.csv predictions.parquet --chunk-size 50000 --workers 8
+
+import argparse
+import logging
+import multiprocessing.util
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from regression_model.logging_config import stop_async_logging
+from regression_model.predict import _load_pipeline, make_prediction
+from regression_model.processing.data_manager import load_dataset_chunks
+
+# Logger principal du package
+logger = logging.getLogger("regression_model")
+
+# Colonne d'identifiant recopiée dans le fichier de sortie (si présente)
+ID_COLUMN = "Id"
+PREDICTION_COLUMN = "prediction"
+
+
+class ScoringError(Exception):
+    """Le fichier d'entrée ne peut pas être prédit (colonnes manquantes, etc.)."""
+
+
+def _init_worker() -> None:
+    """Exécuté une fois par processus du pool : charge le pipeline avant le premier morceau."""
+    # Les morceaux sont gros : inutile de journaliser leur contenu à chaque appel
+    logger.setLevel(logging.WARNING)
+    # Le processus sort par os._exit, sans fonctions atexit : les derniers
+    # messages (avertissements de lignes invalides) sont écrits avant
+    multiprocessing.util.Finalize(None, stop_async_logging, exitpriority=0)
+    _load_pipeline()
+
+
+def _score_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Prédit un morceau et renvoie uniquement les colonnes à écrire."""
+    result = make_prediction(chunk)
+    if result["predictions"] is None:
+        raise ScoringError(f"Validation errors: {result['errors']}")
+    invalid_rows = result["errors"].get("invalid_rows")
+    if invalid_rows:
+        # Lignes aux valeurs invalides : prédiction vide (NaN), le reste est écrit
+        logger.warning(
+            f"{len(invalid_rows)} invalid row(s) left without prediction, first: {invalid_rows[0]}"
+        )
+
+    output = pd.DataFrame({PREDICTION_COLUMN: np.asarray(result["predictions"], dtype=np.float64)})
+    if ID_COLUMN in chunk.columns:
+        output.insert(0, ID_COLUMN, chunk[ID_COLUMN].to_numpy())
+    return output
+
+
+def _ordered_results(
+    chunks: Iterable[pd.DataFrame], workers: int
+) -> Iterator[pd.DataFrame]:
+    """
+    Répartit les morceaux entre `workers` processus et rend les résultats dans l'ordre.
+
+    On ne soumet jamais plus de 2 × workers morceaux à la fois : la lecture du
+    fichier avance au rythme des prédictions et la mémoire reste bornée.
+    """
+    if workers <= 1:
+        # Pas de pool : tout se passe dans le processus courant, dont le
+        # niveau de log n'est changé que le temps de la prédiction
+        level = logger.level
+        logger.setLevel(logging.WARNING)
+        try:
+            _load_pipeline()
+            for chunk in chunks:
+                yield _score_chunk(chunk)
+        finally:
+            logger.setLevel(level)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        in_flight: "deque[Future]" = deque()
+        for chunk in chunks:
+            in_flight.append(executor.submit(_score_chunk, chunk))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def _csv_writer(output_path: Path) -> Callable[[Optional[pd.DataFrame]], None]:
+    """Écrit les morceaux à la suite dans un CSV (en-tête une seule fois)."""
+    state = {"header": True}
+
+    def write(frame: Optional[pd.DataFrame]) -> None:
+        if frame is None:
+            return
+        frame.to_csv(output_path, mode="w" if state["header"] else "a", header=state["header"], index=False)
+        state["header"] = False
+
+    return write
+
+
+def _parquet_writer(output_path: Path) -> Callable[[Optional[pd.DataFrame]], None]:
+    """Écrit les morceaux à la suite dans un fichier Parquet (nécessite pyarrow)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ScoringError("Parquet output requires the 'pyarrow' package") from error
+
+    state = {"writer": None}
+
+    def write(frame: Optional[pd.DataFrame]) -> None:
+        if frame is None:
+            # Fin du flux : fermeture du fichier
+            if state["writer"] is not None:
+                state["writer"].close()
+            return
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if state["writer"] is None:
+            state["writer"] = pq.ParquetWriter(output_path, table.schema)
+        state["writer"].write_table(table)
+
+    return write
+
+
+def score_file(
+    input_path: Path,
+    output_path: Path,
+    chunk_size: int = 10_000,
+    workers: int = 1,
+    output_format: Optional[str] = None,
+) -> int:
+    """
+    Prédit toutes les lignes de `input_path` et écrit les résultats dans `output_path`.
+
+    Les prédictions sont écrites dans l'ordre des lignes d'entrée, avec la
+    colonne Id si elle existe. Renvoie le nombre de lignes prédites.
+    """
+    output_format = output_format or ("parquet" if output_path.suffix == ".parquet" else "csv")
+    write = _parquet_writer(output_path) if output_format == "parquet" else _csv_writer(output_path)
+
+    # Chemin absolu : load_dataset_chunks ne cherche alors pas dans datasets/
+    chunks = load_dataset_chunks(file_name=str(input_path.resolve()), chunksize=chunk_size)
+    n_rows = 0
+    try:
+        for result in _ordered_results(chunks, workers):
+            write(result)
+            n_rows += len(result)
+    finally:
+        write(None)
+    return n_rows
+
+
+def _default_workers() -> int:
+    # Nombre de cœurs réellement utilisables par ce processus (cgroups, taskset...)
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="regression-model-score",
+        description="Prédit les prix d'un fichier CSV de maisons, par morceaux et en parallèle.",
+    )
+    parser.add_argument("input", type=Path, help="Fichier CSV d'entrée (mêmes colonnes que test.csv)")
+    parser.add_argument("output", type=Path, help="Fichier de sortie (.csv ou .parquet)")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="Lignes par morceau (défaut : 10000)")
+    parser.add_argument("--workers", type=int, default=_default_workers(), help="Nombre de processus (défaut : nombre de cœurs)")
+    parser.add_argument("--format", choices=("csv", "parquet"), default=None, help="Format de sortie (défaut : d'après l'extension)")
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error("--chunk-size doit être >= 1")
+    if args.workers < 1:
+        parser.error("--workers doit être >= 1")
+
+    start = time.perf_counter()
+    try:
+        n_rows = score_file(args.input, args.output, args.chunk_size, args.workers, args.format)
+    except ScoringError as error:
+        print(f"Erreur : {error}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    # Résumé du débit obtenu
+    rate = n_rows / elapsed if elapsed > 0 else float("inf")
+    print(
+        f"{n_rows} lignes prédites en {elapsed:.2f}s "
+        f"({rate:,.0f} lignes/s, {args.workers} processus, morceaux de {args.chunk_size})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
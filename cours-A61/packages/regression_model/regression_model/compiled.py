@@ -0,0 +1,97 @@
+# regression_model/compiled.py
+
+from typing import TYPE_CHECKING, Any, List, Mapping
+
+import numpy as np
+
+from regression_model.processing.fused import FusedTables
+
+if TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
+
+
+class CompiledPipeline:
+    """
+    Version "compilée" d'un price_pipe entraîné.
+
+    Une fois entraîné, le pipeline se résume à quelques tables :
+      - les constantes de remplissage (médianes de NumericalImputer) ;
+      - la liste des colonnes passées au logarithme ;
+      - les tables de codes de SimpleCategoricalEncoder ;
+      - les coefficients et l'ordonnée à l'origine du Lasso.
+
+    La préparation des données est confiée à un FusedPreprocessor, qui remplit
+    une unique matrice float64 par blocs de colonnes (voir preprocessors.py) ;
+    la prédiction n'est ensuite qu'un produit matriciel, sans DataFrame
+    intermédiaire ni copie par étape.
+    """
+
+    def __init__(self, preprocessor: FusedTables, coef: np.ndarray, intercept: float) -> None:
+        self.preprocessor = preprocessor
+        # Coefficients rangés dans l'ordre des colonnes de la matrice
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+
+    @property
+    def feature_names(self) -> List[str]:
+        """Ordre des colonnes de la matrice interne (et donc de self.coef)."""
+        return list(self.preprocessor.get_feature_names_out())
+
+    def transform(self, X: Mapping[str, Any]) -> np.ndarray:
+        """
+        Applique imputation, log et encodage en remplissant une seule matrice.
+
+        X peut être un DataFrame ou n'importe quel dictionnaire colonne → tableau.
+        """
+        return self.preprocessor.transform(X)
+
+    def predict(self, X: Mapping[str, Any]) -> np.ndarray:
+        """Prédictions identiques (aux arrondis près) à pipeline.predict(X)."""
+        return self.transform(X) @ self.coef + self.intercept
+
+
+def compile_pipeline(pipeline: "Pipeline") -> CompiledPipeline:
+    """
+    Transforme un pipeline entraîné en CompiledPipeline.
+
+    Deux structures sont acceptées :
+      - celle de price_pipe : CategoricalImputer → NumericalImputer →
+        LogTransformer → SimpleCategoricalEncoder → Lasso ;
+      - celle de fused_price_pipe : FusedPreprocessor → Lasso.
+    Toute autre structure lève une ValueError (mieux vaut refuser que de
+    produire des prédictions silencieusement fausses).
+    """
+    # Import local : le pipeline reçu est déjà un objet sklearn, mais le simple
+    # usage d'un CompiledPipeline (artefact mappé) ne doit pas charger sklearn
+    from sklearn.linear_model import Lasso
+
+    from regression_model.processing.preprocessors import (
+        CategoricalImputer,
+        FusedPreprocessor,
+        LogTransformer,
+        NumericalImputer,
+        SimpleCategoricalEncoder,
+    )
+
+    steps = [step for _, step in pipeline.steps]
+    kinds = tuple(type(step) for step in steps)
+
+    if kinds == (FusedPreprocessor, Lasso):
+        preprocessor, model = steps
+        # Le Lasso a été entraîné directement sur la matrice du préprocesseur
+        return CompiledPipeline(preprocessor, model.coef_, model.intercept_)
+
+    if kinds == (CategoricalImputer, NumericalImputer, LogTransformer, SimpleCategoricalEncoder, Lasso):
+        *preprocessing_steps, model = steps
+        # Ordre des colonnes vues par le Lasso à l'entraînement
+        model_features = [str(name) for name in model.feature_names_in_]
+        preprocessor = FusedPreprocessor.from_fitted_steps(*preprocessing_steps, feature_names=model_features)
+
+        coef_by_feature = dict(zip(model_features, model.coef_))
+        coef = [coef_by_feature[f] for f in preprocessor.get_feature_names_out()]
+        return CompiledPipeline(preprocessor, np.array(coef), model.intercept_)
+
+    raise ValueError(
+        "Impossible de compiler ce pipeline : structure inattendue "
+        f"{[kind.__name__ for kind in kinds]}"
+    )
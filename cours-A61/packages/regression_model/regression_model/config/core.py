@@ -2,6 +2,7 @@
 
 from pathlib import Path
 from dataclasses import dataclass
+from typing import List
 
 
 # ---- Chemins de base du package ----
@@ -12,6 +13,148 @@ TRAINED_MODEL_DIR = PACKAGE_ROOT / "trained_models" # Dossier des modèles sauve
 VERSION_FILE_PATH = PACKAGE_ROOT / "VERSION.txt"   # Fichier contenant la version
 
 
+# ---- Modèle et données ----
+# Ce module n'importe ni scikit-learn ni pandas : le code de prédiction
+# (predict.py) y lit ces constantes sans charger le code d'entraînement.
+
+# Un nom simple pour identifier notre pipeline sauvegardé
+PIPELINE_NAME = "lasso_regression"
+# Dossier de l'artefact mappé en mémoire (voir mmap_artifact.py)
+MMAP_ARTIFACT_NAME = f"{PIPELINE_NAME}.mmap"
+
+# Les données pour tester le modèle
+TESTING_DATA_FILE = DATASET_DIR / "test.csv"
+# Les données pour entraîner le modèle
+TRAINING_DATA_FILE = DATASET_DIR / "train.csv"
+
+# Ce qu'on veut prédire : le prix de vente des maisons
+TARGET = "SalePrice"
+
+# Toutes les caractéristiques qu'on utilise pour faire nos prédictions
+FEATURES: List[str] = [
+    "MSSubClass",
+    "MSZoning",
+    "LotFrontage",
+    "LotArea",
+    "Street",
+    "Alley",
+    "LotShape",
+    "LandContour",
+    "Utilities",
+    "LotConfig",
+    "LandSlope",
+    "Neighborhood",
+    "Condition1",
+    "Condition2",
+    "BldgType",
+    "HouseStyle",
+    "OverallQual",
+    "OverallCond",
+    "YearBuilt",
+    "YearRemodAdd",
+    "RoofStyle",
+    "RoofMatl",
+    "Exterior1st",
+    "Exterior2nd",
+    "MasVnrType",
+    "MasVnrArea",
+    "ExterQual",
+    "ExterCond",
+    "Foundation",
+    "BsmtQual",
+    "BsmtCond",
+    "BsmtExposure",
+    "BsmtFinType1",
+    "BsmtFinSF1",
+    "BsmtFinType2",
+    "BsmtFinSF2",
+    "BsmtUnfSF",
+    "TotalBsmtSF",
+    "Heating",
+    "HeatingQC",
+    "CentralAir",
+    "Electrical",
+    "1stFlrSF",
+    "2ndFlrSF",
+    "LowQualFinSF",
+    "GrLivArea",
+    "BsmtFullBath",
+    "BsmtHalfBath",
+    "FullBath",
+    "HalfBath",
+    "BedroomAbvGr",
+    "KitchenAbvGr",
+    "KitchenQual",
+    "TotRmsAbvGrd",
+    "Functional",
+    "Fireplaces",
+    "FireplaceQu",
+    "GarageType",
+    "GarageYrBlt",
+    "GarageFinish",
+    "GarageCars",
+    "GarageArea",
+    "GarageQual",
+    "GarageCond",
+    "PavedDrive",
+    "WoodDeckSF",
+    "OpenPorchSF",
+    "EnclosedPorch",
+    "3SsnPorch",
+    "ScreenPorch",
+    "PoolArea",
+    "PoolQC",
+    "Fence",
+    "MiscFeature",
+    "MiscVal",
+    "MoSold",
+    "YrSold",
+    "SaleType",
+    "SaleCondition",
+]
+
+# Parmi ces caractéristiques, celles qui sont des nombres (surfaces, années,
+# nombres de pièces...) ; toutes les autres sont du texte (catégories)
+NUMERIC_FEATURES: List[str] = [
+    "MSSubClass",
+    "LotFrontage",
+    "LotArea",
+    "OverallQual",
+    "OverallCond",
+    "YearBuilt",
+    "YearRemodAdd",
+    "MasVnrArea",
+    "BsmtFinSF1",
+    "BsmtFinSF2",
+    "BsmtUnfSF",
+    "TotalBsmtSF",
+    "1stFlrSF",
+    "2ndFlrSF",
+    "LowQualFinSF",
+    "GrLivArea",
+    "BsmtFullBath",
+    "BsmtHalfBath",
+    "FullBath",
+    "HalfBath",
+    "BedroomAbvGr",
+    "KitchenAbvGr",
+    "TotRmsAbvGrd",
+    "Fireplaces",
+    "GarageYrBlt",
+    "GarageCars",
+    "GarageArea",
+    "WoodDeckSF",
+    "OpenPorchSF",
+    "EnclosedPorch",
+    "3SsnPorch",
+    "ScreenPorch",
+    "PoolArea",
+    "MiscVal",
+    "MoSold",
+    "YrSold",
+]
+
+
 # ---- Config de l'application ----
 
 @dataclass
@@ -48,7 +191,7 @@ def create_and_validate_config() -> Config:
         package_name="regression_model",    # Notre package
         training_data_file="train.csv",     # Fichier pour l'entraînement
         test_data_file="test.csv",          # Fichier pour les tests
-        pipeline_name="lasso_regression",   # Nom de notre pipeline
+        pipeline_name=PIPELINE_NAME,        # Nom de notre pipeline
     )
 
     # Validation basique pourrait être ajoutée ici si besoin
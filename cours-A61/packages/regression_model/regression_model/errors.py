@@ -4,4 +4,13 @@ class BaseError(Exception):
 
 class InvalidModelInputError(BaseError):
     """Erreur spécifique quand les données fournies au modèle ne sont pas valides."""
-    pass
\ No newline at end of file
+    pass
+
+class UnknownModelError(BaseError):
+    """Erreur levée quand le modèle demandé n'existe pas dans trained_models/."""
+    pass
+
+
+class ModelLoadError(BaseError):
+    """Erreur levée quand l'artefact d'un modèle existe mais ne peut pas être chargé."""
+    pass
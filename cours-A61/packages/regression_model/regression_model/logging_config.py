@@ -1,23 +1,172 @@
 # regression_model/logging_config.py
 
+import atexit
+import hashlib
 import logging
+import os
+import queue
+import random
 import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
 
 # Format standard pour tous nos messages de log
 # Inclut : timestamp, nom du logger, niveau de log, message
 LOG_FORMAT = "%(asctime)s — %(name)s — %(levelname)s — %(message)s"
 
+# Modes de journalisation des prédictions :
+#   - "structured" : nombre de lignes, empreinte et durées (jamais le contenu)
+#   - "full"       : ancien comportement, contenu complet de chaque requête
+LOG_MODES = ("structured", "full")
+
+# Nombre maximal de messages en attente d'écriture ; au-delà ils sont perdus
+# (et comptés) plutôt que de bloquer le thread qui prédit
+LOG_QUEUE_SIZE = 10_000
+
+# Réglages courants de la journalisation des prédictions (modifiables à chaud)
+_prediction_logging: Dict[str, Any] = {
+    "mode": os.environ.get("REGRESSION_MODEL_LOG_MODE", "structured"),
+    # Proportion des requêtes dont le contenu complet est quand même journalisé
+    "payload_sample_rate": float(os.environ.get("REGRESSION_MODEL_LOG_PAYLOAD_SAMPLE_RATE", "0")),
+}
+
+# Un seul thread d'écriture par logger (remplacé si le logger est reconfiguré)
+_listeners: Dict[str, QueueListener] = {}
+_listeners_lock = threading.Lock()
+
+
+class AsyncQueueHandler(QueueHandler):
+    """
+    QueueHandler qui ne bloque jamais : si la file est pleine, le message est
+    abandonné et compté dans `dropped`.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def make_async(logger: logging.Logger) -> logging.Logger:
+    """
+    Déplace les handlers d'un logger dans un thread d'écriture dédié.
+
+    Le logger ne garde qu'un AsyncQueueHandler : l'appelant dépose le message
+    dans une file et repart aussitôt, l'écriture (console, fichier) est faite
+    par un QueueListener en arrière-plan.
+    """
+    with _listeners_lock:
+        handlers = [h for h in logger.handlers if not isinstance(h, AsyncQueueHandler)]
+        previous = _listeners.pop(logger.name, None)
+        if previous is not None:
+            previous.stop()
+        if not handlers:
+            return logger
+
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(AsyncQueueHandler(log_queue))
+
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        _listeners[logger.name] = listener
+    return logger
+
+
+@atexit.register
+def stop_async_logging() -> None:
+    """
+    Vide les files et arrête les threads d'écriture (appelé à la fin du processus).
+
+    os._exit n'exécute pas les fonctions atexit : un processus créé par fork
+    qui se termine ainsi doit l'appeler lui-même pour écrire ses derniers messages.
+    """
+    with _listeners_lock:
+        for listener in _listeners.values():
+            listener.stop()
+        _listeners.clear()
+
+
+def _restart_listeners_after_fork() -> None:
+    ## Seul le thread qui a appelé fork() existe dans le processus enfant : les
+    ## threads d'écriture hérités sont morts, et une file ou un verrou pris à
+    ## ce moment-là par un autre thread ne serait jamais relâché. On repart
+    ## donc de files et de threads neufs, avec les mêmes handlers. Les messages
+    ## encore en attente dans la copie de la file seront écrits par le parent.
+    global _listeners_lock
+    _listeners_lock = threading.Lock()
+    for name, previous in list(_listeners.items()):
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        for handler in logging.getLogger(name).handlers:
+            if isinstance(handler, AsyncQueueHandler):
+                handler.queue = log_queue
+        listener = QueueListener(log_queue, *previous.handlers, respect_handler_level=previous.respect_handler_level)
+        listener.start()
+        _listeners[name] = listener
+
+
+if hasattr(os, "register_at_fork"):  # pas de fork() sous Windows
+    os.register_at_fork(after_in_child=_restart_listeners_after_fork)
+
+
+def configure_prediction_logging(
+    mode: Optional[str] = None, payload_sample_rate: Optional[float] = None
+) -> None:
+    """Change le mode de journalisation des prédictions et le taux d'échantillonnage."""
+    if mode is not None:
+        if mode not in LOG_MODES:
+            raise ValueError(f"Unknown log mode {mode!r}, expected one of {LOG_MODES}")
+        _prediction_logging["mode"] = mode
+    if payload_sample_rate is not None:
+        _prediction_logging["payload_sample_rate"] = min(max(float(payload_sample_rate), 0.0), 1.0)
+
+
+def should_log_payload() -> bool:
+    """
+    Indique si le contenu complet de la requête en cours doit être journalisé.
+
+    Toujours vrai en mode "full" ; en mode "structured", vrai pour une
+    proportion `payload_sample_rate` des requêtes (tirage aléatoire).
+    """
+    if _prediction_logging["mode"] == "full":
+        return True
+    rate = _prediction_logging["payload_sample_rate"]
+    return rate > 0.0 and random.random() < rate
+
+
+def payload_digest(payload: bytes) -> str:
+    """Empreinte courte d'un corps de requête, pour rapprocher les logs d'une même requête."""
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+
+def format_fields(**fields: Any) -> str:
+    """Met des champs au format "clé=valeur", séparés par des espaces (logfmt)."""
+    return " ".join(
+        f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+        for key, value in fields.items()
+    )
+
 
 def get_logger(logger_name: str) -> logging.Logger:
     """
     Crée et configure un logger pour une partie spécifique du projet.
-    
+
     Cette fonction centralise la configuration des logs pour garantir
     une cohérence dans tout le package regression_model.
-    
+
+    L'écriture des messages est faite par un thread dédié (voir make_async) :
+    journaliser ne ralentit pas les prédictions.
+
     Args:
         logger_name: Le nom du logger (ex: "regression_model.predict")
-        
+
     Returns:
         Un logger configuré et prêt à l'emploi
     """
@@ -29,18 +178,21 @@ def get_logger(logger_name: str) -> logging.Logger:
     if not logger.handlers:
         # Handler qui envoie les logs vers la sortie standard (console)
         handler = logging.StreamHandler(sys.stdout)
-        
+
         # Application de notre format personnalisé
         formatter = logging.Formatter(LOG_FORMAT)
         handler.setFormatter(formatter)
 
         # Association du handler au logger
         logger.addHandler(handler)
-        
+
         # Définition du niveau de log (INFO = messages informatifs et plus critiques)
         logger.setLevel(logging.INFO)
-        
+
         # Désactivation de la propagation pour un contrôle total
         logger.propagate = False
 
-    return logger
\ No newline at end of file
+        # Écriture en arrière-plan
+        make_async(logger)
+
+    return logger
@@ -0,0 +1,135 @@
+# regression_model/mmap_artifact.py
+#
+# Format d'artefact "mappé en mémoire" : un dossier contenant un manifest.json
+# et quelques tableaux .npy (médianes, tables de catégories, coefficients).
+#
+# Les tableaux sont ouverts avec np.load(mmap_mode="r") : rien n'est copié au
+# chargement, les pages sont lues dans le cache du système à la demande et
+# partagées par tous les processus (workers Gunicorn) qui ouvrent le même dossier.
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict
+
+import numpy as np
+
+from regression_model.compiled import CompiledPipeline, compile_pipeline
+from regression_model.processing.fused import FusedTables
+
+if TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
+
+# Version du format (à incrémenter si la structure du dossier change)
+FORMAT_VERSION = 1
+MANIFEST_FILE_NAME = "manifest.json"
+
+
+def _array_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def save_mmap_artifact(pipeline: "Pipeline", directory: Path, model_version: str) -> Path:
+    """
+    Sauvegarde un pipeline entraîné au format mappé en mémoire.
+
+    Le pipeline est d'abord compilé (voir compiled.py) : seules ses tables
+    numériques sont écrites. Le dossier est rempli à côté puis renommé, de
+    sorte qu'un processus qui le lit ne voit jamais un artefact à moitié écrit.
+    """
+    directory = Path(directory)
+    compiled = compile_pipeline(pipeline)
+    preprocessor = compiled.preprocessor
+
+    # Toutes les catégories dans un seul tableau de chaînes à largeur fixe,
+    # découpé par les positions de début/fin de chaque variable
+    categories = [np.asarray(cats, dtype=str) for cats in preprocessor.categories_]
+    offsets = np.cumsum([0] + [len(cats) for cats in categories], dtype=np.int64)
+    flat_categories = np.concatenate(categories) if categories else np.array([], dtype="<U1")
+    for cats, original in zip(categories, preprocessor.categories_):
+        # Les chaînes NumPy perdent leurs caractères nuls finaux : on vérifie
+        if list(cats) != [str(value) for value in original]:
+            raise ValueError("Category values cannot be stored losslessly as fixed-width strings")
+
+    arrays = {
+        "fill_values": np.ascontiguousarray(preprocessor.numerical_fill_values_, dtype=np.float64),
+        "coef": np.ascontiguousarray(compiled.coef, dtype=np.float64),
+        "categories": flat_categories,
+        "category_offsets": offsets,
+    }
+
+    staging = directory.with_name(f"{directory.name}.tmp-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    array_specs: Dict[str, Dict[str, Any]] = {}
+    for name, values in arrays.items():
+        file_name = f"{name}.npy"
+        np.save(staging / file_name, values, allow_pickle=False)
+        array_specs[name] = {"file": file_name, "sha256": _array_sha256(staging / file_name)}
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "model_version": model_version,
+        "categorical_variables": preprocessor.categorical_variables,
+        "log_variables": preprocessor.log_variables,
+        "numerical_features": list(preprocessor.numerical_features_),
+        "n_log_features": int(preprocessor.n_log_features_),
+        "categorical_features": list(preprocessor.categorical_features_),
+        "categorical_missing_fill": list(preprocessor.categorical_missing_fill_),
+        "intercept": compiled.intercept,
+        # Les empreintes des tableaux font changer le manifeste à chaque
+        # nouvel entraînement : PipelineCache peut surveiller ce seul fichier
+        "arrays": array_specs,
+    }
+    # Le manifeste est écrit en dernier
+    (staging / MANIFEST_FILE_NAME).write_text(json.dumps(manifest, indent=2))
+
+    # Remplacement de l'ancien dossier. Les processus qui ont encore les
+    # anciens fichiers ouverts continuent de les lire (les inodes restent valides).
+    previous = directory.with_name(f"{directory.name}.old-{os.getpid()}")
+    if directory.exists():
+        directory.rename(previous)
+    staging.rename(directory)
+    shutil.rmtree(previous, ignore_errors=True)
+    return directory
+
+
+def load_mmap_artifact(path: Path) -> CompiledPipeline:
+    """
+    Ouvre un artefact mappé en mémoire et renvoie le CompiledPipeline correspondant.
+
+    `path` est le dossier de l'artefact ou son manifest.json. Aucun tableau
+    n'est copié : le préprocesseur et les coefficients lisent directement
+    les fichiers mappés.
+    """
+    path = Path(path)
+    directory = path.parent if path.name == MANIFEST_FILE_NAME else path
+    manifest = json.loads((directory / MANIFEST_FILE_NAME).read_text())
+    if manifest["format_version"] != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported artifact format version {manifest['format_version']} "
+            f"(expected {FORMAT_VERSION})"
+        )
+
+    arrays = {
+        name: np.load(directory / spec["file"], mmap_mode="r", allow_pickle=False)
+        for name, spec in manifest["arrays"].items()
+    }
+
+    # Mêmes attributs que FusedPreprocessor.fit, mais pointant sur les fichiers.
+    # FusedTables suffit pour transform() et n'importe pas scikit-learn
+    preprocessor = FusedTables()
+    preprocessor.numerical_features_ = manifest["numerical_features"]
+    preprocessor.numerical_fill_values_ = arrays["fill_values"]
+    preprocessor.n_log_features_ = manifest["n_log_features"]
+    preprocessor.categorical_features_ = manifest["categorical_features"]
+    preprocessor.categorical_missing_fill_ = manifest["categorical_missing_fill"]
+    offsets = arrays["category_offsets"].tolist()
+    preprocessor.categories_ = [
+        arrays["categories"][start:end] for start, end in zip(offsets[:-1], offsets[1:])
+    ]
+
+    return CompiledPipeline(preprocessor, arrays["coef"], manifest["intercept"])
@@ -0,0 +1,247 @@
+# regression_model/model_registry.py
+#
+# Registre des modèles entraînés présents dans trained_models/.
+#
+# Chaque artefact (nom.pkl, ou dossier nom.mmap/ contenant un manifest.json)
+# est un modèle que l'API peut servir à la demande, désigné par son nom
+# (ex : "lasso_regression"). Les modèles ne sont chargés qu'à leur première
+# utilisation, et au plus `max_resident` d'entre eux restent en mémoire : au-delà,
+# le moins récemment utilisé est oublié (LRU). Le modèle par défaut, celui de
+# make_prediction sans paramètre `model`, n'est jamais évincé.
+
+import gc
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from regression_model.errors import ModelLoadError, UnknownModelError
+from regression_model.mmap_artifact import MANIFEST_FILE_NAME, load_mmap_artifact
+from regression_model.pipeline_cache import PipelineCache
+
+# Objets partagés par tout le processus, jamais comptés dans la mémoire d'un modèle
+_SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType)
+
+
+def estimate_memory_bytes(obj: Any) -> int:
+    """
+    Mémoire approximative (octets) occupée par un objet et tout ce qu'il référence.
+
+    Parcourt le graphe des objets (gc.get_referents), chaque objet n'étant
+    compté qu'une fois. Les données d'un tableau NumPy sont comptées une fois,
+    même s'il est partagé par plusieurs vues ; celles d'un tableau mappé depuis
+    le disque (artefact "mmap", pages partagées entre processus) ne le sont pas.
+    """
+    seen = set()
+    total = 0
+    pending = [obj]
+    while pending:
+        current = pending.pop()
+        if id(current) in seen or isinstance(current, _SHARED_TYPES):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, np.ndarray):
+            # Les tableaux ne sont pas suivis par le ramasse-miettes : le tampon
+            # d'une vue (ex : tableau relu par joblib) et les chaînes d'un
+            # tableau d'objets (catégories) sont parcourus à part
+            if current.base is not None:
+                pending.append(current.base)
+            if current.dtype == object:
+                pending.extend(current.ravel().tolist())
+            continue
+        pending.extend(gc.get_referents(current))
+    return total
+
+
+class _ResidentModel:
+    """Un modèle chargé (ou en cours de chargement) par le registre."""
+
+    def __init__(self, cache: PipelineCache, artifact_format: str) -> None:
+        self.cache = cache
+        self.artifact_format = artifact_format
+        self.sha256: Optional[str] = None  # Empreinte de l'artefact mesuré
+        self.memory_bytes: Optional[int] = None
+        self.last_used = time.time()
+
+
+class ModelRegistry:
+    """
+    Modèles disponibles dans un dossier, chargés à la demande (voir en tête du module).
+
+    `default_model` est le nom du modèle servi par défaut, et `default_cache`
+    renvoie son cache (celui de predict.py, qui dépend du format d'artefact
+    configuré) : le registre le partage au lieu de charger une seconde copie.
+    `artifact_format` renvoie le format préféré ("pkl" ou "mmap") ; un modèle
+    qui n'existe que dans l'autre format est servi dans celui-là.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        default_model: str,
+        default_cache: Callable[[], PipelineCache],
+        artifact_format: Callable[[], str],
+        max_resident: int = 2,
+    ) -> None:
+        self.directory = Path(directory)
+        self.default_model = default_model
+        self._default_cache = default_cache
+        self._artifact_format = artifact_format
+        self._lock = threading.Lock()
+        self._resident: "OrderedDict[str, _ResidentModel]" = OrderedDict()
+        self._default = _ResidentModel(default_cache(), artifact_format())
+        # Dernière erreur de chargement de chaque modèle (effacée au succès suivant)
+        self._errors: Dict[str, str] = {}
+        self._evictions = 0
+        self.configure(max_resident)
+
+    def configure(self, max_resident: int) -> None:
+        """Nombre maximal de modèles gardés en mémoire, en plus du modèle par défaut."""
+        if max_resident < 0:
+            raise ValueError("max_resident must be >= 0")
+        with self._lock:
+            self.max_resident = max_resident
+            self._evict()
+
+    def discover(self) -> Dict[str, Dict[str, Path]]:
+        """
+        Artefacts présents dans le dossier, par nom de modèle puis par format.
+
+        Le fichier surveillé par le cache est renvoyé pour chaque format : le
+        .pkl lui-même, ou le manifeste de l'artefact mappé. Les fichiers
+        temporaires d'un entraînement en cours (cachés ou suffixés) sont ignorés.
+        """
+        models: Dict[str, Dict[str, Path]] = {}
+        if not self.directory.is_dir():
+            return models
+        for path in self.directory.iterdir():
+            if path.name.startswith("."):
+                continue
+            if path.suffix == ".pkl" and path.is_file():
+                models.setdefault(path.stem, {})["pkl"] = path
+            elif path.suffix == ".mmap" and (path / MANIFEST_FILE_NAME).is_file():
+                models.setdefault(path.stem, {})["mmap"] = path / MANIFEST_FILE_NAME
+        return models
+
+    def _entry(self, name: str) -> _ResidentModel:
+        ## Entrée du modèle `name`, créée (sans chargement) et placée en tête de l'LRU.
+        if name == self.default_model:
+            cache = self._default_cache()
+            if cache is not self._default.cache:
+                # Le format servi a changé (configure_artifact_format)
+                self._default = _ResidentModel(cache, self._artifact_format())
+            self._default.last_used = time.time()
+            return self._default
+
+        with self._lock:
+            entry = self._resident.get(name)
+            if entry is not None:
+                self._resident.move_to_end(name)
+                entry.last_used = time.time()
+                return entry
+
+            # Le dossier est relu à chaque modèle inconnu : un artefact ajouté
+            # après le démarrage est servi sans redémarrer le processus
+            artifacts = self.discover().get(name)
+            if not artifacts:
+                raise UnknownModelError(f"Unknown model {name!r}")
+            artifact_format = self._artifact_format()
+            if artifact_format not in artifacts:
+                artifact_format = next(iter(sorted(artifacts)))
+            loader = load_mmap_artifact if artifact_format == "mmap" else None
+            entry = _ResidentModel(PipelineCache(artifacts[artifact_format], loader=loader), artifact_format)
+            self._resident[name] = entry
+            self._evict()
+            return entry
+
+    def _evict(self) -> None:
+        ## Oublie les modèles les moins récemment utilisés au-delà de max_resident
+        ## (appelé avec self._lock). Une requête en cours garde son objet.
+        while len(self._resident) > self.max_resident:
+            _, entry = self._resident.popitem(last=False)
+            entry.cache.clear()
+            self._evictions += 1
+
+    def cache(self, name: str) -> PipelineCache:
+        """Cache du modèle `name` (sans le charger). Lève UnknownModelError s'il n'existe pas."""
+        return self._entry(name).cache
+
+    def get(self, name: str) -> Any:
+        """
+        Renvoie le modèle `name`, chargé si nécessaire.
+
+        Lève UnknownModelError si aucun artefact ne porte ce nom, et
+        ModelLoadError si l'artefact existe mais ne peut pas être chargé
+        (l'erreur est aussi rapportée par describe()).
+        """
+        entry = self._entry(name)
+        try:
+            pipeline = entry.cache.get()
+        except Exception as error:
+            message = f"{type(error).__name__}: {error}"
+            with self._lock:
+                self._errors[name] = message
+                # Un artefact illisible n'occupe pas de place parmi les modèles résidents
+                if self._resident.get(name) is entry:
+                    del self._resident[name]
+            raise ModelLoadError(f"Model {name!r} could not be loaded ({message})") from error
+
+        sha256 = entry.cache.stats()["sha256"]
+        if entry.sha256 != sha256:
+            # Mesuré une fois par artefact chargé, pas à chaque requête
+            entry.memory_bytes = estimate_memory_bytes(pipeline)
+            entry.sha256 = sha256
+            self._errors.pop(name, None)
+        return pipeline
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """
+        Tous les modèles disponibles, triés par nom : formats présents, modèle
+        par défaut ou non, chargé ou non, mémoire estimée (octets), durée du
+        dernier chargement (s), dernière utilisation et dernière erreur.
+        """
+        with self._lock:
+            resident = dict(self._resident)
+            errors = dict(self._errors)
+        resident[self.default_model] = self._default
+
+        models = []
+        for name, artifacts in sorted(self.discover().items()):
+            entry = resident.get(name)
+            stats = entry.cache.stats() if entry is not None else None
+            loaded = bool(stats and stats["loaded"])
+            models.append(
+                {
+                    "name": name,
+                    "formats": sorted(artifacts),
+                    "default": name == self.default_model,
+                    "loaded": loaded,
+                    "format": entry.artifact_format if loaded else None,
+                    "sha256": stats["sha256"] if loaded else None,
+                    "memory_bytes": entry.memory_bytes if loaded else None,
+                    "load_seconds": stats["last_load_seconds"] if loaded else None,
+                    "last_used": entry.last_used if loaded else None,
+                    "error": errors.get(name),
+                }
+            )
+        return models
+
+    def stats(self) -> Dict[str, Any]:
+        """Occupation du registre : modèles résidents, mémoire totale et évictions."""
+        with self._lock:
+            entries = list(self._resident.values()) + [self._default]
+            names = list(self._resident)
+            evictions = self._evictions
+        loaded = [entry for entry in entries if entry.cache.stats()["loaded"]]
+        return {
+            "max_resident": self.max_resident,
+            "resident": names,
+            "memory_bytes": sum(entry.memory_bytes or 0 for entry in loaded),
+            "evictions": evictions,
+        }
@@ -2,7 +2,8 @@
 from sklearn.pipeline import Pipeline
 from sklearn.linear_model import Lasso
 
-from regression_model.processing.preprocessors import (CategoricalImputer, NumericalImputer, LogTransformer, SimpleCategoricalEncoder,)
+from regression_model.config.core import PIPELINE_NAME  # noqa: F401 (nom du pipeline sauvegardé)
+from regression_model.processing.preprocessors import (CategoricalImputer, NumericalImputer, LogTransformer, SimpleCategoricalEncoder, FusedPreprocessor,)
 
 # Variables catégorielles qui ont parfois des valeurs manquantes
 # On va remplacer ces NaN par "Missing"
@@ -32,9 +33,6 @@ LOG_VARS = [
     "TotalBsmtSF",   # surface totale du sous-sol
 ]
 
-# Un nom simple pour identifier notre pipeline sauvegardé
-PIPELINE_NAME = "lasso_regression"
-
 # Notre chaîne de traitement complète, étape par étape
 price_pipe = Pipeline(
     [
@@ -55,4 +53,16 @@ price_pipe = Pipeline(
         # 5. Le modèle de prédiction final (régression Lasso)
         ("model", Lasso(alpha=0.005, random_state=0)),
     ]
-)
\ No newline at end of file
+)
+
+# Variante équivalente : les quatre étapes de préparation fusionnées en une
+# seule passe (une seule matrice allouée au lieu de quatre copies du DataFrame)
+fused_price_pipe = Pipeline(
+    [
+        # 1 à 4. Imputation, logarithme et encodage en une seule étape
+        ("preprocessor", FusedPreprocessor(categorical_variables=CATEGORICAL_VARS, log_variables=LOG_VARS)),
+
+        # 5. Le même modèle de prédiction final
+        ("model", Lasso(alpha=0.005, random_state=0)),
+    ]
+)
@@ -0,0 +1,243 @@
+# regression_model/pipeline_cache.py
+
+import hashlib
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+# Logger principal du package
+logger = logging.getLogger("regression_model")
+
+# Taille des blocs lus pour calculer l'empreinte du fichier (1 Mo)
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def _joblib_load(path: Path) -> Any:
+    # joblib (et sklearn, qu'il importe en désérialisant le pipeline) n'est
+    # chargé qu'au premier chargement d'un .pkl, pas à l'import du module
+    import joblib
+
+    return joblib.load(path)
+
+
+class _CachedPipeline(NamedTuple):
+    """Ce que le cache garde en mémoire pour un artefact chargé."""
+
+    signature: Tuple[int, int]  # (mtime en ns, taille en octets) du fichier
+    sha256: str                 # Empreinte du contenu au moment du chargement
+    pipeline: Any               # Le pipeline désérialisé, partagé par tous les threads
+    loaded_at: float            # Horodatage (time.time) du chargement
+
+
+def _file_signature(path: Path) -> Tuple[int, int]:
+    """Signature bon marché d'un fichier : un simple appel à stat()."""
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _file_sha256(path: Path) -> str:
+    """Empreinte SHA-256 du contenu du fichier, lue par blocs."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as artifact:
+        for block in iter(lambda: artifact.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PipelineCache:
+    """
+    Cache de processus pour un pipeline entraîné sauvegardé sur disque.
+
+    Le fichier n'est désérialisé qu'une seule fois, puis le même objet est
+    partagé par tous les threads. À chaque accès, on compare la signature
+    (mtime, taille) du fichier avec celle mémorisée :
+      - identique            → on renvoie directement le pipeline en cache ;
+      - différente           → on recalcule l'empreinte SHA-256 du contenu ;
+      - empreinte différente → on recharge le pipeline (rechargement à chaud).
+
+    Un simple "touch" du fichier ne provoque donc pas de rechargement.
+
+    reload() remplace le pipeline sans interrompre le service : le nouveau
+    est chargé et échauffé à côté de l'ancien, qui reste servi pendant ce
+    temps, puis une seule affectation de référence fait l'échange. Une
+    requête en cours garde l'objet qu'elle a déjà obtenu et finit dessus.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        loader: Optional[Callable[[Path], Any]] = None,
+    ) -> None:
+        self.path = Path(path)
+        self._loader = loader or _joblib_load
+        self._entry: Optional[_CachedPipeline] = None
+        # Un seul thread à la fois peut (re)charger le pipeline
+        self._load_lock = threading.Lock()
+        # Un seul remplacement explicite (reload) à la fois
+        self._reload_lock = threading.Lock()
+        self._reloading = False
+        # Verrou séparé pour les compteurs (section critique très courte)
+        self._stats_lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+        self._last_load_seconds: Optional[float] = None
+        self._total_load_seconds = 0.0
+
+    def get(self) -> Any:
+        """Renvoie le pipeline, en le (re)chargeant seulement si nécessaire."""
+        entry = self._entry
+
+        # Chemin rapide : pipeline déjà chargé et fichier inchangé
+        if entry is not None:
+            try:
+                signature = _file_signature(self.path)
+            except OSError:
+                # Fichier supprimé ou inaccessible : on continue de servir
+                # l'ancien pipeline plutôt que de faire échouer la requête
+                logger.warning(f"Pipeline artifact unavailable: {self.path}")
+                self._count(hits=1)
+                return entry.pipeline
+            if signature == entry.signature or self._reloading:
+                # Pendant un reload(), l'ancien pipeline reste servi jusqu'à l'échange
+                self._count(hits=1)
+                return entry.pipeline
+
+        # Chemin lent : premier chargement ou fichier modifié
+        with self._load_lock:
+            # Un autre thread a peut-être déjà fait le travail pendant l'attente
+            entry = self._entry
+            signature = _file_signature(self.path)
+            if entry is not None and signature == entry.signature:
+                self._count(hits=1)
+                return entry.pipeline
+
+            sha256 = _file_sha256(self.path)
+            if entry is not None and sha256 == entry.sha256:
+                # Seul le mtime a changé : on garde le pipeline déjà chargé
+                self._entry = entry._replace(signature=signature)
+                self._count(hits=1)
+                return entry.pipeline
+
+            try:
+                self._entry = self._load(signature, sha256, reload=entry is not None)
+            except Exception:
+                if entry is None:
+                    raise
+                # Nouvel artefact illisible : l'ancien pipeline reste servi, et
+                # on ne réessaie qu'à la prochaine modification du fichier
+                logger.exception(f"Pipeline reload failed, keeping sha256={entry.sha256[:12]}")
+                self._entry = entry._replace(signature=signature)
+                self._count(hits=1)
+            return self._entry.pipeline
+
+    def _load(
+        self, signature: Tuple[int, int], sha256: str, reload: bool
+    ) -> _CachedPipeline:
+        """Désérialise l'artefact et met à jour les statistiques de chargement."""
+        logger.info(f"Loading pipeline from: {self.path}")
+        start = time.perf_counter()
+        pipeline = self._loader(self.path)
+        duration = time.perf_counter() - start
+
+        with self._stats_lock:
+            if reload:
+                self._reloads += 1
+            else:
+                self._misses += 1
+            self._last_load_seconds = duration
+            self._total_load_seconds += duration
+
+        logger.info(f"Pipeline loaded in {duration:.4f}s (sha256={sha256[:12]})")
+        return _CachedPipeline(signature, sha256, pipeline, time.time())
+
+    def reload(self, warm_up: Optional[Callable[[Any], None]] = None, force: bool = False) -> Dict[str, Any]:
+        """
+        Charge l'artefact présent sur le disque, l'échauffe, puis l'échange avec l'actuel.
+
+        `warm_up(pipeline)` est appelé sur le nouveau pipeline avant l'échange
+        (premières prédictions, compilation...). Si le chargement ou
+        l'échauffement échoue, l'exception est levée et l'ancien pipeline
+        reste en service. Sans `force`, un fichier au contenu identique
+        (même SHA-256) n'est pas rechargé.
+
+        Renvoie les empreintes (avant, après) et les durées de chargement
+        et d'échauffement, en secondes.
+        """
+        with self._reload_lock:
+            previous = self._entry
+            signature = _file_signature(self.path)
+            sha256 = _file_sha256(self.path)
+            report: Dict[str, Any] = {
+                "path": str(self.path),
+                "previous_sha256": previous.sha256 if previous is not None else None,
+                "sha256": sha256,
+                "swapped": False,
+                "load_seconds": None,
+                "warmup_seconds": None,
+            }
+            if previous is not None and sha256 == previous.sha256 and not force:
+                return report
+
+            self._reloading = previous is not None
+            try:
+                logger.info(f"Reloading pipeline from: {self.path}")
+                start = time.perf_counter()
+                pipeline = self._loader(self.path)
+                loaded = time.perf_counter()
+                if warm_up is not None:
+                    warm_up(pipeline)
+                warmed = time.perf_counter()
+
+                with self._load_lock:
+                    # Échange atomique : une seule affectation de référence
+                    self._entry = _CachedPipeline(signature, sha256, pipeline, time.time())
+            finally:
+                self._reloading = False
+
+            with self._stats_lock:
+                if previous is not None:
+                    self._reloads += 1
+                else:
+                    self._misses += 1
+                self._last_load_seconds = loaded - start
+                self._total_load_seconds += loaded - start
+
+        report.update(swapped=True, load_seconds=loaded - start, warmup_seconds=warmed - loaded)
+        logger.info(
+            f"Pipeline swapped (sha256={sha256[:12]}): loaded in {report['load_seconds']:.4f}s, "
+            f"warmed up in {report['warmup_seconds']:.4f}s"
+        )
+        return report
+
+    def _count(self, hits: int) -> None:
+        with self._stats_lock:
+            self._hits += hits
+
+    def clear(self) -> None:
+        """Oublie le pipeline chargé et remet les compteurs à zéro."""
+        with self._load_lock:
+            self._entry = None
+            with self._stats_lock:
+                self._reset_stats()
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs et durées de chargement, pour vérifier que le cache fonctionne."""
+        entry = self._entry
+        with self._stats_lock:
+            return {
+                "path": str(self.path),
+                "loaded": entry is not None,
+                "sha256": entry.sha256 if entry is not None else None,
+                "loaded_at": entry.loaded_at if entry is not None else None,
+                "hits": self._hits,
+                "misses": self._misses,
+                "reloads": self._reloads,
+                "last_load_seconds": self._last_load_seconds,
+                "total_load_seconds": self._total_load_seconds,
+            }
@@ -1,42 +1,292 @@
 # regression_model/predict.py
 
-from typing import Union, Dict, Any
+from typing import Union, Dict, Any, Optional
 import logging
+import os
+import threading
+import time
+import weakref
 
-import joblib
 import numpy as np
 import pandas as pd
 
-from regression_model.train_pipeline import (
+# Module de prédiction "léger" : seules les constantes (config/core.py) et le
+# code d'inférence sont importés. scikit-learn et joblib ne sont chargés qu'au
+# premier chargement du .pkl ; avec l'artefact mappé ("mmap"), jamais.
+from regression_model.config.core import (
     TRAINED_MODEL_DIR,  # Dossier où le modèle entraîné est sauvegardé
     FEATURES,           # Liste des variables utilisées par le modèle
+    MMAP_ARTIFACT_NAME, # Dossier de l'artefact mappé en mémoire
+    PIPELINE_NAME,      # Nom du pipeline sauvegardé
 )
-from regression_model.pipeline import PIPELINE_NAME
-from regression_model.processing.validation import validate_inputs
+from regression_model.compiled import CompiledPipeline, compile_pipeline
+from regression_model.logging_config import format_fields, should_log_payload
+from regression_model.mmap_artifact import MANIFEST_FILE_NAME, load_mmap_artifact
+from regression_model.model_registry import ModelRegistry
+from regression_model.pipeline_cache import PipelineCache
+from regression_model.prediction_cache import PredictionCache, row_digests
+from regression_model.processing.validation import invalid_row_positions, validate_inputs
+from regression_model.timing import stage_observers, timed_stage
 
-# Import "sécurisé" de la version du modèle
+# Import "sécurisé" de la version du modèle et du logger principal du package
+# (tous deux créés au premier accès, voir regression_model/__init__.py)
 try:
-    from regression_model import __version__
+    from regression_model import __version__, logger
 except ImportError:
     __version__ = "0.1.0"
-
-# Logger principal du package
-logger = logging.getLogger("regression_model")
+    logger = logging.getLogger("regression_model")
 
 # Nom du fichier du pipeline sauvegardé (ex: lasso_regression.pkl)
 PIPELINE_FILE_NAME = f"{PIPELINE_NAME}.pkl"
 
+# Cache partagé par tous les threads du processus : le pipeline n'est
+# désérialisé qu'une fois, puis rechargé seulement si le fichier change
+_pipeline_cache = PipelineCache(TRAINED_MODEL_DIR / PIPELINE_FILE_NAME)
+
+
+# Artefact mappé en mémoire : le manifeste change à chaque entraînement,
+# c'est donc lui que le cache surveille
+_mmap_cache = PipelineCache(
+    TRAINED_MODEL_DIR / MMAP_ARTIFACT_NAME / MANIFEST_FILE_NAME,
+    loader=load_mmap_artifact,
+)
+
+# Formats d'artefact servis :
+#   - "pkl"  : pipeline sklearn désérialisé (une copie par processus)
+#   - "mmap" : tables NumPy mappées en mémoire, partagées entre processus ;
+#              les prédictions passent alors toujours par la version compilée
+ARTIFACT_FORMATS = ("pkl", "mmap")
+_artifact_settings: Dict[str, str] = {
+    "format": os.environ.get("REGRESSION_MODEL_ARTIFACT_FORMAT", "pkl"),
+}
+
+
+def configure_artifact_format(artifact_format: str) -> None:
+    """Choisit le format d'artefact servi par make_prediction ("pkl" ou "mmap")."""
+    if artifact_format not in ARTIFACT_FORMATS:
+        raise ValueError(f"Unknown artifact format {artifact_format!r}, expected one of {ARTIFACT_FORMATS}")
+    _artifact_settings["format"] = artifact_format
+
+
+def _uses_mmap_artifact() -> bool:
+    return _artifact_settings["format"] == "mmap"
+
+
+def _active_cache() -> PipelineCache:
+    return _mmap_cache if _uses_mmap_artifact() else _pipeline_cache
+
+
+# Autres modèles de trained_models/, sélectionnés par le paramètre `model`
+# de make_prediction ; le modèle par défaut partage le cache ci-dessus
+_model_registry = ModelRegistry(
+    TRAINED_MODEL_DIR,
+    default_model=PIPELINE_NAME,
+    default_cache=_active_cache,
+    artifact_format=lambda: _artifact_settings["format"],
+    max_resident=int(os.environ.get("REGRESSION_MODEL_MAX_RESIDENT_MODELS", "2")),
+)
+
+
+def configure_model_registry(max_resident: int) -> None:
+    """Nombre maximal de modèles non par défaut gardés en mémoire (éviction LRU au-delà)."""
+    _model_registry.configure(max_resident)
+
+
+def describe_models() -> list:
+    """Modèles disponibles, avec leur mémoire estimée et leur durée de chargement."""
+    return _model_registry.describe()
+
+
+def load_model(model: str) -> Any:
+    """
+    Charge le modèle `model` de trained_models/ sans rien prédire.
+
+    Lève UnknownModelError s'il n'existe pas, ModelLoadError s'il ne peut pas
+    être chargé (utile pour refuser une requête avant de lire son contenu).
+    """
+    return _model_registry.get(model)
+
+
+def get_model_registry_stats() -> Dict[str, Any]:
+    """Modèles résidents, mémoire totale estimée et nombre d'évictions."""
+    return _model_registry.stats()
+
+
+def _load_pipeline(model: Optional[str] = None):
+    """Renvoie le modèle entraîné, chargé une seule fois grâce au cache."""
+    if model is None:
+        return _active_cache().get()
+    return _model_registry.get(model)
+
+
+# Versions compilées des pipelines chargés (une par objet pipeline).
+# Les clés sont faibles : un pipeline remplacé par un rechargement à chaud
+# libère automatiquement sa version compilée.
+_compiled_pipelines: "weakref.WeakKeyDictionary[Any, CompiledPipeline]" = weakref.WeakKeyDictionary()
+_compiled_lock = threading.Lock()
+
+
+def _load_compiled_pipeline(model: Optional[str] = None) -> CompiledPipeline:
+    """Renvoie la version compilée (NumPy pur) du pipeline actuellement en cache."""
+    return _compiled_version(_load_pipeline(model))
+
+
+def _compiled_version(pipeline: Any) -> CompiledPipeline:
+    # Un artefact mappé est déjà un CompiledPipeline
+    if isinstance(pipeline, CompiledPipeline):
+        return pipeline
+    return _compiled_for(pipeline)
+
+
+def _compiled_for(pipeline: Any) -> CompiledPipeline:
+    """Version compilée d'un pipeline sklearn, compilée une seule fois par objet."""
+    compiled = _compiled_pipelines.get(pipeline)
+    if compiled is None:
+        with _compiled_lock:
+            compiled = _compiled_pipelines.get(pipeline)
+            if compiled is None:
+                compiled = compile_pipeline(pipeline)
+                _compiled_pipelines[pipeline] = compiled
+    return compiled
+
+
+def get_pipeline_cache_stats() -> Dict[str, Any]:
+    """Compteurs du cache (hits, misses, reloads) et durée du dernier chargement."""
+    return _active_cache().stats()
+
+
+# Cache optionnel des prédictions, ligne par ligne (voir use_cache)
+_prediction_cache = PredictionCache()
 
-def _load_pipeline():
-    """Charge le modèle entraîné depuis le fichier où on l'a sauvegardé."""
-    pipeline_path = TRAINED_MODEL_DIR / PIPELINE_FILE_NAME
-    logger.info(f"Loading pipeline from: {pipeline_path}")
-    trained_model = joblib.load(pipeline_path)
-    return trained_model
+
+def configure_prediction_cache(max_entries: int, ttl_seconds: float) -> None:
+    """Règle la taille maximale (en lignes) et la durée de vie du cache de prédictions."""
+    _prediction_cache.configure(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+
+def get_prediction_cache_stats() -> Dict[str, Any]:
+    """Taux de succès, nombre d'entrées et mémoire approximative du cache de prédictions."""
+    return _prediction_cache.stats()
+
+
+# Taille des paquets de lignes prédits l'un après l'autre : la mémoire des
+# étapes intermédiaires (matrices transformées) dépend de ce nombre, et non
+# plus de la taille du lot ; c'est aussi entre deux paquets qu'une échéance
+# (paramètre `deadline` de make_prediction) est vérifiée
+_chunk_settings: Dict[str, int] = {
+    "chunk_size": int(os.environ.get("REGRESSION_MODEL_CHUNK_SIZE", "10000")),
+}
+
+
+def configure_chunking(chunk_size: int) -> None:
+    """Nombre maximal de lignes prédites d'un coup (les gros lots sont découpés)."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    _chunk_settings["chunk_size"] = chunk_size
+
+
+def _predict_in_chunks(
+    data: pd.DataFrame,
+    predict_chunk: Any,
+    chunk_size: int,
+    deadline: Optional[float],
+) -> np.ndarray:
+    """
+    Prédit `data` par paquets de `chunk_size` lignes, dans l'ordre.
+
+    Avant chaque paquet, l'échéance (valeur de time.monotonic()) est vérifiée :
+    si elle est dépassée, on s'arrête et seules les prédictions des premières
+    lignes sont renvoyées (le tableau est alors plus court que `data`).
+    """
+    parts = []
+    done = 0
+    while done < len(data):
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        with timed_stage("chunk"):
+            parts.append(np.asarray(predict_chunk(data.iloc[done:done + chunk_size]), dtype=np.float64))
+        done += len(parts[-1])
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.float64)
+
+
+def _predict_frame(data: pd.DataFrame, use_compiled: bool, model: Optional[str] = None) -> np.ndarray:
+    """Prédit un DataFrame déjà validé, avec le pipeline sklearn ou sa version compilée."""
+    if stage_observers():
+        # Quelqu'un mesure les étapes (métriques, profilage) : chemin détaillé
+        return _predict_frame_by_step(data, use_compiled, model)
+    pipeline = _load_pipeline(model)
+    if use_compiled or isinstance(pipeline, CompiledPipeline):
+        return _compiled_version(pipeline).predict(data)
+    return pipeline.predict(data)
+
+
+def _predict_frame_by_step(data: pd.DataFrame, use_compiled: bool, model: Optional[str] = None) -> np.ndarray:
+    """
+    Même calcul que _predict_frame, mais étape par étape pour en mesurer la durée.
+
+    Les étapes du pipeline sklearn sont appliquées une à une, exactement comme
+    le fait Pipeline.predict (transform de chaque étape, puis predict du modèle).
+    """
+    with timed_stage("load"):
+        pipeline = _load_pipeline(model)
+        if use_compiled or isinstance(pipeline, CompiledPipeline):
+            compiled = _compiled_version(pipeline)
+        else:
+            compiled = None
+
+    if compiled is not None:
+        with timed_stage("compiled.transform"):
+            matrix = compiled.transform(data)
+        with timed_stage("compiled.model"):
+            return matrix @ compiled.coef + compiled.intercept
+
+    X = data
+    for name, step in pipeline.steps[:-1]:
+        if step is None or step == "passthrough":
+            continue
+        with timed_stage(f"pipeline.{name}"):
+            X = step.transform(X)
+    name, estimator = pipeline.steps[-1]
+    with timed_stage(f"pipeline.{name}"):
+        return estimator.predict(X)
+
+
+def _predict_with_cache(data: pd.DataFrame, use_compiled: bool, model: Optional[str] = None) -> np.ndarray:
+    """
+    Prédit un DataFrame en ne recalculant que les lignes absentes du cache.
+
+    Les clés combinent l'empreinte de chaque ligne (colonnes FEATURES
+    normalisées) et l'identité du modèle (version + empreinte du fichier).
+    """
+    _load_pipeline(model)  # S'assure que l'empreinte du modèle est à jour
+    cache = _active_cache() if model is None else _model_registry.cache(model)
+    namespace = f"{__version__}:{cache.stats()['sha256']}"
+    digests = row_digests(data, FEATURES)
+
+    preds, missing = _prediction_cache.get_many(namespace, digests)
+    if missing.any():
+        # Une maison répétée dans le même lot n'est calculée qu'une fois
+        first_row: Dict[int, int] = {}
+        for i in np.flatnonzero(missing).tolist():
+            first_row.setdefault(digests[i], i)
+        rows = list(first_row.values())
+        computed = _predict_frame(data.iloc[rows], use_compiled, model)
+        _prediction_cache.put_many(namespace, list(first_row), computed)
+
+        by_digest = dict(zip(first_row, computed.tolist()))
+        for i in np.flatnonzero(missing).tolist():
+            preds[i] = by_digest[digests[i]]
+    return preds
 
 
 def make_prediction(
-    input_data: Union[pd.DataFrame, Dict[str, Any], list]
+    input_data: Union[pd.DataFrame, Dict[str, Any], list],
+    use_compiled: bool = False,
+    use_cache: bool = False,
+    model: Optional[str] = None,
+    deadline: Optional[float] = None,
+    chunk_size: Optional[int] = None,
+    log_payload: Optional[bool] = None,
 ) -> Dict[str, Any]:
     """
     Fonction principale pour obtenir des prédictions de prix.
@@ -46,60 +296,158 @@ def make_prediction(
       - Un dictionnaire (une seule maison)
       - Une liste de dictionnaires (format API)
 
+    Avec use_compiled=True, le calcul passe par la version compilée du
+    pipeline (voir regression_model/compiled.py) : mêmes prédictions, mais
+    quelques opérations NumPy au lieu de quatre transformations pandas.
+
+    Avec use_cache=True, les maisons déjà prédites par le même modèle sont
+    servies depuis un cache (LRU + durée de vie) : seules les lignes
+    inconnues d'un lot sont recalculées.
+
+    `model` désigne un autre modèle de trained_models/ par son nom (ex :
+    "lasso_regression"), chargé à la demande par le registre des modèles
+    (voir model_registry.py) ; le résultat indique alors son nom ("model").
+    Lève UnknownModelError si ce modèle n'existe pas, ModelLoadError s'il
+    ne peut pas être chargé.
+
+    Les gros lots sont prédits par paquets de `chunk_size` lignes (par défaut
+    celui de configure_chunking) : la mémoire utilisée par le calcul reste
+    proportionnelle à la taille d'un paquet. Avec `deadline` (une valeur de
+    time.monotonic()), on s'arrête au premier paquet commencé après
+    l'échéance : les lignes non traitées ont None pour prédiction et leurs
+    positions sont dans errors["unfinished_rows"].
+
     Retourne toujours un dictionnaire structuré avec :
-      - predictions : liste de prix prédits (ou None en cas d'erreur)
+      - predictions : liste de prix prédits (ou None si des colonnes manquent)
       - errors      : dict décrivant les problèmes éventuels ({} si tout va bien)
       - version     : version du package regression_model utilisé
+
+    Une maison aux valeurs invalides (texte dans une colonne numérique,
+    surface négative...) n'empêche pas de prédire les autres : sa prédiction
+    vaut None et errors["invalid_rows"] indique sa position et les colonnes
+    en cause (voir processing/validation.py).
+
+    Les logs ne contiennent que le nombre de lignes et les durées de chaque
+    étape ; le contenu complet n'est journalisé que pour une fraction des
+    appels (voir logging_config.configure_prediction_logging). Un appelant
+    qui a déjà tiré au sort (l'API, une fois par requête) passe sa décision
+    dans `log_payload`.
     """
+    started = time.perf_counter()
+    if model is not None:
+        # Un nom inconnu est refusé avant tout travail sur les données
+        _model_registry.cache(model)
 
-    logger.info(f"Inputs received for prediction: {input_data}")
-    logger.info(f"Using model version: {__version__}")
+    # Le contenu complet est coûteux à formater : seulement si échantillonné
+    if log_payload is None:
+        log_payload = should_log_payload()
+    if log_payload:
+        logger.info("Inputs received for prediction: %s", input_data)
 
     # Étape 1 : Normalisation du format d'entrée
-    if isinstance(input_data, pd.DataFrame):
-        data = input_data.copy()
-    elif isinstance(input_data, dict):
-        data = pd.DataFrame([input_data])
-    else:
-        # On suppose une liste de dictionnaires
-        data = pd.DataFrame(input_data)
+    with timed_stage("dataframe"):
+        if isinstance(input_data, pd.DataFrame):
+            # Pas de copie : aucune des étapes suivantes ne modifie `data`
+            data = input_data
+        elif isinstance(input_data, dict):
+            data = pd.DataFrame([input_data])
+        else:
+            # On suppose une liste de dictionnaires
+            data = pd.DataFrame(input_data)
 
-    # Étape 2 : Suppression préventive de la variable cible si présente
-    if "SalePrice" in data.columns:
-        data = data.drop(columns=["SalePrice"])
+        # Étape 2 : Suppression préventive de la variable cible si présente
+        if "SalePrice" in data.columns:
+            data = data.drop(columns=["SalePrice"])
 
     # Étape 3 : Validation et nettoyage des données
-    data, errors = validate_inputs(data)
-
-    logger.info(
-        f"Making predictions with model version: {__version__} "
-        f"Input shape: {data.shape}"
-    )
+    with timed_stage("validate"):
+        data, errors = validate_inputs(data)
+    validated = time.perf_counter()
 
     # Étape 4 : Gestion des erreurs de validation
+    invalid_rows = invalid_row_positions(errors)
     if errors:
-        logger.info(f"Validation errors detected: {errors}")
-        return {
-            "predictions": None,
+        logger.info(
+            format_fields(
+                event="validation_failed",
+                version=__version__,
+                rows=len(data),
+                invalid_rows=len(invalid_rows),
+                errors=",".join(sorted(errors)),
+            )
+        )
+    n_rows = len(data)
+    if errors and (not invalid_rows or len(invalid_rows) == n_rows):
+        # Colonnes manquantes (ou aucune ligne valide) : rien à prédire
+        rejected: Dict[str, Any] = {
+            "predictions": None if not invalid_rows else [None] * n_rows,
             "errors": errors,
             "version": __version__,
         }
+        if model is not None:
+            rejected["model"] = model
+        return rejected
 
-    # Étape 5 : Sélection des colonnes pertinentes
-    feature_cols = [col for col in FEATURES if col in data.columns]
-    data = data[feature_cols]
+    # Étape 5 : Sélection des colonnes pertinentes (et des lignes valides)
+    data = data[FEATURES]
+    if invalid_rows:
+        valid = np.ones(n_rows, dtype=bool)
+        valid[invalid_rows] = False
+        data = data.iloc[np.flatnonzero(valid)]
+
+    # Étape 6 : Chargement du modèle et prédiction (par paquets si le lot est gros)
+    predict = _predict_with_cache if use_cache else _predict_frame
+    chunk_size = chunk_size or _chunk_settings["chunk_size"]
+    if deadline is None and len(data) <= chunk_size:
+        preds = predict(data, use_compiled, model)
+    else:
+        preds = _predict_in_chunks(
+            data,
+            lambda chunk: predict(chunk, use_compiled, model),
+            chunk_size,
+            deadline,
+        )
+    n_unfinished = len(data) - len(preds)
 
-    # Étape 6 : Chargement du modèle et prédiction
-    pipeline = _load_pipeline()
-    preds: np.ndarray = pipeline.predict(data)
+    if logger.isEnabledFor(logging.INFO):
+        finished = time.perf_counter()
+        logger.info(
+            format_fields(
+                event="prediction",
+                version=__version__,
+                rows=len(preds),
+                invalid_rows=len(invalid_rows),
+                unfinished_rows=n_unfinished,
+                columns=data.shape[1],
+                cache=use_cache,
+                compiled=use_compiled,
+                validate_ms=(validated - started) * 1000.0,
+                predict_ms=(finished - validated) * 1000.0,
+                total_ms=(finished - started) * 1000.0,
+            )
+        )
 
-    logger.info(f"Predictions done. Number of rows: {len(preds)}")
+    # Étape 7 : Construction du résultat
+    # Conversion en une seule opération vectorisée : des float Python,
+    # que tous les encodeurs JSON sérialisent sans cas particulier
+    predictions = np.asarray(preds, dtype=np.float64).tolist()
+    if invalid_rows or n_unfinished:
+        # Les lignes écartées (ou pas encore prédites à l'échéance) reprennent
+        # leur place, avec None pour prédiction
+        positions = np.flatnonzero(valid).tolist() if invalid_rows else list(range(n_rows))
+        aligned: list = [None] * n_rows
+        for position, prediction in zip(positions, predictions):
+            aligned[position] = prediction
+        predictions = aligned
+        if n_unfinished:
+            errors = {**errors, "unfinished_rows": positions[len(preds):]}
 
-    # Étape 7 : Construction du résultat (aucune erreur à ce stade)
     result: Dict[str, Any] = {
-        "predictions": list(preds),  # np.ndarray -> liste pour JSON
+        "predictions": predictions,
         "version": __version__,
-        "errors": {},  # dict vide attendu par les tests lorsque tout va bien
+        "errors": errors,  # dict vide attendu par les tests lorsque tout va bien
     }
+    if model is not None:
+        result["model"] = model
 
     return result
\ No newline at end of file
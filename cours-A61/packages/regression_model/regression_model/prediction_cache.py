@@ -0,0 +1,174 @@
+# regression_model/prediction_cache.py
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.util import hash_array
+
+# Clé de hachage de pandas (16 caractères)
+_HASH_KEY = "regression_model"
+
+# Deux combinaisons différentes des empreintes de colonnes (64 bits chacune) :
+# chaque ligne reçoit une empreinte de 128 bits, les collisions sont négligeables
+_SEEDS = (np.uint64(0xCBF29CE484222325), np.uint64(0x84222325CBF29CE4))
+_PRIMES = (np.uint64(0x100000001B3), np.uint64(0x9E3779B97F4A7C15))
+
+# Surcoût approximatif d'une entrée d'OrderedDict (nœud de liste + case de table)
+_ENTRY_OVERHEAD_BYTES = 100
+
+
+def _normalize_column(values: np.ndarray) -> np.ndarray:
+    """
+    Met une colonne sous une forme canonique avant hachage.
+
+    - Nombres (entiers, flottants, booléens) → float64 : 5 et 5.0 donnent la
+      même clé, comme ils donnent la même prédiction.
+    - Le reste reste en objets. Le hachage de pandas confond NaN avec None,
+      pd.NA et NaT, alors que l'encodeur les distingue ('nan' vs 'None',
+      '<NA>', 'NaT') : toute valeur manquante autre qu'un NaN flottant est
+      donc remplacée par son texte avant de hacher.
+    """
+    if values.dtype.kind in "biuf":
+        return values.astype(np.float64, copy=False)
+    values = values.astype(object, copy=False)
+    missing = pd.isna(values)
+    if missing.any():
+        positions = np.flatnonzero(missing)
+        not_nan = [i for i in positions.tolist() if not isinstance(values[i], float)]
+        if not_nan:
+            values = values.copy()
+            values[not_nan] = [str(values[i]) for i in not_nan]
+    return values
+
+
+def row_digests(data: pd.DataFrame, features: Sequence[str]) -> List[int]:
+    """
+    Empreinte stable (entier de 128 bits) de chaque ligne, calculée sur `features`.
+
+    Le calcul est vectorisé colonne par colonne : aucune boucle Python par ligne
+    hormis la conversion finale en entiers Python (clés du cache).
+    """
+    n_rows = len(data)
+    high = np.full(n_rows, _SEEDS[0], dtype=np.uint64)
+    low = np.full(n_rows, _SEEDS[1], dtype=np.uint64)
+    for feature in features:
+        column = hash_array(_normalize_column(data[feature].to_numpy()), hash_key=_HASH_KEY)
+        high = (high * _PRIMES[0]) ^ column
+        low = (low ^ column) * _PRIMES[1]
+    return [(int(h) << 64) | int(l) for h, l in zip(high.tolist(), low.tolist())]
+
+
+class PredictionCache:
+    """
+    Cache des prédictions, ligne par ligne, avec éviction LRU et durée de vie.
+
+    Chaque entrée est indexée par (espace de noms, empreinte de la ligne).
+    L'espace de noms identifie le modèle (version du package + empreinte du
+    fichier) : après un rechargement du modèle, les anciennes prédictions ne
+    sont plus jamais servies et finissent évincées.
+
+    Toutes les opérations travaillent sur un lot de lignes à la fois, sous un
+    seul verrou : un lot dont seules certaines lignes sont connues ne fait
+    recalculer que les lignes manquantes.
+    """
+
+    def __init__(self, max_entries: int = 100_000, ttl_seconds: float = 3600.0) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # clé → (prédiction, date d'expiration) ; l'ordre sert à l'éviction LRU
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get_many(self, namespace: str, digests: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cherche un lot de lignes.
+
+        Renvoie (prédictions, masque des lignes absentes) ; les prédictions
+        des lignes absentes valent NaN.
+        """
+        values = np.full(len(digests), np.nan, dtype=np.float64)
+        missing = np.ones(len(digests), dtype=bool)
+        now = time.monotonic()
+        with self._lock:
+            for i, digest in enumerate(digests):
+                key = (namespace, digest)
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[1] < now:
+                    # Entrée périmée : on la supprime et on la recalcule
+                    del self._entries[key]
+                    self._expirations += 1
+                    continue
+                self._entries.move_to_end(key)
+                values[i] = entry[0]
+                missing[i] = False
+            n_missing = int(missing.sum())
+            self._misses += n_missing
+            self._hits += len(digests) - n_missing
+        return values, missing
+
+    def put_many(self, namespace: str, digests: Sequence[int], predictions: Sequence[float]) -> None:
+        """Enregistre un lot de prédictions, en évinçant les plus anciennes si besoin."""
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for digest, prediction in zip(digests, predictions):
+                key = (namespace, digest)
+                self._entries[key] = (float(prediction), expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def configure(self, max_entries: int, ttl_seconds: float) -> None:
+        """Change la taille maximale et la durée de vie (l'excédent est évincé)."""
+        with self._lock:
+            self.max_entries = max_entries
+            self.ttl_seconds = ttl_seconds
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._reset_stats()
+
+    def _entry_size(self) -> int:
+        """Taille mémoire approximative d'une entrée (clé, empreinte, valeur)."""
+        key = ("namespace", 1 << 127)
+        return (
+            sys.getsizeof(key)
+            + sys.getsizeof(key[1])
+            + sys.getsizeof((0.0, 0.0))
+            + 2 * sys.getsizeof(0.0)
+            + _ENTRY_OVERHEAD_BYTES
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Taux de succès, taille et mémoire approximative du cache."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else None,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "approx_memory_bytes": len(self._entries) * self._entry_size(),
+            }
@@ -1,6 +1,8 @@
 # regression_model/processing/data_manager.py
 
 from pathlib import Path
+from typing import Iterator
+
 import pandas as pd
 import joblib
 
@@ -39,6 +41,31 @@ def load_dataset(*, file_name: str) -> pd.DataFrame:
     return pd.read_csv(data_path)
 
 
+def load_dataset_chunks(*, file_name: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Charge un jeu de données CSV par morceaux de `chunksize` lignes.
+
+    Même convention que load_dataset : un nom de fichier simple est cherché
+    dans le dossier datasets (un chemin absolu est utilisé tel quel). Seul le
+    morceau en cours est en mémoire, ce qui permet de traiter des fichiers
+    bien plus gros que la RAM disponible.
+
+    Paramètres
+    ----------
+    file_name : str
+        Nom (ou chemin absolu) du fichier CSV à charger.
+    chunksize : int
+        Nombre de lignes par morceau.
+
+    Retourne
+    --------
+    Iterator[pandas.DataFrame]
+        Les morceaux successifs du fichier, dans l'ordre.
+    """
+    data_path = DATASET_DIR / file_name
+    return pd.read_csv(data_path, chunksize=chunksize)
+
+
 def load_pipeline(*, file_name: str):
     """
     Charge un modèle de machine learning préalablement sauvegardé.
@@ -0,0 +1,114 @@
+## regression_model/processing/fused.py ##
+#
+# Partie "prédiction" de FusedPreprocessor : les tables apprises et transform().
+#
+# Ce module n'importe que NumPy et pandas. Un artefact mappé en mémoire (voir
+# mmap_artifact.py) est servi avec FusedTables seul, sans charger scikit-learn
+# (plus d'une seconde d'import) : le démarrage à froid d'un worker en est réduit
+# d'autant. FusedPreprocessor (processing/preprocessors.py) en hérite.
+
+import numpy as np
+import pandas as pd
+
+# Valeur utilisée pour remplacer les NaN des variables catégorielles
+MISSING_LABEL = "Missing"
+
+
+def _lookup_codes(index: pd.Index, values: np.ndarray) -> np.ndarray:
+    ## Codes des valeurs dans l'index (-1 pour les catégories inconnues).
+    ## SimpleCategoricalEncoder convertit tout en texte avant la recherche
+    ## (NaN → 'nan', None → 'None'...). Convertir toute la colonne coûte cher,
+    ## alors qu'une chaîne reste identique après str() : on cherche d'abord les
+    ## valeurs brutes et on ne convertit que celles qui n'ont pas été trouvées.
+    ## Cas le plus fréquent parmi les restes : les NaN, qui deviennent tous 'nan'.
+    codes = index.get_indexer(values)
+    unknown = np.flatnonzero(codes < 0)
+    if unknown.size:
+        retry = values[unknown]
+        # Valeurs manquantes : pd.isna, car retry != retry lève une erreur sur
+        # pd.NA. Seuls les NaN flottants deviennent 'nan' ; None, pd.NA et NaT
+        # gardent leur texte ('None', '<NA>', 'NaT') et passent par str()
+        is_nan = pd.isna(retry)
+        if is_nan.any():
+            is_nan[is_nan] = [isinstance(value, float) for value in retry[is_nan]]
+        codes[unknown[is_nan]] = index.get_indexer(["nan"])[0]
+        others = unknown[~is_nan]
+        if others.size:
+            codes[others] = index.get_indexer(retry[~is_nan].astype(str))
+    return codes
+
+
+class FusedTables:
+
+    ## Tables apprises par FusedPreprocessor.fit et transformation en une passe.
+    ##
+    ## Attributs (remplis par _set_tables, ou directement par load_mmap_artifact) :
+    ##   numerical_features_, numerical_fill_values_, n_log_features_,
+    ##   categorical_features_, categorical_missing_fill_, categories_
+
+    def _set_tables(
+        self,
+        numerical_features,
+        fill_values,
+        log_variables,
+        categorical_features,
+        categorical_missing_fill,
+        categories,
+    ) -> None:
+        # Les variables passées au log d'abord, pour en faire une tranche contiguë
+        numerical = sorted(numerical_features, key=lambda f: f not in log_variables)
+        self.numerical_features_ = numerical
+        # NaN = pas d'imputation pour cette colonne
+        self.numerical_fill_values_ = np.array(
+            [fill_values.get(f, np.nan) for f in numerical], dtype=np.float64
+        )
+        self.n_log_features_ = sum(f in log_variables for f in numerical)
+        self.categorical_features_ = list(categorical_features)
+        self.categorical_missing_fill_ = [bool(f) for f in categorical_missing_fill]
+        self.categories_ = [np.asarray(cats, dtype=object) for cats in categories]
+
+    def _category_indexes(self) -> list:
+        # Index de hachage pandas construits à la demande (non sauvegardés)
+        indexes = self.__dict__.get("_category_indexes_cache")
+        if indexes is None:
+            indexes = [pd.Index(cats) for cats in self.categories_]
+            self._category_indexes_cache = indexes
+        return indexes
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        return np.asarray(self.numerical_features_ + self.categorical_features_, dtype=object)
+
+    def transform(self, X) -> np.ndarray:
+        ## X peut être un DataFrame ou n'importe quel dictionnaire colonne → tableau.
+        n_num = len(self.numerical_features_)
+        n_cols = n_num + len(self.categorical_features_)
+        n_rows = len(X[(self.numerical_features_ + self.categorical_features_)[0]])
+        # Ordre "F" : chaque colonne est contiguë en mémoire
+        matrix = np.empty((n_rows, n_cols), dtype=np.float64, order="F")
+
+        # 1. Variables numériques : lecture directe en float64
+        for j, feature in enumerate(self.numerical_features_):
+            matrix[:, j] = np.asarray(X[feature], dtype=np.float64)
+
+        # 2. Imputation par la médiane, en une seule opération sur tout le bloc
+        numerical = matrix[:, :n_num]
+        np.copyto(
+            numerical,
+            np.broadcast_to(self.numerical_fill_values_, numerical.shape),
+            where=np.isnan(numerical),
+        )
+
+        # 3. log(1 + x) sur les variables concernées (valeurs négatives coupées à 0)
+        logged = matrix[:, : self.n_log_features_]
+        np.maximum(logged, 0.0, out=logged)
+        np.log1p(logged, out=logged)
+
+        # 4. Encodage des variables catégorielles (-1 pour les catégories inconnues)
+        indexes = self._category_indexes()
+        for k, feature in enumerate(self.categorical_features_):
+            values = np.asarray(X[feature], dtype=object)
+            if self.categorical_missing_fill_[k]:
+                values = np.where(pd.isna(values), MISSING_LABEL, values)
+            matrix[:, n_num + k] = _lookup_codes(indexes[k], values)
+
+        return matrix
@@ -4,6 +4,17 @@ import numpy as np
 import pandas as pd
 from sklearn.base import BaseEstimator, TransformerMixin
 
+from regression_model.processing.fused import MISSING_LABEL, FusedTables, _lookup_codes  # noqa: F401
+
+
+def _as_list(variables) -> list:
+    # Même souplesse que les autres transformateurs : None, une variable ou une liste
+    if variables is None:
+        return []
+    if not isinstance(variables, list):
+        return [variables]
+    return variables
+
 
 class CategoricalImputer(BaseEstimator, TransformerMixin):
     ## Remplit les valeurs manquantes dans les variables catégorielles.##
@@ -91,41 +102,162 @@ class SimpleCategoricalEncoder(BaseEstimator, TransformerMixin):
     ## Deux façons de l'utiliser :
     ## - Sans spécifier de variables : il traite toutes les colonnes de type texte
     ##- Avec une liste : il ne traite que les colonnes mentionnées
+    ##
+    ## Les catégories apprises sont stockées sous forme de tuples compacts
+    ## (categories_) : la position dans le tuple est le code attribué. À la
+    ## prédiction, les codes de toutes les colonnes sont obtenus par recherche
+    ## vectorisée dans des index de hachage, au lieu d'une conversion en texte
+    ## suivie d'un dictionnaire Python consulté cellule par cellule.
     
 
     def __init__(self, variables=None):
         self.variables = variables
 
     def fit(self, X: pd.DataFrame, y=None):
-        X = X.copy()
-
         # Mode automatique : détection des colonnes texte
         if self.variables is None:
             self.variables_ = [col for col in X.columns if X[col].dtype == "O"]
         else:
             self.variables_ = self.variables
 
-        # Construction du dictionnaire d'encodage pour chaque variable
-        self.encoder_dict_ = {}
+        # Table des catégories pour chaque variable, dans l'ordre d'apparition
+        self.categories_ = {}
         for feature in self.variables_:
             # On récupère toutes les valeurs uniques (même les NaN convertis en "nan")
-            categories = X[feature].astype(str).unique()
-            # Chaque catégorie reçoit un numéro unique
-            self.encoder_dict_[feature] = {
-                cat: idx for idx, cat in enumerate(categories)
-            }
+            # Chaque catégorie reçoit comme numéro sa position dans le tuple
+            self.categories_[feature] = tuple(X[feature].astype(str).unique())
 
         return self
 
+    @property
+    def encoder_dict_(self) -> dict:
+        # Vue "dictionnaire" des tables, comme dans les anciennes versions
+        return {
+            feature: {cat: idx for idx, cat in enumerate(categories)}
+            for feature, categories in self.categories_.items()
+        }
+
+    def _category_indexes(self) -> dict:
+        # Index de hachage pandas construits à la demande (non sauvegardés)
+        indexes = self.__dict__.get("_category_indexes_cache")
+        if indexes is None:
+            indexes = {
+                feature: pd.Index(cats, dtype=object) for feature, cats in self.categories_.items()
+            }
+            self._category_indexes_cache = indexes
+        return indexes
+
+    def __getstate__(self):
+        # Les index sont reconstruits au chargement : artefact plus petit
+        state = dict(super().__getstate__())
+        state.pop("_category_indexes_cache", None)
+        return state
+
+    def __setstate__(self, state):
+        # Compatibilité avec les modèles sauvegardés avant categories_ :
+        # on convertit l'ancien dictionnaire {catégorie: code} en tuple
+        encoder_dict = state.pop("encoder_dict_", None)
+        if encoder_dict is not None and "categories_" not in state:
+            state["categories_"] = {
+                feature: tuple(sorted(mapping, key=mapping.get))
+                for feature, mapping in encoder_dict.items()
+            }
+        super().__setstate__(state)
+
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
-        X = X.copy()
-        for feature in self.variables_:
-            encoder = self.encoder_dict_[feature]
-            # Conversion : texte → nombre correspondant
-            X[feature] = (
-                X[feature]
-                .astype(str)               # Conversion en texte pour être sûr
-                .map(encoder)              # Remplacement par le numéro (si connu)
-                .fillna(-1)                # -1 pour les nouvelles catégories
-            )
-        return X
\ No newline at end of file
+        indexes = self._category_indexes()
+        # Tous les codes dans une seule matrice d'entiers
+        codes = np.empty((len(X), len(self.variables_)), dtype=np.int64)
+        for j, feature in enumerate(self.variables_):
+            values = np.asarray(X[feature], dtype=object)
+            codes[:, j] = _lookup_codes(indexes[feature], values)
+
+        # Un seul assemblage du résultat (au lieu d'une copie puis d'une
+        # réécriture colonne par colonne), dans l'ordre d'origine des colonnes
+        encoded = pd.DataFrame(codes, index=X.index, columns=self.variables_)
+        others = X.drop(columns=self.variables_)
+        return pd.concat([others, encoded], axis=1).reindex(columns=X.columns)
+
+
+class FusedPreprocessor(BaseEstimator, TransformerMixin, FusedTables):
+
+    ## Les quatre étapes ci-dessus (CategoricalImputer, NumericalImputer,
+    ## LogTransformer, SimpleCategoricalEncoder) fusionnées en une seule passe.
+    ##
+    ## Au lieu de copier quatre fois le DataFrame, on remplit directement une
+    ## unique matrice float64 (la seule allocation de taille n_lignes × n_colonnes).
+    ## Les colonnes y sont rangées par blocs : variables passées au log, autres
+    ## variables numériques, puis variables catégorielles. Chaque étape devient
+    ## ainsi une opération NumPy vectorisée sur une tranche de la matrice.
+    ##
+    ## Les résultats sont identiques à ceux des quatre étapes séparées ; seul
+    ## l'ordre des colonnes change (voir get_feature_names_out).
+    ##
+    ## Seuls l'entraînement et les paramètres sklearn sont définis ici ; les
+    ## tables apprises et transform() viennent de FusedTables (processing/fused.py),
+    ## utilisable sans importer scikit-learn.
+
+    def __init__(self, categorical_variables=None, log_variables=None):
+        self.categorical_variables = categorical_variables
+        self.log_variables = log_variables
+
+    def fit(self, X: pd.DataFrame, y=None):
+        categorical = _as_list(self.categorical_variables)
+        log_vars = set(_as_list(self.log_variables))
+
+        # Mêmes règles de détection automatique que NumericalImputer et
+        # SimpleCategoricalEncoder : colonnes numériques d'un côté, texte de l'autre
+        encoded = [col for col in X.columns if X[col].dtype == "O"]
+        numerical = [col for col in X.columns if X[col].dtype != "O"]
+        imputed = set(X.select_dtypes(include=["number"]).columns)
+
+        categories = []
+        for feature in encoded:
+            values = X[feature]
+            if feature in categorical:
+                values = values.fillna(MISSING_LABEL)
+            categories.append(values.astype(str).unique())
+
+        self._set_tables(
+            numerical_features=numerical,
+            fill_values={f: X[f].median() for f in numerical if f in imputed},
+            log_variables=log_vars,
+            categorical_features=encoded,
+            categorical_missing_fill=[f in categorical for f in encoded],
+            categories=categories,
+        )
+        return self
+
+    @classmethod
+    def from_fitted_steps(
+        cls,
+        categorical_imputer: CategoricalImputer,
+        numerical_imputer: NumericalImputer,
+        log_transformer: LogTransformer,
+        encoder: SimpleCategoricalEncoder,
+        feature_names: list,
+    ) -> "FusedPreprocessor":
+        ## Construit l'équivalent fusionné de quatre étapes déjà entraînées
+        ## (par exemple celles du price_pipe sauvegardé), sans réentraînement.
+        fused = cls(
+            categorical_variables=categorical_imputer.variables,
+            log_variables=log_transformer.variables,
+        )
+        encoded = [f for f in feature_names if f in encoder.categories_]
+
+        fused._set_tables(
+            numerical_features=[f for f in feature_names if f not in encoder.categories_],
+            fill_values=numerical_imputer.imputer_dict_,
+            log_variables=set(log_transformer.variables),
+            categorical_features=encoded,
+            categorical_missing_fill=[f in categorical_imputer.variables for f in encoded],
+            # Position dans le tableau = code attribué par l'encodeur
+            categories=[encoder.categories_[f] for f in encoded],
+        )
+        return fused
+
+    def __getstate__(self):
+        # Les index sont reconstruits au chargement : artefact plus petit
+        state = dict(super().__getstate__())
+        state.pop("_category_indexes_cache", None)
+        return state
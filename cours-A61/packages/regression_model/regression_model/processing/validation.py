@@ -1,44 +1,187 @@
 ## regression_model/processing/validation.py ##
 
-from typing import Dict, Any, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
-from regression_model.train_pipeline import FEATURES
+from regression_model.config.core import FEATURES, NUMERIC_FEATURES
 
+# Messages d'erreur associés à une valeur invalide (par ligne et par colonne)
+NOT_A_NUMBER = "expected a number"
+OUT_OF_RANGE = "expected a finite number >= 0"
+NOT_A_STRING = "expected a string"
+
+
+class InputSchema:
+
+    ## Schéma des entrées, compilé une seule fois à partir de FEATURES.
+
+    ## Trois niveaux de vérification :
+      ## - présence des colonnes : erreur pour tout le lot (rien n'est prédictible) ;
+      ## - type des valeurs : nombres pour NUMERIC_FEATURES, texte pour les autres
+      ##   (un nombre y est converti en texte, comme le faisait l'encodeur) ;
+      ## - plage des nombres : finis et positifs (surfaces, années, comptages).
+
+    ## Les deux derniers niveaux sont vérifiés colonne par colonne avec des
+    ## opérations vectorisées, et rapportés ligne par ligne : une maison
+    ## invalide n'empêche pas de prédire les autres.
 
-def validate_inputs(input_data: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-    
-    ## Vérifie que les données qu'on reçoit sont prêtes à être utilisées par le modèle.
-    
-    ## La seule vérification vraiment critique :
-      ## - Est-ce que toutes les colonnes que le modèle connaît sont bien présentes ?
-    
     ## Ce qu'on laisse passer volontairement :
-      ## - Les valeurs manquantes (NaN) → le pipeline les gérera tout seul
+      ## - Les valeurs manquantes (NaN, None) → le pipeline les gérera tout seul
       ## - Les colonnes en trop (comme 'Id') → on les ignorera simplement
-    
-    ## L'idée est d'être strict sur l'essentiel, mais flexible sur le reste.
-    
-    # On commence par faire une copie pour travailler sur des données indépendantes
-    data = input_data.copy()
-    errors: Dict[str, Any] = {}
-
-    # Vérification centrale : les colonnes indispensables sont-elles toutes là ?
-    # On compare la liste des colonnes reçues avec celle que le modèle attend
-    missing_cols = [col for col in FEATURES if col not in data.columns]
+
+    def __init__(self, features: Iterable[str], numeric_features: Iterable[str]) -> None:
+        self.features: Tuple[str, ...] = tuple(features)
+        numeric = set(numeric_features)
+        self.numeric_features = tuple(f for f in self.features if f in numeric)
+        self.text_features = tuple(f for f in self.features if f not in numeric)
+        self._required = frozenset(self.features)
+
+    def missing_columns(self, columns: Iterable[str]) -> List[str]:
+        """Colonnes attendues absentes de `columns`, dans l'ordre de FEATURES."""
+        # Un ensemble : une recherche par colonne, au lieu d'un parcours de liste
+        present = set(columns)
+        if self._required.issubset(present):
+            return []
+        return [feature for feature in self.features if feature not in present]
+
+    def validate(self, data: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Vérifie un DataFrame sans le copier.
+
+        Renvoie les données (une copie superficielle seulement si des nombres
+        reçus sous forme de texte, ex : "8450", ou des nombres reçus dans une
+        colonne texte, ex : 3 → "3", ont été convertis) et le rapport d'erreurs :
+          - {"missing_columns": [...]} si des colonnes manquent ;
+          - {"invalid_rows": [{"row": 3, "invalid_values": {"LotArea": "..."}}, ...]}
+            pour les lignes invalides, repérées par leur position (0, 1, 2...).
+        """
+        missing = self.missing_columns(data.columns)
+        if missing:
+            return data, {"missing_columns": missing}
+
+        invalid: List[Tuple[str, np.ndarray, str]] = []
+        converted: Dict[str, pd.Series] = {}
+
+        for feature in self.numeric_features:
+            column = data[feature]
+            if column.dtype == object:
+                # Nombres transmis en texte ou mélangés à des None : conversion
+                numbers = pd.to_numeric(column, errors="coerce")
+                not_numbers = numbers.isna().to_numpy() & column.notna().to_numpy()
+                if not_numbers.any():
+                    invalid.append((feature, not_numbers, NOT_A_NUMBER))
+                converted[feature] = numbers
+                column = numbers
+            elif column.dtype.kind not in "iuf":
+                # Booléens, dates... : aucune valeur non manquante n'est acceptable
+                invalid.append((feature, column.notna().to_numpy(), NOT_A_NUMBER))
+                continue
+            out_of_range = _out_of_range(column.to_numpy())
+            if out_of_range is not None:
+                invalid.append((feature, out_of_range, OUT_OF_RANGE))
+
+        for feature in self.text_features:
+            text, not_strings = _as_text(data[feature])
+            if text is not None:
+                converted[feature] = text
+            if not_strings is not None:
+                invalid.append((feature, not_strings, NOT_A_STRING))
+
+        if converted:
+            # Copie superficielle : les colonnes du client ne sont pas modifiées
+            data = data.copy(deep=False)
+            for feature, numbers in converted.items():
+                data[feature] = numbers
+
+        if not invalid:
+            return data, {}
+        return data, {"invalid_rows": _rows_report(invalid)}
+
+
+def _out_of_range(values: np.ndarray) -> Optional[np.ndarray]:
+    ## Masque des nombres infinis ou négatifs (NaN accepté), ou None si aucun.
+    if values.dtype.kind == "u":
+        return None
+    if values.dtype.kind == "f":
+        mask = np.isinf(values) | (values < 0)
+    else:
+        mask = values < 0
+    return mask if mask.any() else None
+
+
+def _as_text(column: pd.Series) -> Tuple[Optional[pd.Series], Optional[np.ndarray]]:
+    ## Colonne texte : (colonne convertie ou None, masque des valeurs invalides ou None).
+    ## Comme l'encodeur l'a toujours fait, une valeur simple (nombre, booléen,
+    ## date) est convertie avec str() : 3 → "3", une catégorie inconnue.
+    ## Seules les valeurs composées (listes, objets JSON) sont refusées.
+    # Cas courant : uniquement du texte et des valeurs manquantes (test en C)
+    if pd.api.types.infer_dtype(column, skipna=True) in ("string", "empty"):
+        return None, None
+    values = column.to_numpy(dtype=object)
+    not_text = np.fromiter((not isinstance(value, str) for value in values), dtype=bool, count=len(values))
+    not_text &= column.notna().to_numpy()
+    if not not_text.any():
+        return None, None
+
+    positions = np.flatnonzero(not_text)
+    scalar = np.fromiter((pd.api.types.is_scalar(value) for value in values[positions]), dtype=bool)
+    invalid = np.zeros(len(values), dtype=bool)
+    invalid[positions[~scalar]] = True
+
+    text = None
+    if scalar.any():
+        converted = values.copy()
+        converted[positions[scalar]] = [str(value) for value in values[positions[scalar]]]
+        text = pd.Series(converted, index=column.index, name=column.name)
+    return text, invalid if invalid.any() else None
+
+
+def _rows_report(invalid: List[Tuple[str, np.ndarray, str]]) -> List[Dict[str, Any]]:
+    ## Regroupe les masques par colonne en une entrée par ligne invalide.
+    by_row: Dict[int, Dict[str, str]] = {}
+    for feature, mask, message in invalid:
+        for row in np.flatnonzero(mask).tolist():
+            by_row.setdefault(row, {})[feature] = message
+    return [{"row": row, "invalid_values": by_row[row]} for row in sorted(by_row)]
+
+
+# Schéma compilé une fois pour toutes, partagé par tous les appels
+input_schema = InputSchema(FEATURES, NUMERIC_FEATURES)
+
+
+def invalid_row_positions(errors: Dict[str, Any]) -> List[int]:
+    """Positions des lignes rejetées par validate_inputs (liste vide si aucune)."""
+    return [entry["row"] for entry in errors.get("invalid_rows", ())]
+
+
+def validate_inputs(input_data: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+
+    ## Vérifie que les données qu'on reçoit sont prêtes à être utilisées par le modèle.
+
+    ## - Colonnes manquantes → {"missing_columns": [...]} : aucune ligne n'est prédictible
+    ## - Valeurs invalides   → {"invalid_rows": [...]} : seules ces lignes sont écartées
+
+    ## Voir InputSchema.validate pour le détail ; les données ne sont pas copiées.
+
+    return input_schema.validate(input_data)
+
+
+def validate_record(record: Any) -> Dict[str, Any]:
+
+    ## Même vérification des colonnes que validate_inputs, mais pour une seule
+    ## maison (un dictionnaire), sans construire de DataFrame.
+
+    ## Utile quand les maisons arrivent une par une (flux NDJSON) : une ligne
+    ## invalide est signalée seule, sans bloquer les autres. Les valeurs sont
+    ## vérifiées ensuite, sur le paquet entier, par validate_inputs.
+
+    if not isinstance(record, dict):
+        return {"invalid_record": "Each record must be a JSON object"}
+
+    missing_cols = input_schema.missing_columns(record)
     if missing_cols:
-        # Si des colonnes manquent, on note lesquelles dans le rapport d'erreur
-        errors["missing_columns"] = missing_cols
-
-    # Note : on a retiré la vérification des colonnes en trop
-    # Pourquoi ? Parce que si les données contiennent une colonne 'Id' ou autre,
-    # ça ne gêne pas le modèle. On se contentera de l'ignorer plus tard.
-    # (Le code commenté ci-dessous montre ce qu'on faisait avant)
-    # extra_cols = [col for col in data.columns if col not in FEATURES]
-    # if extra_cols:
-    #     errors["extra_columns"] = extra_cols
-
-    # On retourne les données (peut-être avec des colonnes supplémentaires)
-    # et la liste des problèmes (vide si tout est OK)
-    return data, errors
\ No newline at end of file
+        return {"missing_columns": missing_cols}
+
+    return {}
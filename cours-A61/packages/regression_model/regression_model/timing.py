@@ -0,0 +1,76 @@
+# regression_model/timing.py
+#
+# Mesure optionnelle de la durée des étapes d'une prédiction.
+#
+# Le code de prédiction entoure chaque étape de `timed_stage("nom")`. Tant
+# qu'aucun observateur n'est enregistré, cela ne coûte qu'une lecture de
+# ContextVar : rien n'est mesuré. Un observateur (métriques de l'API,
+# profilage d'une requête...) s'enregistre avec observe_stages() et reçoit
+# (nom de l'étape, durée en secondes) à la fin de chaque étape.
+#
+# Les observateurs sont propres au contexte courant (thread ou requête) :
+# deux requêtes concurrentes ne voient pas les mesures l'une de l'autre.
+
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar, Token
+from typing import Callable, ContextManager, Iterator, Tuple
+
+StageObserver = Callable[[str, float], None]
+
+_observers: ContextVar[Tuple[StageObserver, ...]] = ContextVar("stage_observers", default=())
+
+
+def stage_observers() -> Tuple[StageObserver, ...]:
+    """Observateurs actifs dans le contexte courant (tuple vide si aucun)."""
+    return _observers.get()
+
+
+def add_stage_observer(observer: StageObserver) -> Token:
+    """Ajoute un observateur au contexte courant ; le jeton sert à le retirer."""
+    return _observers.set(_observers.get() + (observer,))
+
+
+def remove_stage_observer(token: Token) -> None:
+    """Retire l'observateur ajouté par add_stage_observer."""
+    _observers.reset(token)
+
+
+@contextmanager
+def observe_stages(observer: StageObserver) -> Iterator[None]:
+    """Envoie à `observer` la durée des étapes exécutées dans ce bloc."""
+    token = add_stage_observer(observer)
+    try:
+        yield
+    finally:
+        remove_stage_observer(token)
+
+
+class _TimedStage:
+    """Bloc mesuré : la durée est transmise aux observateurs à la sortie."""
+
+    __slots__ = ("name", "observers", "start")
+
+    def __init__(self, name: str, observers: Tuple[StageObserver, ...]) -> None:
+        self.name = name
+        self.observers = observers
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter() - self.start
+        for observer in self.observers:
+            observer(self.name, elapsed)
+
+
+# Bloc vide partagé, renvoyé quand personne n'observe (aucune allocation)
+_UNTIMED = nullcontext()
+
+
+def timed_stage(name: str) -> ContextManager[None]:
+    """Mesure la durée du bloc et la transmet aux observateurs actifs."""
+    observers = _observers.get()
+    if not observers:
+        return _UNTIMED
+    return _TimedStage(name, observers)
@@ -1,117 +1,40 @@
 ## train_pipeline.py ##
 
-import pathlib
-from typing import List
+import os
 
 import joblib
 import pandas as pd
+from sklearn.base import clone
 
-from regression_model.pipeline import price_pipe, PIPELINE_NAME
+from regression_model.mmap_artifact import save_mmap_artifact
+from regression_model.pipeline import price_pipe
 from regression_model import logger, __version__   # notre logger global et la version du modèle
 
-# --- Chemins des dossiers ---
-# Où se trouve notre projet
-PACKAGE_ROOT = pathlib.Path(__file__).resolve().parent
-# Où on rangera les modèles une fois entraînés
-TRAINED_MODEL_DIR = PACKAGE_ROOT / "trained_models"
-# Où sont stockées nos données
-DATASET_DIR = PACKAGE_ROOT / "datasets"
-
-# --- Fichiers de données ---
-# Les données pour tester le modèle (plus tard)
-TESTING_DATA_FILE = DATASET_DIR / "test.csv"
-# Les données pour entraîner le modèle (maintenant)
-TRAINING_DATA_FILE = DATASET_DIR / "train.csv"
-
-# Ce qu'on veut prédire : le prix de vente des maisons
-TARGET = "SalePrice"
-
-# Toutes les caractéristiques qu'on utilise pour faire nos prédictions
-FEATURES: List[str] = [
-    "MSSubClass",
-    "MSZoning",
-    "LotFrontage",
-    "LotArea",
-    "Street",
-    "Alley",
-    "LotShape",
-    "LandContour",
-    "Utilities",
-    "LotConfig",
-    "LandSlope",
-    "Neighborhood",
-    "Condition1",
-    "Condition2",
-    "BldgType",
-    "HouseStyle",
-    "OverallQual",
-    "OverallCond",
-    "YearBuilt",
-    "YearRemodAdd",
-    "RoofStyle",
-    "RoofMatl",
-    "Exterior1st",
-    "Exterior2nd",
-    "MasVnrType",
-    "MasVnrArea",
-    "ExterQual",
-    "ExterCond",
-    "Foundation",
-    "BsmtQual",
-    "BsmtCond",
-    "BsmtExposure",
-    "BsmtFinType1",
-    "BsmtFinSF1",
-    "BsmtFinType2",
-    "BsmtFinSF2",
-    "BsmtUnfSF",
-    "TotalBsmtSF",
-    "Heating",
-    "HeatingQC",
-    "CentralAir",
-    "Electrical",
-    "1stFlrSF",
-    "2ndFlrSF",
-    "LowQualFinSF",
-    "GrLivArea",
-    "BsmtFullBath",
-    "BsmtHalfBath",
-    "FullBath",
-    "HalfBath",
-    "BedroomAbvGr",
-    "KitchenAbvGr",
-    "KitchenQual",
-    "TotRmsAbvGrd",
-    "Functional",
-    "Fireplaces",
-    "FireplaceQu",
-    "GarageType",
-    "GarageYrBlt",
-    "GarageFinish",
-    "GarageCars",
-    "GarageArea",
-    "GarageQual",
-    "GarageCond",
-    "PavedDrive",
-    "WoodDeckSF",
-    "OpenPorchSF",
-    "EnclosedPorch",
-    "3SsnPorch",
-    "ScreenPorch",
-    "PoolArea",
-    "PoolQC",
-    "Fence",
-    "MiscFeature",
-    "MiscVal",
-    "MoSold",
-    "YrSold",
-    "SaleType",
-    "SaleCondition",
-]
-
-
-def save_pipeline(pipeline_to_persist) -> None:
-    """Prend le modèle entraîné et le sauvegarde sur le disque pour plus tard."""
+# Chemins, fichiers de données et liste des variables : définis dans
+# config/core.py (sans dépendance à scikit-learn, voir predict.py) et
+# réexportés ici pour les scripts et les tests qui les importent d'ici
+from regression_model.config.core import (  # noqa: F401
+    DATASET_DIR,
+    FEATURES,
+    MMAP_ARTIFACT_NAME,
+    NUMERIC_FEATURES,
+    PACKAGE_ROOT,
+    PIPELINE_NAME,
+    TARGET,
+    TESTING_DATA_FILE,
+    TRAINED_MODEL_DIR,
+    TRAINING_DATA_FILE,
+)
+
+
+def save_pipeline(pipeline_to_persist, with_mmap: bool = True) -> None:
+    """
+    Prend le modèle entraîné et le sauvegarde sur le disque pour plus tard.
+
+    En plus du fichier .pkl, on écrit (si with_mmap) le même modèle au format
+    mappé en mémoire : un dossier de tableaux .npy que plusieurs workers
+    peuvent ouvrir sans en garder chacun une copie.
+    """
     # On s'assure que le dossier existe (on le crée si besoin)
     TRAINED_MODEL_DIR.mkdir(exist_ok=True)
 
@@ -119,12 +42,33 @@ def save_pipeline(pipeline_to_persist) -> None:
     save_file_name = f"{PIPELINE_NAME}.pkl"
     save_path = TRAINED_MODEL_DIR / save_file_name
 
-    # Sauvegarde avec joblib (format standard pour scikit-learn)
-    joblib.dump(pipeline_to_persist, save_path)
-
-
-def run_training() -> None:
-    """La fonction principale : charge les données, entraîne le modèle, le sauvegarde."""
+    # Sauvegarde avec joblib (format standard pour scikit-learn), d'abord
+    # dans un fichier temporaire renommé ensuite : un worker qui recharge le
+    # modèle au même moment lit l'ancien fichier ou le nouveau, jamais un
+    # fichier à moitié écrit
+    temporary_path = save_path.with_name(f".{save_file_name}.{os.getpid()}.tmp")
+    joblib.dump(pipeline_to_persist, temporary_path)
+    os.replace(temporary_path, save_path)
+
+    if with_mmap:
+        try:
+            save_mmap_artifact(pipeline_to_persist, TRAINED_MODEL_DIR / MMAP_ARTIFACT_NAME, __version__)
+        except ValueError as error:
+            # Pipeline non compilable : seul le .pkl est disponible
+            logger.warning(f"Memory-mapped artifact not written: {error}")
+
+
+def run_training(save: bool = True):
+    """
+    La fonction principale : charge les données, entraîne le modèle, le sauvegarde.
+
+    Avec save=False, le modèle est entraîné sans être écrit sur le disque
+    (utile pour mesurer la durée de l'entraînement, voir benchmarks/).
+
+    C'est une copie neuve de price_pipe (clone) qui est entraînée puis
+    renvoyée : le modèle global n'est jamais modifié, et un entraînement lancé
+    dans le processus qui sert des prédictions ne touche pas au modèle servi.
+    """
     # Étape 1 : Chargement des données d'entraînement
     data = pd.read_csv(TRAINING_DATA_FILE)
 
@@ -135,16 +79,20 @@ def run_training() -> None:
     # On commence par un message dans les logs
     logger.info("Starting model training")
 
-    # Étape 2 : Entraînement du modèle
-    price_pipe.fit(X, y)
+    # Étape 2 : Entraînement d'une copie non entraînée du modèle
+    pipeline = clone(price_pipe).fit(X, y)
 
     # Étape 3 : On note la version et on sauvegarde
+    if not save:
+        logger.info("Model trained (not saved)")
+        return pipeline
     logger.info(f"saving model version: {__version__}")
-    save_pipeline(pipeline_to_persist=price_pipe)
+    save_pipeline(pipeline_to_persist=pipeline)
 
     # Message final de confirmation
     logger.info("Model trained and saved successfully")
     print("Modèle entraîné et sauvegardé avec succès !")
+    return pipeline
 
 
 # Si on exécute ce fichier directement (et non en l'important), on lance l'entraînement
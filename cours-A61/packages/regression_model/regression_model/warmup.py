@@ -0,0 +1,128 @@
+# regression_model/warmup.py
+#
+# Préchargement du modèle et "échauffement" avant la première vraie requête.
+#
+# Sans cela, la première prédiction d'un processus paie l'import de
+# scikit-learn, la désérialisation du pipeline, la compilation éventuelle et
+# le premier appel de chaque fonction NumPy/pandas : un pic de latence après
+# chaque déploiement ou recyclage de worker. warm_up() fait tout cela d'avance
+# sur un lot synthétique construit à partir du schéma d'entraînement.
+#
+# reload_model() applique le même principe au remplacement à chaud du modèle :
+# le nouveau est chargé et échauffé avant d'être servi.
+
+import time
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from regression_model.config.core import FEATURES, NUMERIC_FEATURES
+from regression_model.compiled import CompiledPipeline
+from regression_model.predict import (
+    _active_cache,
+    _compiled_for,
+    _load_compiled_pipeline,
+    _load_pipeline,
+    _uses_mmap_artifact,
+    make_prediction,
+)
+
+# Valeurs des colonnes texte du lot synthétique : une catégorie inconnue,
+# le libellé d'imputation et une valeur manquante (tous les cas de l'encodeur)
+_TEXT_VALUES = np.array(["Warmup", "Missing", None], dtype=object)
+
+
+def synthetic_batch(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Lot de `n_rows` maisons fictives ayant exactement les colonnes de FEATURES.
+
+    Nombres positifs (avec quelques NaN, pour passer par l'imputation) dans
+    NUMERIC_FEATURES, texte ou valeurs manquantes ailleurs : le lot est valide
+    et emprunte toutes les branches de la préparation des données.
+    """
+    rng = np.random.default_rng(seed)
+    numeric = set(NUMERIC_FEATURES)
+    columns: Dict[str, Any] = {}
+    for feature in FEATURES:
+        if feature in numeric:
+            values = rng.uniform(0.0, 1000.0, size=n_rows)
+            values[rng.random(n_rows) < 0.1] = np.nan
+            columns[feature] = values
+        else:
+            columns[feature] = _TEXT_VALUES[rng.integers(0, len(_TEXT_VALUES), size=n_rows)]
+    return pd.DataFrame(columns)
+
+
+def warm_up(n_rows: int = 64) -> Dict[str, Any]:
+    """
+    Charge le modèle servi et lui fait prédire un lot synthétique.
+
+    Le pipeline sklearn et sa version compilée sont tous deux préparés (ou
+    l'artefact mappé seul, s'il est servi) ; un pipeline que compiled.py ne
+    sait pas compiler (autre modèle que le Lasso...) n'est échauffé que par
+    sklearn, qui le sert. Le cache des prédictions n'est pas utilisé, pour ne
+    pas le remplir de maisons fictives.
+
+    Renvoie les durées (s) du chargement et de l'échauffement. Lève
+    l'exception du chargement si le modèle est inutilisable.
+    """
+    started = time.perf_counter()
+    if not _uses_mmap_artifact():
+        _load_pipeline()
+    try:
+        _load_compiled_pipeline()
+        compiled = True
+    except ValueError:
+        compiled = False
+    loaded = time.perf_counter()
+
+    batch = synthetic_batch(n_rows)
+    for use_compiled in (False, True) if compiled else (False,):
+        result = make_prediction(batch, use_compiled=use_compiled)
+        if result["errors"]:
+            raise ValueError(f"Warm-up batch rejected: {result['errors']}")
+    finished = time.perf_counter()
+
+    return {
+        "rows": n_rows,
+        "compiled": compiled,
+        "load_seconds": loaded - started,
+        "warmup_seconds": finished - loaded,
+    }
+
+
+def _warm_pipeline(pipeline: Any, batch: pd.DataFrame) -> None:
+    ## Échauffe un pipeline qui n'est pas encore servi (voir reload_model) :
+    ## mêmes calculs que make_prediction, mais sur cet objet précis.
+    data = batch[FEATURES]
+    if isinstance(pipeline, CompiledPipeline):
+        # Artefact mappé en mémoire
+        pipeline.predict(data)
+        return
+    pipeline.predict(data)
+    # Compilé maintenant, plutôt que par la première requête après l'échange ;
+    # un pipeline non compilable reste valide, servi par sklearn seul
+    try:
+        compiled = _compiled_for(pipeline)
+    except ValueError:
+        return
+    compiled.predict(data)
+
+
+def reload_model(n_rows: int = 64, force: bool = False) -> Dict[str, Any]:
+    """
+    Remplace à chaud le modèle servi par l'artefact présent sur le disque.
+
+    Le nouveau modèle est chargé et échauffé pendant que l'ancien continue de
+    répondre, puis échangé d'un coup (voir PipelineCache.reload). Sans `force`,
+    rien n'est fait si l'artefact n'a pas changé.
+
+    Renvoie les empreintes avant/après et les durées de chargement et
+    d'échauffement. En cas d'erreur, l'exception est levée et l'ancien modèle
+    reste en service.
+    """
+    batch = synthetic_batch(n_rows)
+    report = _active_cache().reload(warm_up=lambda pipeline: _warm_pipeline(pipeline, batch), force=force)
+    report["rows"] = n_rows
+    return report
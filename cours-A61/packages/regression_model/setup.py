@@ -28,5 +28,12 @@ setup(
         "joblib",       # Sauvegarde/chargement des modèles
     ],
     
+    # Commande installée avec le package pour prédire un gros fichier CSV
+    entry_points={
+        "console_scripts": [
+            "regression-model-score=regression_model.batch_scoring:main",
+        ],
+    },
+
     # Version minimale de Python requise
     python_requires=">=3.9",)
\ No newline at end of file
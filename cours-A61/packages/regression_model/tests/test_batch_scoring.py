@@ -0,0 +1,53 @@
+## tests/test_batch_scoring.py ##
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from regression_model.batch_scoring import logger, main
+from regression_model.predict import make_prediction
+from regression_model.train_pipeline import TESTING_DATA_FILE
+
+
+def test_batch_scoring_cli_keeps_input_order(tmp_path, capsys):
+    # Préparation : un petit CSV d'entrée, découpé en plusieurs morceaux
+    input_data = pd.read_csv(TESTING_DATA_FILE).iloc[:250, :]
+    input_path = tmp_path / "houses.csv"
+    output_path = tmp_path / "predictions.csv"
+    input_data.to_csv(input_path, index=False)
+
+    # Action : 3 morceaux répartis sur 2 processus
+    exit_code = main([str(input_path), str(output_path), "--chunk-size", "100", "--workers", "2"])
+
+    # Vérifications : mêmes prédictions que make_prediction, dans le même ordre
+    assert exit_code == 0
+    output = pd.read_csv(output_path)
+    assert output["Id"].tolist() == input_data["Id"].tolist()
+    expected = make_prediction(input_data)["predictions"]
+    np.testing.assert_allclose(output["prediction"], expected, rtol=1e-9)
+    # Le résumé de débit est affiché en fin d'exécution
+    assert "lignes/s" in capsys.readouterr().out
+
+
+def test_batch_scoring_without_pool_keeps_caller_log_level(tmp_path):
+    input_path = tmp_path / "houses.csv"
+    pd.read_csv(TESTING_DATA_FILE).iloc[:20, :].to_csv(input_path, index=False)
+    level = logger.level
+
+    # Un seul processus : la prédiction a lieu dans le processus appelant
+    assert main([str(input_path), str(tmp_path / "predictions.csv"), "--workers", "1"]) == 0
+
+    assert logger.level == level
+    assert logger.isEnabledFor(logging.INFO)
+
+
+def test_batch_scoring_rejects_non_positive_sizes(tmp_path, capsys):
+    input_path = tmp_path / "houses.csv"
+    pd.read_csv(TESTING_DATA_FILE).iloc[:5, :].to_csv(input_path, index=False)
+
+    for option in ("--chunk-size", "--workers"):
+        with pytest.raises(SystemExit) as exit_info:
+            main([str(input_path), str(tmp_path / "predictions.csv"), option, "0"])
+        assert exit_info.value.code == 2
+        assert option in capsys.readouterr().err
@@ -0,0 +1,33 @@
+## tests/test_compiled.py ##
+import numpy as np
+import pandas as pd
+
+from regression_model.compiled import compile_pipeline
+from regression_model.predict import _load_pipeline, make_prediction
+from regression_model.train_pipeline import FEATURES, TESTING_DATA_FILE
+
+
+def test_compiled_pipeline_matches_sklearn_pipeline():
+    # Préparation : tout le jeu de test, plus quelques cas limites ajoutés à la main
+    test_data = pd.read_csv(TESTING_DATA_FILE)[FEATURES]
+    test_data.loc[0, "LotFrontage"] = np.nan      # Valeur numérique manquante
+    test_data.loc[1, "MSZoning"] = np.nan         # Catégorie manquante (imputée)
+    test_data.loc[2, "Neighborhood"] = "Atlantis"  # Catégorie jamais vue (-1)
+    test_data.loc[3, "LotArea"] = -5              # Valeur négative (coupée à 0)
+
+    pipeline = _load_pipeline()
+    compiled = compile_pipeline(pipeline)
+
+    # Vérification : mêmes prédictions, aux arrondis flottants près
+    expected = pipeline.predict(test_data)
+    np.testing.assert_allclose(compiled.predict(test_data), expected, rtol=1e-9)
+
+
+def test_make_prediction_can_use_compiled_pipeline():
+    input_data = pd.read_csv(TESTING_DATA_FILE).iloc[:20, :]
+
+    reference = make_prediction(input_data)
+    result = make_prediction(input_data, use_compiled=True)
+
+    assert result["errors"] == {}
+    np.testing.assert_allclose(result["predictions"], reference["predictions"], rtol=1e-9)
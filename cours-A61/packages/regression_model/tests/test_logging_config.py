@@ -0,0 +1,91 @@
+## tests/test_logging_config.py ##
+import logging
+import os
+import queue
+
+import pytest
+
+import pandas as pd
+
+from regression_model.logging_config import (
+    AsyncQueueHandler,
+    configure_prediction_logging,
+    make_async,
+    stop_async_logging,
+)
+from regression_model.predict import logger, make_prediction
+from regression_model.train_pipeline import TESTING_DATA_FILE
+
+
+class _ListHandler(logging.Handler):
+    """Garde les messages reçus, pour les inspecter dans le test."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def _logged_messages(**logging_settings):
+    configure_prediction_logging(**logging_settings)
+    handler = _ListHandler()
+    logger.addHandler(handler)
+    try:
+        make_prediction(pd.read_csv(TESTING_DATA_FILE).iloc[:3, :])
+    finally:
+        logger.removeHandler(handler)
+        configure_prediction_logging(mode="structured", payload_sample_rate=0.0)
+    return handler.messages
+
+
+def test_structured_mode_logs_sizes_and_timings_but_not_payload():
+    messages = _logged_messages(mode="structured", payload_sample_rate=0.0)
+
+    assert not any("Inputs received" in message for message in messages)
+    summary = [message for message in messages if message.startswith("event=prediction ")]
+    assert len(summary) == 1
+    assert "rows=3" in summary[0]
+    assert "total_ms=" in summary[0]
+
+
+def test_payload_is_logged_when_sampled():
+    messages = _logged_messages(mode="structured", payload_sample_rate=1.0)
+    assert any("Inputs received" in message for message in messages)
+
+
+def test_async_handler_drops_instead_of_blocking():
+    handler = AsyncQueueHandler(queue.Queue(maxsize=1))
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "message", None, None)
+
+    handler.handle(record)
+    handler.handle(record)  # file pleine : abandon, sans bloquer
+
+    assert handler.dropped == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork() indisponible")
+def test_async_logging_still_writes_in_forked_child(tmp_path):
+    log_file = tmp_path / "child.log"
+    child_logger = logging.getLogger("regression_model.tests.fork")
+    child_logger.propagate = False
+    file_handler = logging.FileHandler(log_file)
+    child_logger.addHandler(file_handler)
+    make_async(child_logger)
+
+    pid = os.fork()
+    if pid == 0:
+        # Processus enfant : même sortie que les workers de serve.py
+        child_logger.warning("written by the child")
+        stop_async_logging()
+        os._exit(0)
+    _, status = os.waitpid(pid, 0)
+
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert "written by the child" in log_file.read_text()
+    # Sans handler, make_async arrête le thread d'écriture du logger
+    for handler in list(child_logger.handlers):
+        child_logger.removeHandler(handler)
+    make_async(child_logger)
+    file_handler.close()
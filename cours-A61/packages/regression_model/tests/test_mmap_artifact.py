@@ -0,0 +1,74 @@
+## tests/test_mmap_artifact.py ##
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from regression_model.mmap_artifact import MANIFEST_FILE_NAME, load_mmap_artifact, save_mmap_artifact
+from regression_model.predict import _load_pipeline, configure_artifact_format, make_prediction
+from regression_model.train_pipeline import FEATURES, TESTING_DATA_FILE
+
+
+def test_mmap_artifact_round_trip(tmp_path):
+    test_data = pd.read_csv(TESTING_DATA_FILE)[FEATURES]
+    test_data.loc[0, "MSZoning"] = np.nan          # Catégorie manquante (imputée)
+    test_data.loc[1, "Neighborhood"] = "Atlantis"  # Catégorie jamais vue (-1)
+
+    pipeline = _load_pipeline()
+    directory = save_mmap_artifact(pipeline, tmp_path / "model.mmap", model_version="test")
+    compiled = load_mmap_artifact(directory / MANIFEST_FILE_NAME)
+
+    # Les tables sont lues directement dans les fichiers, sans copie
+    assert isinstance(compiled.preprocessor.numerical_fill_values_, np.memmap)
+    np.testing.assert_allclose(compiled.predict(test_data), pipeline.predict(test_data), rtol=1e-9)
+
+
+def test_mmap_artifact_rejects_unknown_format_version(tmp_path):
+    directory = save_mmap_artifact(_load_pipeline(), tmp_path / "model.mmap", model_version="test")
+    manifest = json.loads((directory / MANIFEST_FILE_NAME).read_text())
+    manifest["format_version"] = 99
+    (directory / MANIFEST_FILE_NAME).write_text(json.dumps(manifest))
+
+    with pytest.raises(ValueError):
+        load_mmap_artifact(directory)
+
+
+def test_make_prediction_serves_the_shipped_mmap_artifact():
+    input_data = pd.read_csv(TESTING_DATA_FILE).iloc[:20, :]
+    reference = make_prediction(input_data)
+
+    configure_artifact_format("mmap")
+    try:
+        result = make_prediction(input_data)
+    finally:
+        configure_artifact_format("pkl")
+
+    assert result["errors"] == {}
+    np.testing.assert_allclose(result["predictions"], reference["predictions"], rtol=1e-9)
+
+
+def test_mmap_prediction_does_not_import_sklearn():
+    # Démarrage à froid : avec l'artefact mappé, ni l'import de predict ni la
+    # première prédiction ne chargent scikit-learn (plus d'une seconde d'import)
+    script = (
+        "import sys, json\n"
+        "from regression_model.config.core import FEATURES\n"
+        "from regression_model.predict import configure_artifact_format, make_prediction\n"
+        "imported = 'sklearn' in sys.modules\n"
+        "configure_artifact_format('mmap')\n"
+        "record = json.loads(sys.stdin.read())\n"
+        "result = make_prediction(record)\n"
+        "print(json.dumps([imported, 'sklearn' in sys.modules, result['errors']]))\n"
+    )
+    record = pd.read_csv(TESTING_DATA_FILE, nrows=1).to_json(orient="records")[1:-1]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(Path(__file__).resolve().parents[1]), os.environ.get("PYTHONPATH", "")]))
+    output = subprocess.run(
+        [sys.executable, "-c", script], input=record, capture_output=True, text=True, check=True, env=env
+    ).stdout
+
+    assert json.loads(output.strip().splitlines()[-1]) == [False, False, {}]
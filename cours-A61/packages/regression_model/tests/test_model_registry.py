@@ -0,0 +1,84 @@
+## tests/test_model_registry.py ##
+import joblib
+import numpy as np
+import pytest
+
+from regression_model.errors import ModelLoadError, UnknownModelError
+from regression_model.model_registry import ModelRegistry, estimate_memory_bytes
+from regression_model.pipeline_cache import PipelineCache
+
+
+def _registry(directory, max_resident):
+    # Des "modèles" factices sauvegardés comme les vrais ; "v1" est le modèle par défaut
+    for name, size in (("v1", 10), ("v2", 1000), ("v3", 100)):
+        joblib.dump({"coef": np.arange(size, dtype=np.float64)}, directory / f"{name}.pkl")
+    default_cache = PipelineCache(directory / "v1.pkl")
+    return ModelRegistry(
+        directory,
+        default_model="v1",
+        default_cache=lambda: default_cache,
+        artifact_format=lambda: "pkl",
+        max_resident=max_resident,
+    )
+
+
+def test_models_are_discovered_and_loaded_lazily(tmp_path):
+    registry = _registry(tmp_path, max_resident=2)
+
+    # Découverte : rien n'est chargé
+    models = {model["name"]: model for model in registry.describe()}
+    assert sorted(models) == ["v1", "v2", "v3"]
+    assert not any(model["loaded"] for model in models.values())
+    assert models["v1"]["default"]
+
+    # Premier accès : chargement, puis le même objet est partagé
+    first = registry.get("v2")
+    assert registry.get("v2") is first
+    v2 = {model["name"]: model for model in registry.describe()}["v2"]
+    assert v2["loaded"] and v2["format"] == "pkl"
+    assert v2["memory_bytes"] >= 1000 * 8
+    assert v2["load_seconds"] is not None
+
+
+def test_least_recently_used_model_is_evicted(tmp_path):
+    registry = _registry(tmp_path, max_resident=2)
+    registry.get("v1")
+    registry.get("v2")
+    registry.get("v3")
+    registry.get("v2")  # v3 devient le moins récemment utilisé
+
+    # Un troisième modèle non par défaut : v3 est évincé, jamais le modèle par défaut
+    (tmp_path / "v4.pkl").write_bytes((tmp_path / "v3.pkl").read_bytes())
+    registry.get("v4")
+
+    stats = registry.stats()
+    assert stats["resident"] == ["v2", "v4"]
+    assert stats["evictions"] == 1
+    loaded = {model["name"] for model in registry.describe() if model["loaded"]}
+    assert loaded == {"v1", "v2", "v4"}
+
+    # Un modèle évincé est simplement rechargé à la demande suivante
+    assert registry.get("v3")["coef"].shape == (100,)
+    assert registry.stats()["resident"] == ["v4", "v3"]
+
+
+def test_unknown_and_broken_models_are_reported(tmp_path):
+    registry = _registry(tmp_path, max_resident=2)
+    (tmp_path / "broken.pkl").write_bytes(b"not a pickle")
+
+    with pytest.raises(UnknownModelError):
+        registry.get("missing")
+    with pytest.raises(ModelLoadError):
+        registry.get("broken")
+
+    # L'erreur est visible dans describe(), et l'artefact n'occupe pas de place
+    broken = {model["name"]: model for model in registry.describe()}["broken"]
+    assert not broken["loaded"]
+    assert broken["error"]
+    assert registry.stats()["resident"] == []
+
+
+def test_memory_estimate_counts_owned_arrays_once():
+    values = np.zeros(10_000)
+    model = {"coef": values, "same": values, "view": values[:10]}
+    assert values.nbytes <= estimate_memory_bytes(model) < 2 * values.nbytes
@@ -0,0 +1,65 @@
+## tests/test_pipeline_cache.py ##
+import os
+
+import joblib
+
+from regression_model.pipeline_cache import PipelineCache
+
+
+def test_pipeline_is_loaded_once_then_served_from_cache(tmp_path):
+    # Préparation : un "pipeline" factice sauvegardé comme le vrai
+    artifact = tmp_path / "model.pkl"
+    joblib.dump({"coef": [1.0, 2.0]}, artifact)
+    cache = PipelineCache(artifact)
+
+    # Action : plusieurs accès successifs
+    first = cache.get()
+    second = cache.get()
+
+    # Vérifications : un seul chargement, le même objet est partagé
+    assert first is second
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+    assert stats["reloads"] == 0
+    assert stats["last_load_seconds"] is not None
+
+
+def test_pipeline_is_reloaded_only_when_content_changes(tmp_path):
+    artifact = tmp_path / "model.pkl"
+    joblib.dump({"coef": [1.0]}, artifact)
+    cache = PipelineCache(artifact)
+    first = cache.get()
+
+    # Un simple changement de mtime ne doit pas provoquer de rechargement
+    stat = artifact.stat()
+    os.utime(artifact, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000))
+    assert cache.get() is first
+    assert cache.stats()["reloads"] == 0
+
+    # Un nouveau contenu, lui, doit être rechargé à chaud
+    joblib.dump({"coef": [3.0, 4.0, 5.0]}, artifact)
+    reloaded = cache.get()
+    assert reloaded == {"coef": [3.0, 4.0, 5.0]}
+    assert cache.stats()["reloads"] == 1
+
+
+def test_reload_serves_the_old_pipeline_until_the_swap(tmp_path):
+    artifact = tmp_path / "model.pkl"
+    joblib.dump({"coef": [1.0]}, artifact)
+    cache = PipelineCache(artifact)
+    old = cache.get()
+    joblib.dump({"coef": [2.0]}, artifact)
+
+    # Pendant l'échauffement du nouveau pipeline, les requêtes voient l'ancien
+    seen_during_warm_up = []
+    report = cache.reload(warm_up=lambda pipeline: seen_during_warm_up.append(cache.get()))
+
+    assert seen_during_warm_up == [old]
+    assert report["swapped"] is True and report["warmup_seconds"] is not None
+    assert cache.get() == {"coef": [2.0]}
+    assert cache.stats()["reloads"] == 1
+
+    # Un artefact illisible ne remplace jamais le pipeline servi
+    artifact.write_bytes(b"not a pickle")
+    assert cache.get() == {"coef": [2.0]}
@@ -1,4 +1,5 @@
 ## tests/test_predict.py ##
+import numpy as np
 import pandas as pd
 
 from regression_model.train_pipeline import TESTING_DATA_FILE
@@ -44,4 +45,49 @@ def test_validation_missing_column_generates_error():
     # 2. Par contre, on DOIT avoir un message d'erreur qui nous dit ce qui ne va pas
     assert "missing_columns" in errors
     # 3. Et cette erreur doit bien mentionner la colonne manquante ("MSSubClass")
-    assert "MSSubClass" in errors["missing_columns"]
\ No newline at end of file
+    assert "MSSubClass" in errors["missing_columns"]
+
+def test_pandas_missing_values_in_text_columns_are_predicted():
+    # Colonnes texte "string" de pandas : les cellules vides y sont des pd.NA
+    input_data = pd.read_csv(TESTING_DATA_FILE).iloc[:3, :].astype({"Neighborhood": "string", "Street": "string"})
+    input_data.loc[0, "Neighborhood"] = pd.NA
+    input_data.loc[1, "Street"] = pd.NA
+
+    result = make_prediction(input_data)
+
+    assert result["errors"] == {}
+    assert len(result["predictions"]) == 3
+
+
+def test_large_batches_are_predicted_in_chunks():
+    # Même résultat qu'en une seule fois, quelle que soit la taille des paquets
+    input_data = pd.read_csv(TESTING_DATA_FILE).iloc[:50, :]
+
+    whole = make_prediction(input_data)
+    chunked = make_prediction(input_data, chunk_size=7)
+
+    assert chunked["errors"] == {}
+    # Aux arrondis près : les produits matriciels ne sont pas découpés de la même façon
+    assert np.allclose(chunked["predictions"], whole["predictions"], rtol=1e-12)
+
+
+def test_deadline_returns_finished_rows_and_unfinished_positions(monkeypatch):
+    from regression_model import predict
+
+    input_data = pd.read_csv(TESTING_DATA_FILE).iloc[:10, :].copy()
+    input_data.loc[1, "LotArea"] = -1  # Ligne invalide, jamais "non terminée"
+
+    # Horloge factice : l'échéance tombe après le premier paquet
+    ticks = iter([0.0, 10.0])
+    monkeypatch.setattr(predict.time, "monotonic", lambda: next(ticks, 10.0))
+    result = make_prediction(input_data, deadline=5.0, chunk_size=4)
+
+    full = make_prediction(input_data)["predictions"]
+    # Premier paquet : les 4 premières lignes valides (0, 2, 3, 4)
+    assert result["predictions"][1] is None
+    assert np.allclose(
+        [result["predictions"][i] for i in (0, 2, 3, 4)], [full[i] for i in (0, 2, 3, 4)], rtol=1e-12
+    )
+    assert result["errors"]["unfinished_rows"] == [5, 6, 7, 8, 9]
+    assert result["predictions"][5:] == [None] * 5
+    assert [entry["row"] for entry in result["errors"]["invalid_rows"]] == [1]
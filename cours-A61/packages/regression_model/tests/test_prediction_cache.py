@@ -0,0 +1,70 @@
+## tests/test_prediction_cache.py ##
+import numpy as np
+import pandas as pd
+
+from regression_model.predict import _prediction_cache, make_prediction
+from regression_model.prediction_cache import PredictionCache, row_digests
+from regression_model.train_pipeline import FEATURES, TESTING_DATA_FILE
+
+
+def test_partial_hits_only_compute_missing_rows():
+    _prediction_cache.clear()
+    test_data = pd.read_csv(TESTING_DATA_FILE)
+
+    # Premier appel : 5 maisons, toutes calculées puis mises en cache
+    first = make_prediction(test_data.iloc[:5, :], use_cache=True)
+    # Second appel : 3 maisons déjà connues + 2 nouvelles
+    second = make_prediction(test_data.iloc[2:7, :], use_cache=True)
+
+    stats = _prediction_cache.stats()
+    assert stats["misses"] == 7
+    assert stats["hits"] == 3
+    assert stats["entries"] == 7
+    # Les prédictions servies par le cache sont identiques à celles sans cache
+    reference = make_prediction(test_data.iloc[:7, :])["predictions"]
+    np.testing.assert_allclose(first["predictions"] + second["predictions"][3:], reference)
+
+
+def test_row_digests_are_stable_across_dtypes():
+    test_data = pd.read_csv(TESTING_DATA_FILE).iloc[:3, :]
+    # Mêmes maisons, mais colonnes entières passées en flottants
+    as_float = test_data.astype({"MSSubClass": float, "LotArea": float})
+    assert row_digests(test_data, FEATURES) == row_digests(as_float, FEATURES)
+
+    # None et NaN ne sont pas confondus (l'encodeur ne les traite pas pareil)
+    with_none = test_data.astype({"Alley": object})
+    with_none.loc[0, "Alley"] = None
+    assert row_digests(with_none, FEATURES)[0] != row_digests(test_data, FEATURES)[0]
+
+
+
+def test_pandas_missing_values_do_not_share_the_nan_cache_entry():
+    _prediction_cache.clear()
+    nan_row = pd.read_csv(TESTING_DATA_FILE).iloc[:1, :].astype({"Alley": object})
+    nan_row.loc[0, "Alley"] = np.nan
+    na_row = nan_row.copy()
+    na_row.loc[0, "Alley"] = pd.NA  # encodé '<NA>' (inconnu), pas 'nan'
+
+    make_prediction(nan_row, use_cache=True)
+    cached = make_prediction(na_row, use_cache=True)["predictions"]
+
+    assert _prediction_cache.stats()["hits"] == 0
+    np.testing.assert_allclose(cached, make_prediction(na_row)["predictions"])
+    assert row_digests(na_row, FEATURES) != row_digests(nan_row, FEATURES)
+
+def test_lru_eviction_and_ttl():
+    cache = PredictionCache(max_entries=2, ttl_seconds=3600)
+    cache.put_many("v1", [1, 2], [10.0, 20.0])
+    cache.get_many("v1", [1])           # La ligne 1 devient la plus récente
+    cache.put_many("v1", [3], [30.0])   # La ligne 2 est évincée
+
+    values, missing = cache.get_many("v1", [1, 2, 3])
+    assert missing.tolist() == [False, True, False]
+    assert values[0] == 10.0 and values[2] == 30.0
+    assert cache.stats()["evictions"] == 1
+
+    # Une durée de vie négative rend toute entrée immédiatement périmée
+    expired = PredictionCache(ttl_seconds=-1)
+    expired.put_many("v1", [1], [10.0])
+    assert expired.get_many("v1", [1])[1].tolist() == [True]
+    assert expired.stats()["expirations"] == 1
@@ -0,0 +1,76 @@
+## tests/test_preprocessors.py ##
+import pickle
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+
+from regression_model.compiled import compile_pipeline
+from regression_model.pipeline import CATEGORICAL_VARS, LOG_VARS, fused_price_pipe, price_pipe
+from regression_model.processing.preprocessors import FusedPreprocessor, SimpleCategoricalEncoder
+from regression_model.train_pipeline import FEATURES, TARGET, TESTING_DATA_FILE, TRAINING_DATA_FILE
+
+
+def test_fused_preprocessor_matches_the_four_separate_steps():
+    # Préparation : on entraîne les deux variantes sur les mêmes données
+    train = pd.read_csv(TRAINING_DATA_FILE)
+    test_data = pd.read_csv(TESTING_DATA_FILE)[FEATURES]
+    test_data.loc[0, "Neighborhood"] = "Atlantis"  # Catégorie jamais vue
+
+    four_steps = clone(price_pipe)[:-1].fit(train[FEATURES])
+    fused = FusedPreprocessor(categorical_variables=CATEGORICAL_VARS, log_variables=LOG_VARS)
+    fused.fit(train[FEATURES])
+
+    # Action
+    expected = four_steps.transform(test_data)
+    result = fused.transform(test_data)
+
+    # Vérification : mêmes valeurs, colonnes rangées dans l'ordre du préprocesseur fusionné
+    columns = list(fused.get_feature_names_out())
+    np.testing.assert_allclose(result, expected[columns].to_numpy(dtype=float), rtol=1e-12)
+
+
+def test_fused_pipeline_is_a_drop_in_replacement():
+    train = pd.read_csv(TRAINING_DATA_FILE)
+    test_data = pd.read_csv(TESTING_DATA_FILE)[FEATURES]
+
+    reference = clone(price_pipe).fit(train[FEATURES], train[TARGET])
+    fused = clone(fused_price_pipe).fit(train[FEATURES], train[TARGET])
+
+    # Le Lasso voit les colonnes dans un autre ordre : on tolère les écarts de convergence
+    np.testing.assert_allclose(fused.predict(test_data), reference.predict(test_data), rtol=1e-6)
+    # La version compilée du pipeline fusionné donne exactement ses prédictions
+    np.testing.assert_allclose(compile_pipeline(fused).predict(test_data), fused.predict(test_data), rtol=1e-9)
+
+
+def test_categorical_encoder_codes_and_legacy_artifacts():
+    train = pd.DataFrame({"Street": ["Pave", "Grvl", np.nan], "LotArea": [1.0, 2.0, 3.0]})
+    encoder = SimpleCategoricalEncoder().fit(train)
+
+    # Les codes suivent l'ordre d'apparition ; catégorie inconnue → -1
+    new_data = pd.DataFrame({"Street": ["Grvl", "Dirt", np.nan, "Pave"], "LotArea": [4.0] * 4})
+    result = encoder.transform(new_data)
+    assert result["Street"].tolist() == [1, -1, 2, 0]
+    assert list(result.columns) == ["Street", "LotArea"]
+    assert encoder.encoder_dict_ == {"Street": {"Pave": 0, "Grvl": 1, "nan": 2}}
+
+    # Un encodeur sauvegardé avec l'ancien format (encoder_dict_) reste utilisable
+    legacy = SimpleCategoricalEncoder()
+    legacy.__setstate__({"variables": None, "variables_": ["Street"], "encoder_dict_": encoder.encoder_dict_})
+    assert legacy.transform(new_data)["Street"].tolist() == [1, -1, 2, 0]
+    assert pickle.loads(pickle.dumps(legacy)).categories_ == encoder.categories_
+
+
+def test_categorical_encoder_accepts_pandas_missing_values():
+    train = pd.DataFrame({"Street": ["Pave", "Grvl", np.nan], "LotArea": [1.0, 2.0, 3.0]})
+    encoder = SimpleCategoricalEncoder().fit(train)
+
+    # Colonne "string" pandas : ses valeurs manquantes sont des pd.NA, encodés
+    # comme leur texte ('<NA>', inconnu) ; seuls les NaN flottants sont 'nan'
+    new_data = pd.DataFrame(
+        {"Street": pd.array(["Grvl", pd.NA, "Pave"], dtype="string"), "LotArea": [4.0] * 3}
+    )
+    assert encoder.transform(new_data)["Street"].tolist() == [1, -1, 0]
+
+    mixed = pd.DataFrame({"Street": ["Grvl", pd.NA, np.nan, None], "LotArea": [4.0] * 4}, dtype=object)
+    assert encoder.transform(mixed)["Street"].tolist() == [1, -1, 2, -1]
@@ -0,0 +1,32 @@
+## tests/test_timing.py ##
+import numpy as np
+import pandas as pd
+
+from regression_model.predict import make_prediction
+from regression_model.timing import observe_stages, stage_observers, timed_stage
+from regression_model.train_pipeline import TESTING_DATA_FILE
+
+
+def test_stages_are_reported_only_inside_observe_block():
+    observed = []
+    with observe_stages(lambda stage, seconds: observed.append(stage)):
+        with timed_stage("inside"):
+            pass
+    with timed_stage("outside"):
+        pass
+
+    assert observed == ["inside"]
+    assert stage_observers() == ()
+
+
+def test_step_by_step_prediction_matches_pipeline_predict():
+    input_data = pd.read_csv(TESTING_DATA_FILE).iloc[:20, :]
+    reference = make_prediction(input_data)["predictions"]
+
+    timings = {}
+    with observe_stages(lambda stage, seconds: timings.setdefault(stage, seconds)):
+        result = make_prediction(input_data)
+
+    # Chaque étape de price_pipe est mesurée, et le résultat ne change pas
+    assert {"dataframe", "validate", "load", "pipeline.categorical_encoder", "pipeline.model"} <= set(timings)
+    np.testing.assert_allclose(result["predictions"], reference, rtol=1e-12)
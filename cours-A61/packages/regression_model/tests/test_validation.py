@@ -0,0 +1,97 @@
+## tests/test_validation.py ##
+import numpy as np
+import pandas as pd
+
+from regression_model.predict import make_prediction
+from regression_model.processing.validation import validate_inputs
+from regression_model.train_pipeline import FEATURES, NUMERIC_FEATURES, TESTING_DATA_FILE, TRAINING_DATA_FILE
+from regression_model.warmup import synthetic_batch
+
+
+def test_numeric_features_match_training_data():
+    # Les colonnes déclarées numériques sont exactement celles lues comme
+    # des nombres dans le jeu d'entraînement
+    train = pd.read_csv(TRAINING_DATA_FILE, nrows=200)
+    numeric = [col for col in FEATURES if train[col].dtype.kind in "if"]
+    assert numeric == NUMERIC_FEATURES
+
+
+def test_valid_data_is_neither_copied_nor_reported():
+    test_data = pd.read_csv(TESTING_DATA_FILE)
+
+    data, errors = validate_inputs(test_data)
+
+    assert errors == {}
+    assert data is test_data
+
+
+def test_invalid_values_are_reported_per_row():
+    input_data = pd.read_csv(TESTING_DATA_FILE).iloc[:6].copy()
+    input_data["LotArea"] = input_data["LotArea"].astype(object)
+    input_data.loc[1, "LotArea"] = "grand"      # texte dans une colonne numérique
+    input_data.loc[2, "GrLivArea"] = -10        # surface négative
+    input_data.loc[2, "PoolArea"] = np.inf      # nombre infini
+    streets = input_data["Street"].tolist()
+    streets[3] = ["Pave"]                       # liste dans une colonne texte
+    streets[4] = 3                              # nombre dans une colonne texte : accepté
+    input_data["Street"] = pd.Series(streets, index=input_data.index, dtype=object)
+    input_data.loc[5, "LotArea"] = "9600"       # nombre en texte : accepté
+
+    data, errors = validate_inputs(input_data)
+
+    assert errors == {
+        "invalid_rows": [
+            {"row": 1, "invalid_values": {"LotArea": "expected a number"}},
+            {
+                "row": 2,
+                "invalid_values": {
+                    "GrLivArea": "expected a finite number >= 0",
+                    "PoolArea": "expected a finite number >= 0",
+                },
+            },
+            {"row": 3, "invalid_values": {"Street": "expected a string"}},
+        ]
+    }
+    # Les valeurs acceptées sont converties, sans toucher aux données du client
+    assert data["LotArea"].iloc[5] == 9600.0
+    assert input_data.loc[5, "LotArea"] == "9600"
+    assert data["Street"].iloc[4] == "3"
+    assert input_data.loc[4, "Street"] == 3
+
+
+def test_numbers_in_text_columns_are_predicted_as_unknown_categories():
+    test_data = pd.read_csv(TESTING_DATA_FILE).iloc[:3]
+    input_data = test_data.astype({"Street": object, "Neighborhood": object})
+    input_data.loc[0, "Street"] = 3
+    input_data["Neighborhood"] = 7              # colonne entière de nombres
+
+    result = make_prediction(input_data)
+
+    assert result["errors"] == {}
+    # Même prédiction qu'avec le texte correspondant ("3", "7") : catégories inconnues
+    as_text = test_data.copy()
+    as_text.loc[0, "Street"] = "3"
+    as_text["Neighborhood"] = "7"
+    assert np.allclose(result["predictions"], make_prediction(as_text)["predictions"])
+
+
+def test_valid_rows_are_still_predicted():
+    test_data = pd.read_csv(TESTING_DATA_FILE).iloc[:5]
+    expected = make_prediction(test_data)["predictions"]
+    input_data = test_data.copy()
+    input_data.loc[3, "YearBuilt"] = -1
+
+    result = make_prediction(input_data)
+
+    assert [row["row"] for row in result["errors"]["invalid_rows"]] == [3]
+    assert result["predictions"][3] is None
+    kept = [0, 1, 2, 4]
+    assert np.allclose([result["predictions"][i] for i in kept], [expected[i] for i in kept])
+
+
+def test_synthetic_warm_up_batch_is_valid():
+    batch = synthetic_batch(50)
+
+    assert list(batch.columns) == FEATURES
+    assert validate_inputs(batch)[1] == {}
+    assert batch[NUMERIC_FEATURES].isna().any().any()  # l'imputation est bien exercée
@@ -0,0 +1,33 @@
+## tests/test_warmup.py ##
+import pandas as pd
+import pytest
+from sklearn.base import clone
+from sklearn.linear_model import Ridge
+
+from regression_model import warmup
+from regression_model.compiled import compile_pipeline
+from regression_model.pipeline import price_pipe
+from regression_model.train_pipeline import FEATURES, TARGET, TRAINING_DATA_FILE
+from regression_model.warmup import _warm_pipeline, synthetic_batch, warm_up
+
+
+def test_pipeline_that_cannot_be_compiled_is_still_warmed_up():
+    # Même préparation des données, mais un autre modèle que le Lasso
+    train = pd.read_csv(TRAINING_DATA_FILE)
+    ridge = clone(price_pipe).set_params(model=Ridge()).fit(train[FEATURES], train[TARGET])
+    with pytest.raises(ValueError):
+        compile_pipeline(ridge)
+
+    _warm_pipeline(ridge, synthetic_batch(8))
+
+
+def test_warm_up_skips_compilation_when_it_is_not_possible(monkeypatch):
+    def not_compilable():
+        raise ValueError("Impossible de compiler ce pipeline")
+
+    monkeypatch.setattr(warmup, "_load_compiled_pipeline", not_compilable)
+
+    report = warm_up(8)
+
+    assert report["compiled"] is False
+    assert report["rows"] == 8